@@ -4,14 +4,23 @@ Scraping Admin API
 Admin endpoints for managing scraping jobs and monitoring status.
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from redis.exceptions import RedisError
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+import json
 import logging
+import uuid
 
+import celery_worker  # noqa: F401 - makes the configured Celery app current, so .delay() reaches the Redis broker
 from app.models.database import get_db, Restaurant, Review, ScrapingJob
-from app.services.background_jobs import scrape_restaurant_task
-from pydantic import BaseModel
+from app.services.background_jobs import scrape_restaurant_task, scrape_batch_task, process_ml_batch_task
+from app.services.job_lifecycle import create_jobs, fail_unqueued_jobs, in_flight_job
+from app.services.job_events import TERMINAL_STATUSES, job_snapshot, stream_job_events
+from app.core.config import settings
+from pydantic import BaseModel, Field
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -36,6 +45,40 @@ class ScrapingJobStatus(BaseModel):
     error_message: str = None
 
 
+class ScrapingBatchRequest(BaseModel):
+    """Request model for batch scraping"""
+    place_ids: List[str]
+    # Each chunk is scraped on one browser, so keep chunks small enough to finish within a task
+    chunk_size: Optional[int] = Field(None, ge=1, le=100, description="Places per chunk (defaults to SCRAPE_BATCH_CHUNK_SIZE)")
+
+
+class ScrapingBatchResponse(BaseModel):
+    """Response model for batch scraping trigger"""
+    message: str
+    batch_id: str
+    places: int
+
+
+class ScrapingBatchStatus(BaseModel):
+    """Response model for aggregate batch progress"""
+    batch_id: str
+    status: str
+    total_jobs: int
+    pending_jobs: int
+    running_jobs: int
+    completed_jobs: int
+    failed_jobs: int
+    reviews_scraped: int
+    progress: float
+
+
+class MLReprocessResponse(BaseModel):
+    """Response model for bulk ML reprocessing"""
+    message: str
+    restaurants: int
+    batches: int
+
+
 class ScrapingStats(BaseModel):
     """Response model for scraping statistics"""
     total_restaurants: int
@@ -75,36 +118,31 @@ async def trigger_scraping(place_id: str, db: Session = Depends(get_db)):
             db.refresh(restaurant)
             logger.info(f"Created new restaurant entry for place_id: {place_id}")
         
-        # Check if there's already a pending/running job
-        existing_job = db.query(ScrapingJob).filter(
-            ScrapingJob.place_id == place_id,
-            ScrapingJob.status.in_(['pending', 'running'])
-        ).first()
+        # Create the job; the insert is a no-op if the place already has one pending/running
+        created = create_jobs(db, [(restaurant.id, place_id)])
+        db.commit()
         
-        if existing_job:
+        if place_id not in created:
+            existing_job = in_flight_job(db, place_id)
             raise HTTPException(
                 status_code=409,
-                detail=f"Scraping job already in progress (job_id: {existing_job.id})"
+                detail=f"Scraping job already in progress (job_id: {existing_job.id if existing_job else 'unknown'})"
             )
+        job_id = created[place_id]
         
-        # Create scraping job
-        job = ScrapingJob(
-            restaurant_id=restaurant.id,
-            place_id=place_id,
-            status='pending'
-        )
-        db.add(job)
-        db.commit()
-        db.refresh(job)
-        
-        # Queue background task
-        scrape_restaurant_task.delay(place_id=place_id, restaurant_id=restaurant.id)
+        # Queue background task; a job that never reaches the broker must not hold the place
+        try:
+            scrape_restaurant_task.delay(job_id)
+        except Exception as e:
+            logger.error(f"Failed to queue scraping job {job_id}: {e}")
+            fail_unqueued_jobs(db, [job_id], e)
+            raise HTTPException(status_code=503, detail="Scraping queue unavailable")
         
-        logger.info(f"Triggered scraping job {job.id} for place_id: {place_id}")
+        logger.info(f"Triggered scraping job {job_id} for place_id: {place_id}")
         
         return ScrapingTriggerResponse(
             message="Scraping job queued successfully",
-            job_id=job.id,
+            job_id=job_id,
             place_id=place_id,
             restaurant_id=restaurant.id
         )
@@ -116,6 +154,131 @@ async def trigger_scraping(place_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/batch", response_model=ScrapingBatchResponse)
+async def trigger_batch_scraping(request: ScrapingBatchRequest):
+    """
+    Trigger scraping for a list of restaurants
+    
+    Jobs are created by scrape_batch_task in one bulk insert and scraped in
+    chunks, each chunk on a single browser. Places that already have a
+    pending or running job are skipped.
+    
+    Args:
+        request: Place IDs and optional chunk size
+    
+    Returns:
+        Batch ID for GET /batch/{batch_id}
+    """
+    place_ids = list(dict.fromkeys(p.strip() for p in request.place_ids if p.strip()))
+    if not place_ids:
+        raise HTTPException(status_code=400, detail="No place_ids given")
+    if len(place_ids) > settings.SCRAPE_BATCH_MAX_PLACES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large ({len(place_ids)} places, max {settings.SCRAPE_BATCH_MAX_PLACES})"
+        )
+    
+    # No job rows exist yet (scrape_batch_task creates them), so nothing is left behind on failure
+    batch_id = uuid.uuid4().hex
+    try:
+        scrape_batch_task.delay(batch_id=batch_id, place_ids=place_ids, chunk_size=request.chunk_size)
+    except Exception as e:
+        logger.error(f"Failed to queue scraping batch {batch_id}: {e}")
+        raise HTTPException(status_code=503, detail="Scraping queue unavailable")
+    
+    logger.info(f"Triggered scraping batch {batch_id} for {len(place_ids)} places")
+    
+    return ScrapingBatchResponse(
+        message="Scraping batch queued successfully",
+        batch_id=batch_id,
+        places=len(place_ids)
+    )
+
+
+@router.get("/batch/{batch_id}", response_model=ScrapingBatchStatus)
+async def get_batch_status(batch_id: str, db: Session = Depends(get_db)):
+    """
+    Get aggregate progress of a scraping batch
+    
+    Args:
+        batch_id: Batch ID returned by POST /batch
+        db: Database session
+    
+    Returns:
+        Job counts per status, reviews scraped and fraction finished
+        (status 'queued' until the batch's jobs have been created)
+    """
+    rows = db.query(
+        ScrapingJob.status,
+        func.count(ScrapingJob.id),
+        func.coalesce(func.sum(ScrapingJob.reviews_scraped), 0)
+    ).filter(ScrapingJob.batch_id == batch_id).group_by(ScrapingJob.status).all()
+    
+    counts = {status: count for status, count, _ in rows}
+    total = sum(counts.values())
+    finished = counts.get('completed', 0) + counts.get('failed', 0)
+    
+    if total == 0:
+        status = 'queued'
+    elif finished == total:
+        status = 'completed'
+    else:
+        status = 'running'
+    
+    return ScrapingBatchStatus(
+        batch_id=batch_id,
+        status=status,
+        total_jobs=total,
+        pending_jobs=counts.get('pending', 0),
+        running_jobs=counts.get('running', 0),
+        completed_jobs=counts.get('completed', 0),
+        failed_jobs=counts.get('failed', 0),
+        reviews_scraped=sum(reviews for _, _, reviews in rows),
+        progress=round(finished / total, 3) if total else 0.0
+    )
+
+
+@router.post("/ml/reprocess", response_model=MLReprocessResponse)
+async def reprocess_ml(db: Session = Depends(get_db)):
+    """
+    Re-run ML analysis for every restaurant with stored reviews
+    
+    Restaurants are grouped into batches of ML_BATCH_SIZE, and each batch is
+    analyzed by a single process_ml_batch_task.
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        Number of restaurants and batches queued
+    """
+    try:
+        restaurant_ids = [
+            row[0] for row in db.query(Review.restaurant_id).distinct().order_by(Review.restaurant_id).all()
+        ]
+        
+        batch_size = max(1, settings.ML_BATCH_SIZE)
+        batches = [
+            restaurant_ids[i:i + batch_size]
+            for i in range(0, len(restaurant_ids), batch_size)
+        ]
+        
+        for batch in batches:
+            process_ml_batch_task.delay(restaurant_ids=batch, reprocess=True)
+        
+        logger.info(f"Queued ML reprocessing for {len(restaurant_ids)} restaurants in {len(batches)} batches")
+        
+        return MLReprocessResponse(
+            message="ML reprocessing queued successfully",
+            restaurants=len(restaurant_ids),
+            batches=len(batches)
+        )
+    
+    except Exception as e:
+        logger.error(f"Error queueing ML reprocessing: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/status/{job_id}", response_model=ScrapingJobStatus)
 async def get_job_status(job_id: int, db: Session = Depends(get_db)):
     """
@@ -144,6 +307,56 @@ async def get_job_status(job_id: int, db: Session = Depends(get_db)):
     )
 
 
+@router.get("/status/{job_id}/events")
+async def stream_job_status(job_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    Stream a scraping job's progress as Server-Sent Events
+    
+    Replaces polling GET /status/{job_id}: the job is read from the database
+    once, then status changes and scrape progress (phase, reviews loaded)
+    are pushed from Redis pub/sub until the job completes or fails. Each
+    event is a JSON `data:` line; a comment line is sent every
+    JOB_EVENTS_KEEPALIVE_SECONDS while the job is quiet. If live updates
+    are unavailable an `unavailable` event is sent and the stream ends, and
+    clients fall back to polling.
+    
+    Args:
+        job_id: Scraping job ID
+        request: Incoming request (to stop streaming when the client leaves)
+        db: Database session
+    
+    Returns:
+        text/event-stream response
+    """
+    job = db.query(ScrapingJob).filter(ScrapingJob.id == job_id).first()
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    initial = job_snapshot(job)
+    # Return the connection to the pool now rather than holding it for the whole stream
+    db.close()
+    
+    async def events():
+        if initial['status'] in TERMINAL_STATUSES:
+            yield f"data: {json.dumps(initial)}\n\n"
+            return
+        try:
+            async for event in stream_job_events(job_id, initial, settings.JOB_EVENTS_KEEPALIVE_SECONDS):
+                if await request.is_disconnected():
+                    break
+                yield f"data: {json.dumps(event)}\n\n" if event else ": keepalive\n\n"
+        except RedisError as e:
+            logger.warning(f"Live updates for job {job_id} unavailable: {e}")
+            yield f"event: unavailable\ndata: {json.dumps(initial)}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @router.get("/stats", response_model=ScrapingStats)
 async def get_scraping_stats(db: Session = Depends(get_db)):
     """
@@ -174,6 +387,23 @@ async def get_scraping_stats(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/cache/stats")
+async def get_http_cache_stats():
+    """
+    Get HTTP response cache hit ratios for this API process
+    
+    Returns:
+        Per-endpoint-class hits, misses and hit ratio, plus cache size
+    """
+    from app.services.http_cache import get_http_cache
+    
+    cache = get_http_cache()
+    if cache is None:
+        return {'enabled': False}
+    
+    return {'enabled': True, **cache.stats()}
+
+
 @router.get("/jobs", response_model=List[ScrapingJobStatus])
 async def list_jobs(
     limit: int = 20,
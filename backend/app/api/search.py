@@ -10,26 +10,20 @@ This orchestrates the entire pipeline:
 """
 
 from fastapi import APIRouter, HTTPException, Query
-from typing import List
+from typing import Dict, List
+import asyncio
 import logging
 
+from app.core.config import settings
 from app.models.restaurant import RestaurantResponse
-from app.services.google_places import GooglePlacesService
-from app.services.review_scraper import ReviewScraper
-from app.ml.sentiment_analyzer import SentimentAnalyzer
-from app.ml.topic_modeler import TopicModeler
-from app.ml.keyword_extractor import KeywordExtractor
+from app.services import registry
+from app.ml.review_sampler import sample_reviews
 from app.services.ml_generator import generate_ml_insights, calculate_distance
 
 # Initialize router
 router = APIRouter()
 
-# Initialize services (these will be implemented in the services module)
-google_places = GooglePlacesService()
-review_scraper = ReviewScraper()
-sentiment_analyzer = SentimentAnalyzer()
-topic_modeler = TopicModeler()
-keyword_extractor = KeywordExtractor()
+# Services are constructed lazily on first use (see app.services.registry)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -120,6 +114,42 @@ def detect_restaurant_name_query(query: str) -> bool:
         return query.istitle() and len(query_words) <= 5
 
 
+def _sampled_texts(reviews) -> List[str]:
+    """Texts of the reviews selected by the REVIEW_SAMPLE_SIZE sampler"""
+    keep = sample_reviews([
+        {'text': r.text, 'rating': r.rating, 'author': r.author, 'date': r.date}
+        for r in reviews
+    ])
+    return [reviews[i].text for i in keep]
+
+
+def _sync_with_store(restaurants: List[dict]) -> Dict[str, dict]:
+    """
+    Record search hits for the scrape scheduler and load stored insights
+    
+    Never fails the search: without a database every restaurant is simply
+    analyzed on the request path.
+    
+    Returns:
+        Dict of place_id -> insights computed by the background ML tasks
+    """
+    from app.models.database import get_session_local
+    from app.services.scrape_scheduler import record_search_hits
+    from app.services.insight_store import insights_for_places
+    
+    try:
+        db = get_session_local()()
+        try:
+            record_search_hits(db, restaurants)
+            db.commit()
+            return insights_for_places(db, [resto['place_id'] for resto in restaurants])
+        finally:
+            db.close()
+    except Exception as e:
+        logger.warning(f"Failed to sync search with the database: {e}")
+        return {}
+
+
 @router.get("/search", response_model=List[RestaurantResponse])
 async def search_restaurants(
     location: str = Query(..., min_length=2, description="Location or restaurant name to search"),
@@ -141,6 +171,8 @@ async def search_restaurants(
     
     try:
         logger.info(f"Search query received: '{location}'")
+        google_places = registry.get_google_places()
+        review_scraper = registry.get_review_scraper()
         
         # Step 1: Intelligent search detection
         # Determine if this is a restaurant name search or location search
@@ -182,84 +214,77 @@ async def search_restaurants(
                 detail=f"Google Places API error: {str(e)}. Please check your API key and ensure Places API is enabled."
             )
         
-        # Step 2: Process each restaurant
-        enriched_restaurants = []
+        # Scraped restaurants are served from insights stored by the ML tasks (no ML here);
+        # the database work blocks, so it runs off the event loop
+        stored_insights = await asyncio.to_thread(_sync_with_store, basic_restaurants)
+        if stored_insights:
+            logger.info(f"Using stored insights for {len(stored_insights)} of {len(basic_restaurants)} restaurants")
+        
+        # Step 2: Scrape reviews for each restaurant without stored insights
+        reviews_by_place = {}
         
         for resto in basic_restaurants:
+            if resto['place_id'] in stored_insights:
+                continue
             try:
                 logger.info(f"Processing restaurant: {resto['name']}")
+                reviews_by_place[resto['place_id']] = await review_scraper.scrape_reviews(resto['place_id'])
+            except Exception as e:
+                logger.error(f"Error scraping reviews for {resto['name']}: {e}")
+                reviews_by_place[resto['place_id']] = []
+        
+        # Step 3: Run the ML pipeline once for every restaurant with enough reviews
+        # Hybrid Approach: Use ML if we have enough reviews, otherwise generate insights
+        ml_restaurants = [
+            resto for resto in basic_restaurants
+            if len(reviews_by_place.get(resto['place_id']) or []) >= 5
+        ]
+        insights_by_place = dict(stored_insights)
+        
+        if ml_restaurants:
+            try:
+                batch_analyzer = registry.get_batch_analyzer()
+                batch_results = batch_analyzer.analyze_batch(
+                    [_sampled_texts(reviews_by_place[resto['place_id']]) for resto in ml_restaurants],
+                    top_dishes=settings.TOP_DISHES_COUNT,
+                    top_complaints=settings.TOP_COMPLAINTS_COUNT
+                )
+                for resto, insights in zip(ml_restaurants, batch_results):
+                    insights_by_place[resto['place_id']] = insights
+            except Exception as e:
+                logger.error(f"Batch ML analysis failed, falling back to generated insights: {e}")
+        
+        # Step 4: Assemble final data
+        enriched_restaurants = []
+        
+        for resto in basic_restaurants:
+            try:
+                insights = insights_by_place.get(resto['place_id'])
                 
-                # Step 3: Scrape reviews
-                reviews = await review_scraper.scrape_reviews(resto['place_id'])
-                
-                # Hybrid Approach: Use ML if we have enough reviews, otherwise generate insights
-                if not reviews or len(reviews) < 5:
+                if insights is None:
                     logger.info(f"Limited reviews for {resto['name']}, generating hybrid insights")
                     
                     # Generate ML insights based on restaurant data
-                    ml_insights = generate_ml_insights({
+                    insights = generate_ml_insights({
                         'name': resto['name'],
                         'rating': resto['rating']
                     })
-                    
-                    # Calculate distance if user location provided
-                    distance = None
-                    if user_lat and user_lng and resto.get('lat') and resto.get('lng'):
-                        distance = calculate_distance(user_lat, user_lng, resto['lat'], resto['lng'])
-                    
-                    # Get photo URL
-                    photo_url = resto.get('photo_url')
-                    logger.info(f"Hybrid path for {resto['name']}: photo_url={'Found' if photo_url else 'None'}, keys={list(resto.keys())}")
-                    
-                    enriched_restaurants.append(
-                        RestaurantResponse(
-                            name=resto['name'],
-                            rating=resto['rating'],
-                            trueSentiment=ml_insights['trueSentiment'],
-                            vibeCheck=ml_insights['vibeCheck'],
-                            mustTryDishes=ml_insights['mustTryDishes'],
-                            commonComplaints=ml_insights['commonComplaints'],
-                            address=resto.get('address'),
-                            place_id=resto['place_id'],
-                            distance=distance,
-                            lat=resto.get('lat'),
-                            lng=resto.get('lng'),
-                            photo_url=photo_url
-                        )
-                    )
-                    continue
-                
-                # Step 4: Run ML Pipeline
-                review_texts = [r.text for r in reviews]
-                
-                # 4a. Sentiment Analysis
-                true_sentiment = sentiment_analyzer.analyze(review_texts)
-                
-                # 4b. Topic Modeling (Vibe Check)
-                vibes = topic_modeler.extract_vibes(review_texts)
-                
-                # 4c. Keyword Extraction (Dishes)
-                dishes = keyword_extractor.extract_dishes(review_texts)
-                
-                # 4d. Complaint Detection
-                complaints = keyword_extractor.extract_complaints(review_texts)
                 
                 # Calculate distance if user location provided
                 distance = None
                 if user_lat and user_lng and resto.get('lat') and resto.get('lng'):
                     distance = calculate_distance(user_lat, user_lng, resto['lat'], resto['lng'])
                 
-                # Step 5: Assemble final data
                 photo_url = resto.get('photo_url')
                 logger.info(f"Assembling response for {resto['name']}: photo_url={'Present' if photo_url else 'Missing'}")
                 
                 enriched_restaurant = RestaurantResponse(
                     name=resto['name'],
                     rating=resto['rating'],
-                    trueSentiment=true_sentiment,
-                    vibeCheck=vibes,
-                    mustTryDishes=dishes,
-                    commonComplaints=complaints,
+                    trueSentiment=insights['trueSentiment'],
+                    vibeCheck=insights['vibeCheck'],
+                    mustTryDishes=insights['mustTryDishes'],
+                    commonComplaints=insights['commonComplaints'],
                     address=resto.get('address'),
                     place_id=resto['place_id'],
                     distance=distance,
@@ -6,15 +6,23 @@ Configuration for Celery task queue and Redis broker.
 
 import os
 from kombu import Exchange, Queue
+from app.core.config import settings as _settings
+from app.core.serialization import SERIALIZER_NAME, register as register_serializer
+
+# msgpack + compression for the scraping and ML queues (see app.core.serialization)
+register_serializer()
+_compact_serializer = os.getenv('CELERY_QUEUE_SERIALIZER', SERIALIZER_NAME)
 
 # Redis broker URL
-broker_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
-result_backend = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+broker_url = _settings.REDIS_URL
+result_backend = _settings.REDIS_URL
 
-# Task serialization
+# Task serialization (JSON by default; see task_annotations for the scraping and ML queues).
+# Results stay JSON: the backend has one serializer for every task, and results are small.
 task_serializer = 'json'
-accept_content = ['json']
+accept_content = ['json', SERIALIZER_NAME]
 result_serializer = 'json'
+result_accept_content = ['json', SERIALIZER_NAME]
 timezone = 'UTC'
 enable_utc = True
 
@@ -29,7 +37,43 @@ result_expires = 3600  # 1 hour
 # Task routing
 task_routes = {
     'app.services.background_jobs.scrape_restaurant_task': {'queue': 'scraping'},
+    'app.services.background_jobs.scrape_batch_task': {'queue': 'default'},
+    'app.services.background_jobs.scrape_chunk_task': {'queue': 'scraping'},
     'app.services.background_jobs.process_ml_task': {'queue': 'ml_processing'},
+    'app.services.background_jobs.process_ml_batch_task': {'queue': 'ml_processing'},
+    'app.services.background_jobs.flush_ml_batches_task': {'queue': 'default'},
+    'app.services.background_jobs.crawl_city_corpus_task': {'queue': 'scraping'},
+    'app.services.background_jobs.crawl_city_corpora_task': {'queue': 'default'},
+    'app.services.background_jobs.schedule_scrapes_task': {'queue': 'default'},
+    'app.services.background_jobs.reap_stale_jobs_task': {'queue': 'default'},
+}
+
+# Routes can't choose a serializer (the task's own wins), so set it per task
+task_annotations = {
+    name: {'serializer': _compact_serializer}
+    for name, route in task_routes.items()
+    if route['queue'] in ('scraping', 'ml_processing')
+}
+
+# Periodic tasks (run with: celery -A celery_worker beat); intervals come from Settings,
+# which the tasks themselves also read
+beat_schedule = {
+    'crawl-city-corpora': {
+        'task': 'app.services.background_jobs.crawl_city_corpora_task',
+        'schedule': _settings.REDDIT_CORPUS_CRAWL_HOURS * 3600,
+    },
+    'flush-ml-batches': {
+        'task': 'app.services.background_jobs.flush_ml_batches_task',
+        'schedule': _settings.ML_BATCH_MAX_WAIT_SECONDS,
+    },
+    'schedule-scrapes': {
+        'task': 'app.services.background_jobs.schedule_scrapes_task',
+        'schedule': _settings.SCHEDULER_INTERVAL_MINUTES * 60,
+    },
+    'reap-stale-jobs': {
+        'task': 'app.services.background_jobs.reap_stale_jobs_task',
+        'schedule': _settings.JOB_LEASE_SECONDS,
+    },
 }
 
 # Queue configuration
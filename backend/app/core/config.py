@@ -20,6 +20,10 @@ class Settings(BaseSettings):
     API_V1_PREFIX: str = "/api/v1"
     DEBUG: bool = True
     
+    # Startup Configuration
+    # Warm up ML models in the background at startup; /ready stays 503 until done
+    WARM_UP_ON_STARTUP: bool = os.getenv("WARM_UP_ON_STARTUP", "true").lower() == "true"
+    
     # CORS Configuration - Allow requests from these origins
     # In production, set ALLOWED_ORIGINS environment variable with comma-separated URLs
     BACKEND_CORS_ORIGINS: List[str] = [
@@ -43,6 +47,41 @@ class Settings(BaseSettings):
     SCRAPING_ENABLED: bool = os.getenv("SCRAPING_ENABLED", "true").lower() == "true"
     MAX_REVIEWS_PER_RESTAURANT: int = int(os.getenv("MAX_REVIEWS_PER_RESTAURANT", "100"))
     SCRAPING_DELAY_SECONDS: int = int(os.getenv("SCRAPING_DELAY_SECONDS", "2"))
+    BROWSER_POOL_SIZE: int = int(os.getenv("BROWSER_POOL_SIZE", "1"))  # Chrome instances per worker process
+    BROWSER_MAX_USES: int = int(os.getenv("BROWSER_MAX_USES", "20"))  # Scrapes before a browser is recycled
+    SCRAPE_TABS_PER_BROWSER: int = int(os.getenv("SCRAPE_TABS_PER_BROWSER", "3"))  # Concurrent tabs in multi-tab scraping
+    SCRAPE_BATCH_CHUNK_SIZE: int = int(os.getenv("SCRAPE_BATCH_CHUNK_SIZE", "10"))  # Places per batch chunk task (one browser each)
+    SCRAPE_BATCH_MAX_PLACES: int = int(os.getenv("SCRAPE_BATCH_MAX_PLACES", "1000"))  # Largest accepted batch
+    JOB_LEASE_SECONDS: int = int(os.getenv("JOB_LEASE_SECONDS", "120"))  # Place lease TTL; renewed every third, expired leases are reaped
+    JOB_PENDING_TIMEOUT_HOURS: float = float(os.getenv("JOB_PENDING_TIMEOUT_HOURS", "24"))  # Pending jobs older than this are failed
+    JOB_EVENTS_KEEPALIVE_SECONDS: float = float(os.getenv("JOB_EVENTS_KEEPALIVE_SECONDS", "15"))  # Idle interval between SSE keepalives
+    SCROLL_WAIT_TIMEOUT: float = float(os.getenv("SCROLL_WAIT_TIMEOUT", "2.0"))  # Seconds to wait for new reviews per scroll
+    SCROLL_MAX_STALLS: int = int(os.getenv("SCROLL_MAX_STALLS", "2"))  # Scrolls without new reviews before stopping
+    SCRAPE_BLOCK_RESOURCES: bool = os.getenv("SCRAPE_BLOCK_RESOURCES", "true").lower() == "true"  # Disable to debug page rendering
+    SCRAPE_BLOCKED_RESOURCES: str = os.getenv("SCRAPE_BLOCKED_RESOURCES", "fonts,stylesheets,images,map_tiles,analytics,media")
+    SCRAPE_ARCHIVE_ENABLED: bool = os.getenv("SCRAPE_ARCHIVE_ENABLED", "false").lower() == "true"  # Archive page HTML for offline re-parsing
+    SCRAPE_ARCHIVE_DIR: str = os.getenv("SCRAPE_ARCHIVE_DIR", "/tmp/vibefinder-snapshots")
+    SCRAPE_MEASURE_NETWORK: bool = os.getenv("SCRAPE_MEASURE_NETWORK", "true").lower() == "true"  # Record bytes transferred per scrape
+    
+    # Periodic scrape scheduler (Celery beat)
+    SCHEDULER_ENABLED: bool = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+    SCHEDULER_INTERVAL_MINUTES: int = int(os.getenv("SCHEDULER_INTERVAL_MINUTES", "15"))  # How often refreshes are enqueued
+    SCHEDULER_SCRAPES_PER_HOUR: int = int(os.getenv("SCHEDULER_SCRAPES_PER_HOUR", "60"))  # Global refresh throughput budget
+    SCHEDULER_MIN_REFRESH_HOURS: float = float(os.getenv("SCHEDULER_MIN_REFRESH_HOURS", "6"))  # Never refresh more often than this
+    SEARCH_SCORE_HALF_LIFE_HOURS: float = float(os.getenv("SEARCH_SCORE_HALF_LIFE_HOURS", "72"))  # Decay of search popularity
+    REVIEW_VELOCITY_WINDOW_DAYS: int = int(os.getenv("REVIEW_VELOCITY_WINDOW_DAYS", "30"))  # Window for new reviews per day
+    
+    # Fleet-wide request budgets, shared by all workers through Redis
+    RATE_LIMIT_DISTRIBUTED: bool = os.getenv("RATE_LIMIT_DISTRIBUTED", "true").lower() == "true"  # Off: limit per process
+    GOOGLE_MAPS_REQUESTS_PER_MINUTE: int = int(os.getenv("GOOGLE_MAPS_REQUESTS_PER_MINUTE", "30"))  # Maps page loads, all workers
+    GOOGLE_MAPS_RATE_BURST: int = int(os.getenv("GOOGLE_MAPS_RATE_BURST", "3"))
+    PLACES_API_REQUESTS_PER_SECOND: float = float(os.getenv("PLACES_API_REQUESTS_PER_SECOND", "10"))
+    PLACES_API_RATE_BURST: int = int(os.getenv("PLACES_API_RATE_BURST", "10"))
+    
+    # HTTP response cache for Reddit and Google API clients
+    HTTP_CACHE_ENABLED: bool = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+    HTTP_CACHE_DIR: str = os.getenv("HTTP_CACHE_DIR", "/tmp/vibefinder-http-cache")
+    HTTP_CACHE_MAX_MB: int = int(os.getenv("HTTP_CACHE_MAX_MB", "512"))  # Least recently used entries evicted above this
     
     # Redis/Celery Configuration
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -51,13 +90,26 @@ class Settings(BaseSettings):
     REDDIT_CLIENT_ID: str = os.getenv("REDDIT_CLIENT_ID", "")
     REDDIT_CLIENT_SECRET: str = os.getenv("REDDIT_CLIENT_SECRET", "")
     REDDIT_USER_AGENT: str = os.getenv("REDDIT_USER_AGENT", "VibeFinder/1.0")
+    REDDIT_REQUESTS_PER_MINUTE: int = int(os.getenv("REDDIT_REQUESTS_PER_MINUTE", "100"))  # Reddit OAuth quota per client
+    REDDIT_RATE_BURST: int = int(os.getenv("REDDIT_RATE_BURST", "10"))  # Requests allowed back-to-back
+    REDDIT_SEARCH_WORKERS: int = int(os.getenv("REDDIT_SEARCH_WORKERS", "4"))  # Threads for concurrent search (1 = serial)
+    REDDIT_USE_CITY_CORPUS: bool = os.getenv("REDDIT_USE_CITY_CORPUS", "true").lower() == "true"  # Answer mentions from crawled city subreddits
+    REDDIT_CORPUS_MAX_AGE_HOURS: int = int(os.getenv("REDDIT_CORPUS_MAX_AGE_HOURS", "48"))  # Older corpora fall back to API search
+    REDDIT_CORPUS_CRAWL_HOURS: int = int(os.getenv("REDDIT_CORPUS_CRAWL_HOURS", "12"))  # How often city subreddits are re-crawled
+    REDDIT_CORPUS_POST_LIMIT: int = int(os.getenv("REDDIT_CORPUS_POST_LIMIT", "500"))  # Posts per listing per crawl
     
     # ML Configuration
     REVIEW_SAMPLE_SIZE: int = 100  # Number of reviews to analyze per restaurant
+    REVIEW_SAMPLE_HALF_LIFE_DAYS: float = float(os.getenv("REVIEW_SAMPLE_HALF_LIFE_DAYS", "180"))  # Recency weighting for sampling
     MIN_SENTIMENT_THRESHOLD: float = 0.6  # Minimum sentiment score
     VIBE_TOPIC_COUNT: int = 3  # Number of topics for LDA
     TOP_DISHES_COUNT: int = 5  # Number of top dishes to extract
     TOP_COMPLAINTS_COUNT: int = 3  # Number of complaints to show
+    NEAR_DUPLICATE_THRESHOLD: float = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))  # MinHash similarity for duplicates
+    ML_BATCH_SIZE: int = int(os.getenv("ML_BATCH_SIZE", "25"))  # Restaurants per batched ML task
+    WORKER_PRELOAD_ML: str = os.getenv("WORKER_PRELOAD_ML", "auto")  # 'auto' (workers consuming ml_processing), 'true', 'false'
+    ML_PIPELINE_MODE: str = os.getenv("ML_PIPELINE_MODE", "immediate")  # 'immediate' (task per scrape) or 'batched'
+    ML_BATCH_MAX_WAIT_SECONDS: int = int(os.getenv("ML_BATCH_MAX_WAIT_SECONDS", "60"))  # Flush partial ML groups after this
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,30 @@
+"""
+Redis Client
+
+Shared connection to the Redis instance used as the Celery broker, for
+application state that has to be visible to every worker (rate limits,
+ML batching, ...).
+"""
+
+import threading
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_redis():
+    """
+    Return the process-wide Redis client for REDIS_URL
+    
+    Timeouts are short: callers treat Redis as best-effort and fall back to
+    local behaviour rather than stalling a task.
+    """
+    global _client
+    import redis
+    from app.core.config import settings
+    
+    with _client_lock:
+        if _client is None:
+            # The connection pool resets itself after fork, so prefork workers are safe
+            _client = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+    return _client
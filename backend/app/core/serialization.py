@@ -0,0 +1,102 @@
+"""
+Celery Message Serialization
+
+Registers the 'msgpackz' kombu serializer used for the scraping and ML
+queues (see celery_config): msgpack, compressed once the packed message
+exceeds CELERY_COMPRESSION_THRESHOLD bytes. Compression uses zstd; zlib
+frames are still decoded (and can be forced with compress(codec=...)).
+
+Every message starts with one byte naming its codec, so a worker decodes
+whatever the sender chose and small messages pay no compression cost.
+Benchmark against JSON with benchmarks/serialization_benchmark.py.
+"""
+
+import os
+import zlib
+from datetime import date, datetime
+
+import msgpack
+import zstandard
+
+SERIALIZER_NAME = 'msgpackz'
+CONTENT_TYPE = 'application/x-msgpackz'
+
+# Packed messages smaller than this are sent uncompressed
+COMPRESSION_THRESHOLD = int(os.getenv('CELERY_COMPRESSION_THRESHOLD', '1024'))
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+
+# Codec byte prefixed to every message
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+# msgpack extension types
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+
+
+def _default(obj):
+    """Pack the types Celery's JSON serializer also supports"""
+    if isinstance(obj, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode())
+    if isinstance(obj, date):
+        return msgpack.ExtType(_EXT_DATE, obj.isoformat().encode())
+    raise TypeError(f"Object of type {type(obj).__name__} is not msgpack serializable")
+
+
+def _ext_hook(code: int, data: bytes):
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+def compress(body: bytes, threshold: int = None, codec: int = None) -> bytes:
+    """
+    Frame a packed body, compressing it if it is at least threshold bytes
+    
+    Args:
+        body: Packed message
+        threshold: Minimum size to compress (defaults to COMPRESSION_THRESHOLD)
+        codec: Force CODEC_ZLIB or CODEC_ZSTD (defaults to zstd)
+    """
+    threshold = COMPRESSION_THRESHOLD if threshold is None else threshold
+    if len(body) < threshold:
+        return bytes([CODEC_RAW]) + body
+    
+    if codec is None:
+        codec = CODEC_ZSTD
+    if codec == CODEC_ZSTD:
+        return bytes([CODEC_ZSTD]) + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return bytes([CODEC_ZLIB]) + zlib.compress(body, ZLIB_LEVEL)
+
+
+def decompress(data: bytes) -> bytes:
+    """Body of a framed message"""
+    codec, body = data[0], data[1:]
+    if codec == CODEC_RAW:
+        return body
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(body)
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdDecompressor().decompress(body)
+    raise ValueError(f"Unknown message codec: {codec}")
+
+
+def dumps(obj) -> bytes:
+    """Serialize a message body"""
+    return compress(msgpack.packb(obj, default=_default, use_bin_type=True))
+
+
+def loads(data) -> object:
+    """Deserialize a message body"""
+    return msgpack.unpackb(decompress(bytes(data)), ext_hook=_ext_hook, raw=False)
+
+
+def register():
+    """Register the serializer with kombu (idempotent)"""
+    from kombu.serialization import register as kombu_register
+    
+    kombu_register(SERIALIZER_NAME, dumps, loads, content_type=CONTENT_TYPE, content_encoding='binary')
@@ -8,6 +8,7 @@ This is the core FastAPI application that orchestrates:
 """
 
 from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Optional
 import os
@@ -15,6 +16,7 @@ from dotenv import load_dotenv
 
 from app.core.config import settings
 from app.api import search
+from app.services import warmup
 from app.models.restaurant import RestaurantResponse
 
 # Load environment variables
@@ -46,6 +48,13 @@ from app.api import scraping
 app.include_router(scraping.router, prefix=f"{settings.API_V1_PREFIX}/scraping", tags=["scraping"])
 
 
+@app.on_event("startup")
+async def warm_up_services():
+    """Warm up ML models in the background so startup is not blocked"""
+    if settings.WARM_UP_ON_STARTUP:
+        warmup.start_background_warmup()
+
+
 @app.get("/")
 async def root():
     """Root endpoint - API health check"""
@@ -66,6 +75,27 @@ async def health_check():
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness probe - returns 503 until the background ML warm-up has finished.
+    
+    Point load balancer health checks here (and liveness checks at /health)
+    so traffic only reaches warm workers.
+    """
+    if not settings.WARM_UP_ON_STARTUP:
+        return {"status": "ready", "warmup": "disabled"}
+    
+    warmup_state = warmup.state.to_dict()
+    if warmup.state.is_ready:
+        return {"status": "ready", "warmup": warmup_state}
+    
+    return JSONResponse(
+        status_code=503,
+        content={"status": "not_ready", "warmup": warmup_state}
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
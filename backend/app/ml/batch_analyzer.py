@@ -0,0 +1,349 @@
+"""
+Batch Analysis Module
+
+Runs the full ML pipeline (sentiment, vibes, dishes, complaints) for many
+restaurants at once.
+
+All reviews are stacked into one corpus with per-restaurant row offsets, so
+tokenization and vectorization happen once per batch instead of once per
+restaurant. Per-restaurant TF-IDF scores are then computed with sparse matrix
+operations over the stacked matrix, applying the same feature selection
+(min_df, max_df, max_features) the single-restaurant extractors use, so the
+results match KeywordExtractor / TopicModeler on each restaurant alone.
+"""
+
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+import numpy as np
+import scipy.sparse as sp
+from typing import Dict, List, Optional, Sequence
+import logging
+
+from app.ml.sentiment_analyzer import SentimentAnalyzer
+from app.ml.topic_modeler import TopicModeler
+from app.ml.keyword_extractor import KeywordExtractor
+from app.ml.near_duplicates import unique_indices
+
+logger = logging.getLogger(__name__)
+
+
+class BatchAnalyzer:
+    """Vectorized ML pipeline over many restaurants' reviews"""
+    
+    def __init__(
+        self,
+        sentiment_analyzer: Optional[SentimentAnalyzer] = None,
+        topic_modeler: Optional[TopicModeler] = None,
+        keyword_extractor: Optional[KeywordExtractor] = None,
+        duplicate_threshold: Optional[float] = 0.8
+    ):
+        """
+        Initialize batch analyzer.
+        
+        Args:
+            sentiment_analyzer: Shared SentimentAnalyzer (created if omitted)
+            topic_modeler: Shared TopicModeler (created if omitted)
+            keyword_extractor: Shared KeywordExtractor (created if omitted)
+            duplicate_threshold: MinHash similarity above which a review is
+                dropped as a near-duplicate before analysis (None disables)
+        """
+        self.sentiment_analyzer = sentiment_analyzer or SentimentAnalyzer()
+        self.topic_modeler = topic_modeler or TopicModeler()
+        self.keyword_extractor = keyword_extractor or KeywordExtractor()
+        self.duplicate_threshold = duplicate_threshold
+        
+        logger.info("Batch analyzer initialized")
+    
+    def score_reviews(self, review_lists: Sequence[Sequence[str]]) -> List[List[float]]:
+        """
+        Compute the VADER compound score of every review.
+        
+        Args:
+            review_lists: One list of review texts per restaurant
+        
+        Returns:
+            One list of compound scores per restaurant
+        """
+        return [
+            [self.sentiment_analyzer.analyze_single_review(text)['compound'] for text in reviews]
+            for reviews in review_lists
+        ]
+    
+    def analyze_batch(
+        self,
+        review_lists: Sequence[Sequence[str]],
+        sentiment_scores: Optional[Sequence[Sequence[float]]] = None,
+        top_dishes: int = 5,
+        top_complaints: int = 3,
+        max_vibes: int = 5
+    ) -> List[Dict]:
+        """
+        Analyze many restaurants in one pass.
+        
+        Args:
+            review_lists: One list of review texts per restaurant
+            sentiment_scores: Precomputed compound scores (same shape as
+                review_lists), e.g. from score_reviews()
+            top_dishes: Number of dishes per restaurant
+            top_complaints: Number of complaints per restaurant
+            max_vibes: Maximum vibe tags per restaurant
+        
+        Returns:
+            One dict per restaurant with trueSentiment, vibeCheck,
+            mustTryDishes and commonComplaints
+        """
+        review_lists = [list(reviews or []) for reviews in review_lists]
+        n_restaurants = len(review_lists)
+        
+        if n_restaurants == 0:
+            return []
+        
+        if self.duplicate_threshold is not None:
+            review_lists, sentiment_scores = self._drop_near_duplicates(review_lists, sentiment_scores)
+        
+        lengths = np.array([len(reviews) for reviews in review_lists], dtype=np.int64)
+        docs = [text for reviews in review_lists for text in reviews]
+        # Row -> restaurant index for every stacked document
+        owner = np.repeat(np.arange(n_restaurants), lengths)
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        
+        logger.info(f"Batch analyzing {n_restaurants} restaurants ({len(docs)} reviews)")
+        
+        sentiments = self._batch_sentiment(review_lists, sentiment_scores, lengths)
+        tfidf_dishes = self._batch_tfidf_dishes(docs, owner, lengths, top_dishes * 2)
+        lda_vibes = self._batch_lda_vibes(docs, owner, lengths, offsets)
+        
+        results = []
+        for idx, reviews in enumerate(review_lists):
+            try:
+                dishes = []
+                if reviews:
+                    dishes_pattern = self.keyword_extractor._extract_dishes_patterns(reviews, top_dishes * 2)
+                    dishes = self.keyword_extractor._rank_dishes(tfidf_dishes[idx], dishes_pattern, top_dishes)
+                
+                results.append({
+                    'trueSentiment': sentiments[idx],
+                    'vibeCheck': self._vibes_for(reviews, lda_vibes[idx], max_vibes),
+                    'mustTryDishes': dishes,
+                    'commonComplaints': self.keyword_extractor.extract_complaints(reviews, top_complaints)
+                })
+            except Exception as e:
+                logger.error(f"Batch analysis failed for restaurant {idx}: {e}")
+                results.append({
+                    'trueSentiment': "Analysis Error",
+                    'vibeCheck': ["#AnalysisError"],
+                    'mustTryDishes': [],
+                    'commonComplaints': []
+                })
+        
+        return results
+    
+    def _drop_near_duplicates(self, review_lists, sentiment_scores):
+        """Keep only the first of each group of near-duplicate reviews per restaurant"""
+        deduped_lists, deduped_scores = [], []
+        
+        for idx, reviews in enumerate(review_lists):
+            keep = unique_indices(reviews, self.duplicate_threshold)
+            if len(keep) < len(reviews):
+                logger.info(f"Dropped {len(reviews) - len(keep)} near-duplicate reviews for restaurant {idx}")
+            deduped_lists.append([reviews[i] for i in keep])
+            if sentiment_scores is not None:
+                deduped_scores.append([sentiment_scores[idx][i] for i in keep])
+        
+        return deduped_lists, (deduped_scores if sentiment_scores is not None else None)
+    
+    def _batch_sentiment(self, review_lists, sentiment_scores, lengths) -> List[str]:
+        """Average compound scores per restaurant and format them"""
+        
+        if not self.sentiment_analyzer.analyzer:
+            logger.warning("VADER not initialized, returning default sentiment")
+            return ["N/A"] * len(review_lists)
+        
+        if sentiment_scores is None:
+            sentiment_scores = self.score_reviews(review_lists)
+        
+        owner = np.repeat(np.arange(len(review_lists)), lengths)
+        flat_scores = np.fromiter(
+            (score for scores in sentiment_scores for score in scores),
+            dtype=np.float64,
+            count=int(lengths.sum())
+        )
+        totals = np.bincount(owner, weights=flat_scores, minlength=len(review_lists))
+        
+        sentiments = []
+        for total, count in zip(totals, lengths):
+            if count == 0:
+                sentiments.append("No reviews")
+            else:
+                sentiments.append(self.sentiment_analyzer.summarize(total / count))
+        
+        return sentiments
+    
+    def _batch_tfidf_dishes(self, docs, owner, lengths, top_n) -> List[List[str]]:
+        """Per-restaurant TF-IDF dish candidates from one stacked count matrix"""
+        
+        n_restaurants = len(lengths)
+        empty = [[] for _ in range(n_restaurants)]
+        params = self.keyword_extractor.TFIDF_PARAMS
+        
+        try:
+            vectorizer = CountVectorizer(
+                ngram_range=params['ngram_range'],
+                stop_words=params['stop_words']
+            )
+            counts = vectorizer.fit_transform(docs)
+        except ValueError as e:
+            # Empty vocabulary across the whole batch
+            logger.warning(f"Batch TF-IDF skipped: {e}")
+            return empty
+        
+        feature_names = vectorizer.get_feature_names_out()
+        kept = self._select_features(
+            counts, owner, lengths,
+            min_df=params['min_df'],
+            max_df=1.0,
+            max_features=params['max_features']
+        )
+        
+        # Smoothed IDF per (restaurant, kept feature), as TfidfVectorizer computes it
+        idf = self._restaurant_idf(kept, lengths, counts.shape[1])
+        
+        # Weight every stacked row by its own restaurant's IDF (zero for dropped features),
+        # L2-normalize rows, then average rows per restaurant
+        weighted = counts.multiply(idf[owner]).tocsr()
+        weighted = normalize(weighted, norm='l2', copy=False)
+        membership = self._membership_matrix(owner, n_restaurants)
+        mean_scores = (membership @ weighted).multiply(1.0 / np.maximum(lengths, 1)[:, None]).tocsr()
+        
+        dishes = []
+        for idx, (columns, _) in enumerate(kept):
+            if len(columns) == 0:
+                dishes.append([])
+                continue
+            avg_scores = mean_scores[idx, columns].toarray().ravel()
+            dishes.append(
+                self.keyword_extractor._select_tfidf_dishes(avg_scores, feature_names[columns], top_n)
+            )
+        
+        return dishes
+    
+    def _batch_lda_vibes(self, docs, owner, lengths, offsets) -> List[Optional[List[str]]]:
+        """
+        Per-restaurant LDA vibes from one stacked count matrix.
+        
+        Returns None for restaurants where LDA does not run (too few reviews).
+        """
+        
+        n_restaurants = len(lengths)
+        min_reviews = self.topic_modeler.MIN_REVIEWS_FOR_LDA
+        vibes: List[Optional[List[str]]] = [None] * n_restaurants
+        
+        if not np.any(lengths >= min_reviews):
+            return vibes
+        
+        params = self.topic_modeler.VECTORIZER_PARAMS
+        cleaned = [self.topic_modeler._preprocess_text(doc) for doc in docs]
+        
+        try:
+            vectorizer = CountVectorizer(stop_words=params['stop_words'])
+            counts = vectorizer.fit_transform(cleaned)
+        except ValueError as e:
+            logger.warning(f"Batch LDA skipped: {e}")
+            return [[] if length >= min_reviews else None for length in lengths]
+        
+        feature_names = vectorizer.get_feature_names_out()
+        kept = self._select_features(
+            counts, owner, lengths,
+            min_df=params['min_df'],
+            max_df=params['max_df'],
+            max_features=params['max_features']
+        )
+        
+        for idx in range(n_restaurants):
+            if lengths[idx] < min_reviews:
+                continue
+            columns, _ = kept[idx]
+            if len(columns) == 0:
+                # Same outcome as the single-restaurant path ("no terms remain")
+                vibes[idx] = []
+                continue
+            try:
+                block = counts[offsets[idx]:offsets[idx + 1]][:, columns]
+                vibes[idx] = self.topic_modeler._vibes_from_doc_term_matrix(block, feature_names[columns])
+            except Exception as e:
+                logger.error(f"LDA topic modeling failed for restaurant {idx}: {e}")
+                vibes[idx] = []
+        
+        return vibes
+    
+    def _vibes_for(self, reviews: List[str], lda_vibes, max_vibes: int) -> List[str]:
+        """Assemble vibe tags for one restaurant (mirrors TopicModeler.extract_vibes)"""
+        if len(reviews) < 3:
+            return ["#NotEnoughData"]
+        
+        cleaned = [self.topic_modeler._preprocess_text(review) for review in reviews]
+        keyword_vibes = self.topic_modeler._extract_vibes_by_keywords(cleaned)
+        return self.topic_modeler._combine_vibes(keyword_vibes, lda_vibes, max_vibes)
+    
+    @staticmethod
+    def _membership_matrix(owner: np.ndarray, n_restaurants: int) -> sp.csr_matrix:
+        """Sparse (restaurants x stacked rows) indicator matrix"""
+        n_docs = len(owner)
+        return sp.csr_matrix(
+            (np.ones(n_docs), (owner, np.arange(n_docs))),
+            shape=(n_restaurants, n_docs)
+        )
+    
+    def _select_features(self, counts, owner, lengths, min_df, max_df, max_features):
+        """
+        Apply vectorizer-style feature selection separately for each restaurant.
+        
+        Document and term frequencies for all restaurants are computed with two
+        sparse products over the stacked matrix.
+        
+        Returns:
+            List of (kept column indices, document frequencies) per restaurant,
+            columns in vocabulary order
+        """
+        membership = self._membership_matrix(owner, len(lengths))
+        binary = counts.copy()
+        binary.data = np.ones_like(binary.data)
+        
+        doc_freq = (membership @ binary).tocsr()
+        term_freq = (membership @ counts).tocsr()
+        doc_freq.sort_indices()
+        term_freq.sort_indices()
+        
+        kept = []
+        for idx, n_docs in enumerate(lengths):
+            start, end = doc_freq.indptr[idx], doc_freq.indptr[idx + 1]
+            columns = doc_freq.indices[start:end]
+            dfs = doc_freq.data[start:end]
+            tfs = term_freq.data[start:end]
+            
+            max_doc_count = max_df if isinstance(max_df, int) else max_df * n_docs
+            min_doc_count = min_df if isinstance(min_df, int) else min_df * n_docs
+            mask = (dfs >= min_doc_count) & (dfs <= max_doc_count)
+            
+            columns, dfs, tfs = columns[mask], dfs[mask], tfs[mask]
+            if max_features is not None and len(columns) > max_features:
+                top = np.sort(np.argsort(-tfs, kind='stable')[:max_features])
+                columns, dfs = columns[top], dfs[top]
+            
+            kept.append((columns, dfs))
+        
+        return kept
+    
+    @staticmethod
+    def _restaurant_idf(kept, lengths, n_features: int) -> sp.csr_matrix:
+        """Sparse (restaurants x vocabulary) matrix of smoothed IDF weights"""
+        rows, cols, values = [], [], []
+        for idx, (columns, dfs) in enumerate(kept):
+            rows.append(np.full(len(columns), idx))
+            cols.append(columns)
+            values.append(np.log((1 + lengths[idx]) / (1 + dfs)) + 1)
+        
+        return sp.csr_matrix(
+            (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(len(kept), n_features)
+        )
@@ -9,6 +9,7 @@ Uses TF-IDF and basic NLP techniques.
 """
 
 from sklearn.feature_extraction.text import TfidfVectorizer
+import numpy as np
 from typing import List, Dict, Tuple
 import logging
 import re
@@ -20,6 +21,14 @@ logger = logging.getLogger(__name__)
 class KeywordExtractor:
     """Extract keywords and phrases from reviews"""
     
+    # Vectorizer settings for dish extraction (shared with BatchAnalyzer)
+    TFIDF_PARAMS = {
+        'ngram_range': (1, 3),
+        'max_features': 100,
+        'stop_words': 'english',
+        'min_df': 2
+    }
+    
     def __init__(self):
         """Initialize keyword extractor"""
         
@@ -65,11 +74,7 @@ class KeywordExtractor:
             dishes_pattern = self._extract_dishes_patterns(reviews, top_n * 2)
             
             # Combine and rank
-            all_dishes = dishes_tfidf + dishes_pattern
-            dish_counts = Counter(all_dishes)
-            
-            # Get top dishes
-            top_dishes = [dish for dish, count in dish_counts.most_common(top_n)]
+            top_dishes = self._rank_dishes(dishes_tfidf, dishes_pattern, top_n)
             
             logger.info(f"Extracted dishes: {top_dishes}")
             return top_dishes
@@ -134,34 +139,40 @@ class KeywordExtractor:
         
         try:
             # Focus on n-grams (2-3 words) which are likely dish names
-            vectorizer = TfidfVectorizer(
-                ngram_range=(1, 3),
-                max_features=100,
-                stop_words='english',
-                min_df=2
-            )
+            vectorizer = TfidfVectorizer(**self.TFIDF_PARAMS)
             
             tfidf_matrix = vectorizer.fit_transform(reviews)
             feature_names = vectorizer.get_feature_names_out()
             
             # Get average TF-IDF scores
             avg_scores = tfidf_matrix.mean(axis=0).A1
-            top_indices = avg_scores.argsort()[-top_n * 2:][::-1]
-            
-            # Filter for food-related terms
-            dishes = []
-            for idx in top_indices:
-                term = feature_names[idx]
-                # Check if it's likely a dish (contains food indicator or is capitalized in reviews)
-                if any(food in term for food in self.food_indicators) or self._is_likely_dish(term):
-                    dishes.append(self._format_dish_name(term))
-            
-            return dishes[:top_n]
+            return self._select_tfidf_dishes(avg_scores, feature_names, top_n)
             
         except Exception as e:
             logger.error(f"TF-IDF extraction failed: {e}")
             return []
     
+    def _select_tfidf_dishes(self, avg_scores, feature_names, top_n: int) -> List[str]:
+        """Pick dish names from the highest average TF-IDF terms"""
+        # Highest score first, ties broken by term so the batch path picks the same
+        # terms; scores are rounded to absorb float noise from different summation orders
+        top_indices = np.lexsort((np.asarray(feature_names), -np.round(avg_scores, 12)))[:top_n * 2]
+        
+        # Filter for food-related terms
+        dishes = []
+        for idx in top_indices:
+            term = feature_names[idx]
+            # Check if it's likely a dish (contains food indicator or is capitalized in reviews)
+            if any(food in term for food in self.food_indicators) or self._is_likely_dish(term):
+                dishes.append(self._format_dish_name(term))
+        
+        return dishes[:top_n]
+    
+    def _rank_dishes(self, dishes_tfidf: List[str], dishes_pattern: List[str], top_n: int) -> List[str]:
+        """Combine TF-IDF and pattern candidates and return the most frequent"""
+        dish_counts = Counter(dishes_tfidf + dishes_pattern)
+        return [dish for dish, count in dish_counts.most_common(top_n)]
+    
     def _extract_dishes_patterns(self, reviews: List[str], top_n: int) -> List[str]:
         """Extract dishes using pattern matching"""
         
@@ -0,0 +1,161 @@
+"""
+Near-Duplicate Detection Module
+
+Uses MinHash signatures with Locality-Sensitive Hashing (LSH) to find
+reviews that are repeated or nearly identical - reposts, the same review
+scraped on successive runs, or copies with small edits.
+
+Duplicates inflate ML cost and skew the Counter-based dish and complaint
+rankings in KeywordExtractor, so they are marked at ingestion and dropped
+before analysis.
+"""
+
+import numpy as np
+from typing import Dict, Hashable, List, Optional, Sequence
+import logging
+import re
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# Mersenne prime used for the universal hash family (as in classic MinHash)
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class NearDuplicateDetector:
+    """MinHash/LSH index for near-duplicate review text"""
+    
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 5,
+        seed: int = 42
+    ):
+        """
+        Initialize detector.
+        
+        Args:
+            threshold: Estimated Jaccard similarity at or above which two
+                reviews are considered duplicates
+            num_perm: Number of MinHash permutations (signature length)
+            bands: Number of LSH bands (num_perm must divide evenly)
+            shingle_size: Character shingle length
+            seed: Seed for the hash permutations (fixed for reproducibility)
+        """
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be a multiple of bands")
+        
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 31, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm).astype(np.uint64)
+        
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [{} for _ in range(bands)]
+    
+    def __len__(self) -> int:
+        return len(self._signatures)
+    
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a text"""
+        shingles = self._shingles(text)
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        # (a * h + b) mod p for every permutation/shingle pair, then min per permutation
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return np.bitwise_and(permuted, _MAX_HASH).min(axis=0)
+    
+    def find_duplicate(self, text: str, signature: Optional[np.ndarray] = None) -> Optional[Hashable]:
+        """
+        Look up an indexed text that is a near-duplicate of the given text.
+        
+        Args:
+            text: Text to look up
+            signature: Precomputed signature (computed from text if omitted)
+        
+        Returns:
+            Key of the most similar indexed text, or None
+        """
+        if signature is None:
+            signature = self.signature(text)
+        
+        candidates = set()
+        for band, bucket in zip(self._band_keys(signature), self._buckets):
+            candidates.update(bucket.get(band, ()))
+        
+        best_key, best_similarity = None, self.threshold
+        for key in candidates:
+            similarity = float(np.mean(self._signatures[key] == signature))
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+        
+        return best_key
+    
+    def add(self, key: Hashable, text: str, signature: Optional[np.ndarray] = None):
+        """Index a text under the given key"""
+        if signature is None:
+            signature = self.signature(text)
+        
+        self._signatures[key] = signature
+        for band, bucket in zip(self._band_keys(signature), self._buckets):
+            bucket.setdefault(band, []).append(key)
+    
+    def add_if_unique(self, key: Hashable, text: str) -> Optional[Hashable]:
+        """
+        Index a text unless a near-duplicate is already indexed.
+        
+        Returns:
+            Key of the existing duplicate, or None if the text was added
+        """
+        signature = self.signature(text)
+        duplicate_of = self.find_duplicate(text, signature)
+        if duplicate_of is None:
+            self.add(key, text, signature)
+        return duplicate_of
+    
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+    
+    def _shingles(self, text: str) -> List[str]:
+        """Character shingles of normalized text"""
+        normalized = ' '.join(re.sub(r'[^a-z0-9\s]', ' ', (text or '').lower()).split())
+        if len(normalized) <= self.shingle_size:
+            return [normalized]
+        return list({
+            normalized[i:i + self.shingle_size]
+            for i in range(len(normalized) - self.shingle_size + 1)
+        })
+
+
+def find_duplicates(texts: Sequence[str], threshold: float = 0.8) -> List[Optional[int]]:
+    """
+    Find near-duplicates within a list of texts.
+    
+    Args:
+        texts: Review texts
+        threshold: Similarity threshold (see NearDuplicateDetector)
+    
+    Returns:
+        For each text, the index of the earlier text it duplicates, or None
+    """
+    detector = NearDuplicateDetector(threshold=threshold)
+    return [detector.add_if_unique(idx, text) for idx, text in enumerate(texts)]
+
+
+def unique_indices(texts: Sequence[str], threshold: float = 0.8) -> List[int]:
+    """Indices of the texts that are not near-duplicates of an earlier text"""
+    return [idx for idx, duplicate_of in enumerate(find_duplicates(texts, threshold)) if duplicate_of is None]
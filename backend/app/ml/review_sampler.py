@@ -0,0 +1,231 @@
+"""
+Review Sampling Module
+
+Caps the number of reviews sent through the ML pipeline per restaurant
+(settings.REVIEW_SAMPLE_SIZE) so LDA and TF-IDF cost stays bounded as stored
+reviews grow.
+
+Sampling is stratified by (star rating, source) so the sample keeps the same
+rating/source mix as the full set, and within each stratum it uses weighted
+reservoir sampling (Efraimidis-Spirakis A-Res) with recency weights, so newer
+reviews are more likely to be kept. The random draw for each review is derived
+from a hash of its content, so the same review set always yields the same
+sample and cached insights stay stable.
+"""
+
+import hashlib
+import heapq
+import logging
+import math
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Relative date units used by Google Maps ("3 weeks ago", "a month ago")
+_RELATIVE_UNITS = {
+    'minute': timedelta(minutes=1),
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+    'month': timedelta(days=30),
+    'year': timedelta(days=365),
+}
+
+_RELATIVE_DATE = re.compile(r'(\d+|an?|one)\s+(minute|hour|day|week|month|year)s?\s+ago')
+
+
+def parse_review_date(date_value, scraped_at: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Best-effort conversion of a stored review date to a datetime.
+    
+    Handles ISO dates ('2024-05-01'), Unix timestamps (Places API 'time') and
+    Google Maps relative dates ('2 weeks ago'), which are resolved against
+    scraped_at.
+    
+    Args:
+        date_value: Stored date (string, int timestamp or datetime)
+        scraped_at: When the review was scraped
+    
+    Returns:
+        datetime, or None if the date cannot be determined
+    """
+    if isinstance(date_value, datetime):
+        return date_value
+    
+    if isinstance(date_value, (int, float)):
+        return datetime.utcfromtimestamp(date_value)
+    
+    text = (date_value or '').strip().lower()
+    if not text:
+        return scraped_at
+    
+    if text.isdigit():
+        return datetime.utcfromtimestamp(int(text))
+    
+    try:
+        return datetime.strptime(text[:10], '%Y-%m-%d')
+    except ValueError:
+        pass
+    
+    if scraped_at is None:
+        return None
+    
+    if 'yesterday' in text:
+        return scraped_at - timedelta(days=1)
+    
+    match = _RELATIVE_DATE.search(text)
+    if match:
+        amount = 1 if match.group(1) in ('a', 'an', 'one') else int(match.group(1))
+        return scraped_at - amount * _RELATIVE_UNITS[match.group(2)]
+    
+    return scraped_at
+
+
+class ReviewSampler:
+    """Deterministic, recency-weighted, stratified review sampler"""
+    
+    def __init__(self, sample_size: int = 100, half_life_days: float = 180.0):
+        """
+        Initialize sampler.
+        
+        Args:
+            sample_size: Maximum number of reviews to keep per restaurant
+            half_life_days: Age at which a review's sampling weight halves
+        """
+        self.sample_size = sample_size
+        self.half_life_days = half_life_days
+    
+    def sample(self, reviews: Sequence[Dict]) -> List[int]:
+        """
+        Select which reviews to analyze.
+        
+        Args:
+            reviews: Review dicts with 'text' and optionally 'rating',
+                'source', 'date' and 'scraped_at'
+        
+        Returns:
+            Sorted indices of the selected reviews (all indices if the set
+            is already within sample_size)
+        """
+        if len(reviews) <= self.sample_size:
+            return list(range(len(reviews)))
+        
+        weights = self._recency_weights(reviews)
+        
+        strata: Dict[Tuple, List[int]] = {}
+        for idx, review in enumerate(reviews):
+            strata.setdefault(self._stratum(review), []).append(idx)
+        
+        allocation = self._allocate(strata)
+        
+        selected = []
+        for key, members in strata.items():
+            selected.extend(self._reservoir(reviews, members, weights, allocation[key]))
+        
+        logger.info(f"Sampled {len(selected)} of {len(reviews)} reviews across {len(strata)} strata")
+        return sorted(selected)
+    
+    def _stratum(self, review: Dict) -> Tuple:
+        rating = review.get('rating')
+        rating_bucket = int(round(rating)) if rating is not None else None
+        return (rating_bucket, review.get('source') or 'unknown')
+    
+    def _allocate(self, strata: Dict[Tuple, List[int]]) -> Dict[Tuple, int]:
+        """Proportional allocation (largest remainder), at least one per stratum when possible"""
+        total = sum(len(members) for members in strata.values())
+        keys = sorted(strata, key=lambda k: (-len(strata[k]), str(k)))
+        
+        if len(keys) >= self.sample_size:
+            # More strata than slots: one review from each of the largest strata
+            return {key: (1 if rank < self.sample_size else 0) for rank, key in enumerate(keys)}
+        
+        quotas = {key: self.sample_size * len(strata[key]) / total for key in keys}
+        allocation = {key: max(1, min(len(strata[key]), int(quotas[key]))) for key in keys}
+        
+        remaining = self.sample_size - sum(allocation.values())
+        by_remainder = sorted(keys, key=lambda k: (-(quotas[k] - int(quotas[k])), str(k)))
+        while remaining > 0:
+            progressed = False
+            for key in by_remainder:
+                if remaining == 0:
+                    break
+                if allocation[key] < len(strata[key]):
+                    allocation[key] += 1
+                    remaining -= 1
+                    progressed = True
+            if not progressed:
+                break
+        
+        # Minimum-one guarantees can overshoot; trim from the largest strata
+        overshoot = sum(allocation.values()) - self.sample_size
+        for key in keys:
+            if overshoot <= 0:
+                break
+            trim = min(overshoot, allocation[key] - 1)
+            allocation[key] -= trim
+            overshoot -= trim
+        
+        return allocation
+    
+    def _recency_weights(self, reviews: Sequence[Dict]) -> List[float]:
+        """Exponential decay by age relative to the newest review in the set"""
+        dates = [parse_review_date(r.get('date'), r.get('scraped_at')) for r in reviews]
+        known = [d for d in dates if d is not None]
+        
+        if not known:
+            return [1.0] * len(reviews)
+        
+        # Relative to the newest review (not "now") so the sample does not drift over time
+        newest = max(known)
+        weights = []
+        for date in dates:
+            if date is None:
+                weights.append(0.5)
+                continue
+            age_days = max((newest - date).total_seconds() / 86400, 0.0)
+            weights.append(0.5 ** (age_days / self.half_life_days))
+        
+        return weights
+    
+    def _reservoir(self, reviews, members: List[int], weights: List[float], k: int) -> List[int]:
+        """A-Res weighted reservoir sampling with content-derived random draws"""
+        if k <= 0:
+            return []
+        if k >= len(members):
+            return list(members)
+        
+        # key = u ** (1 / w); compare in log space for numerical stability
+        keyed = (
+            (math.log(self._content_uniform(reviews[idx])) / max(weights[idx], 1e-12), idx)
+            for idx in members
+        )
+        return [idx for _, idx in heapq.nlargest(k, keyed)]
+    
+    @staticmethod
+    def _content_uniform(review: Dict) -> float:
+        """Deterministic draw in (0, 1) from the review's content"""
+        content = f"{review.get('source') or ''}|{review.get('author') or ''}|{review.get('text') or ''}"
+        digest = hashlib.sha1(content.encode('utf-8')).digest()
+        return (int.from_bytes(digest[:7], 'big') + 1) / ((1 << 56) + 2)
+
+
+def sample_reviews(reviews: Sequence[Dict], sample_size: Optional[int] = None) -> List[int]:
+    """
+    Sample reviews using the configured REVIEW_SAMPLE_SIZE.
+    
+    Args:
+        reviews: Review dicts (see ReviewSampler.sample)
+        sample_size: Override for settings.REVIEW_SAMPLE_SIZE
+    
+    Returns:
+        Sorted indices of the selected reviews
+    """
+    from app.core.config import settings
+    
+    sampler = ReviewSampler(
+        sample_size=sample_size or settings.REVIEW_SAMPLE_SIZE,
+        half_life_days=settings.REVIEW_SAMPLE_HALF_LIFE_DAYS
+    )
+    return sampler.sample(reviews)
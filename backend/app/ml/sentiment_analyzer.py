@@ -59,29 +59,7 @@ class SentimentAnalyzer:
             # Calculate average sentiment
             avg_sentiment = sum(sentiments) / len(sentiments)
             
-            # Convert to percentage and categorize
-            # VADER compound scores:
-            # - positive sentiment: compound >= 0.05
-            # - neutral sentiment: -0.05 < compound < 0.05
-            # - negative sentiment: compound <= -0.05
-            
-            # Convert from [-1, 1] to [0, 100] percentage
-            # We'll consider 0.5 as neutral and scale accordingly
-            percentage = int((avg_sentiment + 1) / 2 * 100)
-            
-            # Categorize
-            if avg_sentiment >= 0.5:
-                category = "Very Positive"
-            elif avg_sentiment >= 0.05:
-                category = "Positive"
-            elif avg_sentiment >= -0.05:
-                category = "Neutral"
-            elif avg_sentiment >= -0.5:
-                category = "Negative"
-            else:
-                category = "Very Negative"
-            
-            result = f"{percentage}% {category}"
+            result = self.summarize(avg_sentiment)
             logger.info(f"Sentiment analysis result: {result}")
             
             return result
@@ -90,6 +68,40 @@ class SentimentAnalyzer:
             logger.error(f"Error analyzing sentiment: {e}")
             return "Analysis Error"
     
+    def summarize(self, avg_sentiment: float) -> str:
+        """
+        Convert an average VADER compound score into a sentiment string.
+        
+        Args:
+            avg_sentiment: Mean compound score in [-1, 1]
+        
+        Returns:
+            Sentiment string like "82% Positive"
+        """
+        # Convert to percentage and categorize
+        # VADER compound scores:
+        # - positive sentiment: compound >= 0.05
+        # - neutral sentiment: -0.05 < compound < 0.05
+        # - negative sentiment: compound <= -0.05
+        
+        # Convert from [-1, 1] to [0, 100] percentage
+        # We'll consider 0.5 as neutral and scale accordingly
+        percentage = int((avg_sentiment + 1) / 2 * 100)
+        
+        # Categorize
+        if avg_sentiment >= 0.5:
+            category = "Very Positive"
+        elif avg_sentiment >= 0.05:
+            category = "Positive"
+        elif avg_sentiment >= -0.05:
+            category = "Neutral"
+        elif avg_sentiment >= -0.5:
+            category = "Negative"
+        else:
+            category = "Very Negative"
+        
+        return f"{percentage}% {category}"
+    
     def analyze_single_review(self, review: str) -> dict:
         """
         Analyze sentiment of a single review.
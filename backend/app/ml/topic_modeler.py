@@ -19,6 +19,17 @@ logger = logging.getLogger(__name__)
 class TopicModeler:
     """Topic modeling for vibe detection using LDA"""
     
+    # Minimum number of reviews before LDA is attempted
+    MIN_REVIEWS_FOR_LDA = 10
+    
+    # Document-term matrix settings for LDA (shared with BatchAnalyzer)
+    VECTORIZER_PARAMS = {
+        'max_features': 100,
+        'stop_words': 'english',
+        'min_df': 2,
+        'max_df': 0.8
+    }
+    
     def __init__(self, n_topics: int = 3, n_top_words: int = 10):
         """
         Initialize topic modeler.
@@ -109,19 +120,15 @@ class TopicModeler:
             
             # Method 2: Topic modeling with LDA (more sophisticated)
             # Only run if we have enough data
-            if len(reviews) >= 10:
+            lda_vibes = None
+            if len(reviews) >= self.MIN_REVIEWS_FOR_LDA:
                 try:
                     lda_vibes = self._extract_vibes_by_lda(cleaned_reviews)
-                    # Combine both methods
-                    all_vibes = list(set(keyword_vibes + lda_vibes))
                 except Exception as e:
                     logger.warning(f"LDA failed, using keyword method only: {e}")
-                    all_vibes = keyword_vibes
-            else:
-                all_vibes = keyword_vibes
             
             # Return top vibes
-            result = all_vibes[:max_vibes] if all_vibes else ["#NoVibeDetected"]
+            result = self._combine_vibes(keyword_vibes, lda_vibes, max_vibes)
             logger.info(f"Extracted vibes: {result}")
             return result
             
@@ -129,6 +136,15 @@ class TopicModeler:
             logger.error(f"Error extracting vibes: {e}")
             return ["#AnalysisError"]
     
+    def _combine_vibes(self, keyword_vibes: List[str], lda_vibes, max_vibes: int) -> List[str]:
+        """Merge keyword and LDA vibes (lda_vibes is None when LDA did not run)"""
+        if lda_vibes is not None:
+            all_vibes = list(set(keyword_vibes + lda_vibes))
+        else:
+            all_vibes = keyword_vibes
+        
+        return all_vibes[:max_vibes] if all_vibes else ["#NoVibeDetected"]
+    
     def _preprocess_text(self, text: str) -> str:
         """Clean and preprocess review text"""
         # Convert to lowercase
@@ -170,44 +186,44 @@ class TopicModeler:
         
         try:
             # Create document-term matrix
-            vectorizer = CountVectorizer(
-                max_features=100,
-                stop_words='english',
-                min_df=2,
-                max_df=0.8
-            )
+            vectorizer = CountVectorizer(**self.VECTORIZER_PARAMS)
             
             doc_term_matrix = vectorizer.fit_transform(reviews)
             
-            # Run LDA
-            lda = LatentDirichletAllocation(
-                n_components=self.n_topics,
-                random_state=42,
-                max_iter=20
-            )
-            
-            lda.fit(doc_term_matrix)
-            
             # Get feature names (words)
             feature_names = vectorizer.get_feature_names_out()
             
-            # Extract top words for each topic
-            topic_words = []
-            for topic_idx, topic in enumerate(lda.components_):
-                top_indices = topic.argsort()[-self.n_top_words:][::-1]
-                top_words = [feature_names[i] for i in top_indices]
-                topic_words.extend(top_words)
-            
-            # Map topic words to vibes
-            detected_vibes = set()
-            for word in topic_words:
-                for vibe_name, vibe_data in self.vibe_mappings.items():
-                    if word in vibe_data['keywords']:
-                        detected_vibes.add(vibe_data['tag'])
-            
-            return list(detected_vibes)
+            return self._vibes_from_doc_term_matrix(doc_term_matrix, feature_names)
             
         except Exception as e:
             logger.error(f"LDA topic modeling failed: {e}")
             return []
+    
+    def _vibes_from_doc_term_matrix(self, doc_term_matrix, feature_names) -> List[str]:
+        """Fit LDA on a document-term count matrix and map topic words to vibes"""
+        
+        # Run LDA
+        lda = LatentDirichletAllocation(
+            n_components=self.n_topics,
+            random_state=42,
+            max_iter=20
+        )
+        
+        lda.fit(doc_term_matrix)
+        
+        # Extract top words for each topic
+        topic_words = []
+        for topic_idx, topic in enumerate(lda.components_):
+            top_indices = topic.argsort()[-self.n_top_words:][::-1]
+            top_words = [feature_names[i] for i in top_indices]
+            topic_words.extend(top_words)
+        
+        # Map topic words to vibes
+        detected_vibes = set()
+        for word in topic_words:
+            for vibe_name, vibe_data in self.vibe_mappings.items():
+                if word in vibe_data['keywords']:
+                    detected_vibes.add(vibe_data['tag'])
+        
+        return list(detected_vibes)
 
@@ -4,10 +4,12 @@ Database Models
 SQLAlchemy models for PostgreSQL database.
 """
 
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Boolean, create_engine
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Boolean, JSON, Index, create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 from datetime import datetime
+import os
+import threading
 from app.core.config import settings
 
 Base = declarative_base()
@@ -25,12 +27,17 @@ class Restaurant(Base):
     address = Column(Text)
     total_ratings = Column(Integer, default=0)
     last_scraped = Column(DateTime, nullable=True)  # When reviews were last scraped
+    review_watermark_id = Column(String(255), nullable=True)  # Newest stored Google review id (incremental scraping)
+    review_watermark_date = Column(DateTime, nullable=True)  # Date of the newest stored Google review
+    search_score = Column(Float, default=0.0)  # Search appearances, exponentially decayed (scrape scheduling)
+    last_searched = Column(DateTime, nullable=True)  # When the restaurant last appeared in search results
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     reviews = relationship("Review", back_populates="restaurant", cascade="all, delete-orphan")
     scraping_jobs = relationship("ScrapingJob", back_populates="restaurant", cascade="all, delete-orphan")
+    insight = relationship("RestaurantInsight", back_populates="restaurant", uselist=False, cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<Restaurant(id={self.id}, name='{self.name}', rating={self.rating})>"
@@ -49,8 +56,11 @@ class Review(Base):
     review_date = Column(String(100))
     sentiment_score = Column(Float)  # Compound sentiment score from VADER
     source = Column(String(50), default='google_maps')  # 'google_maps', 'reddit', 'yelp'
+    external_id = Column(String(255), nullable=True, index=True)  # Source review id (Google data-review-id)
+    content_hash = Column(String(64), nullable=True, unique=True, index=True)  # restaurant + source + author + normalized text
     scraped_at = Column(DateTime, default=datetime.utcnow)  # When review was scraped
     is_processed = Column(Boolean, default=False)  # Whether ML analysis is complete
+    is_duplicate = Column(Boolean, default=False, index=True)  # Near-duplicate of another review (skipped by ML)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -60,18 +70,71 @@ class Review(Base):
         return f"<Review(id={self.id}, restaurant_id={self.restaurant_id}, rating={self.rating}, source={self.source})>"
 
 
+class RestaurantInsight(Base):
+    """Restaurant insight model - ML results computed in the background, served by search"""
+    
+    __tablename__ = "restaurant_insights"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), unique=True, nullable=False)
+    true_sentiment = Column(String(50))
+    vibe_check = Column(JSON)  # List of vibe tags
+    must_try_dishes = Column(JSON)  # List of dish names
+    common_complaints = Column(JSON)  # List of complaint phrases
+    review_count = Column(Integer, default=0)  # Processed reviews the insights were computed from
+    review_set_hash = Column(String(64))  # Fingerprint of that review set (recompute only when it changes)
+    computed_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    restaurant = relationship("Restaurant", back_populates="insight")
+    
+    def __repr__(self):
+        return f"<RestaurantInsight(restaurant_id={self.restaurant_id}, reviews={self.review_count})>"
+
+
+class RedditCorpusItem(Base):
+    """Reddit post or comment from a crawled city subreddit (shared by all restaurants in the city)"""
+    
+    __tablename__ = "reddit_corpus"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    subreddit = Column(String(100), nullable=False, index=True)  # Lowercased subreddit name
+    reddit_id = Column(String(20), unique=True, nullable=False)  # Fullname, e.g. 't3_abc123' or 't1_def456'
+    kind = Column(String(10), nullable=False)  # 'post' or 'comment'
+    post_id = Column(String(20), index=True)  # Fullname of the post a comment belongs to
+    title = Column(Text)
+    text = Column(Text, nullable=False)
+    author = Column(String(255))
+    score = Column(Integer, default=0)
+    created_at = Column(DateTime)  # When it was posted on Reddit
+    crawled_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<RedditCorpusItem(id={self.id}, subreddit='{self.subreddit}', kind={self.kind})>"
+
+
 class ScrapingJob(Base):
     """Scraping job model - tracks background scraping tasks"""
     
     __tablename__ = "scraping_jobs"
+    __table_args__ = (
+        # At most one pending/running job per place (see app.services.job_lifecycle)
+        Index(
+            'ix_scraping_jobs_active_place', 'place_id', unique=True,
+            postgresql_where=text("status IN ('pending', 'running')"),
+            sqlite_where=text("status IN ('pending', 'running')")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False)
     place_id = Column(String(255), nullable=False)
     status = Column(String(50), default='pending')  # pending, running, completed, failed
     reviews_scraped = Column(Integer, default=0)
+    batch_id = Column(String(32), nullable=True, index=True)  # Set for jobs created by a batch trigger
     error_message = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)  # Set by the pending -> running transition
     completed_at = Column(DateTime, nullable=True)
     
     # Relationships
@@ -91,11 +154,27 @@ def get_engine():
     )
 
 
+_session_local = None
+_session_local_pid = None
+_session_local_lock = threading.Lock()
+
+
 def get_session_local():
-    """Create database session factory"""
-    engine = get_engine()
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    return SessionLocal
+    """
+    Return the process-wide session factory
+    
+    The engine and its connection pool are created once per process, so
+    requests and tasks reuse pooled connections instead of building a new
+    engine each time. A forked worker builds its own rather than sharing
+    the parent's sockets.
+    """
+    global _session_local, _session_local_pid
+    
+    with _session_local_lock:
+        if _session_local is None or _session_local_pid != os.getpid():
+            _session_local = sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+            _session_local_pid = os.getpid()
+    return _session_local
 
 
 def init_db():
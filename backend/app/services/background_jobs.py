@@ -5,176 +5,744 @@ Celery tasks for asynchronous scraping and ML processing.
 """
 
 from celery import shared_task
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
 import logging
-from typing import Optional
-from datetime import datetime
+import time
+from collections import defaultdict
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# Set in the worker's main process when ML models are preloaded; inherited by pool processes
+_ml_preloaded = False
 
-@shared_task(bind=True, name='app.services.background_jobs.scrape_restaurant_task')
-def scrape_restaurant_task(self, place_id: str, restaurant_id: Optional[int] = None):
+
+def _wants_ml(worker) -> bool:
+    """Whether a worker should preload ML models (WORKER_PRELOAD_ML)"""
+    from app.core.config import settings
+    
+    mode = settings.WORKER_PRELOAD_ML.lower()
+    if mode in ('true', 'false'):
+        return mode == 'true'
+    try:
+        return 'ml_processing' in worker.app.amqp.queues.consume_from
+    except Exception:
+        # Queues unknown: the worker consumes everything, ML included
+        return True
+
+
+@worker_init.connect
+def _preload_ml_models(sender=None, **kwargs):
     """
-    Background task to scrape restaurant reviews
+    Load and warm the ML models in the worker's main process
+    
+    Runs before the prefork pool starts, so every pool process inherits the
+    loaded models and shares their memory pages copy-on-write instead of
+    building its own copy on its first task.
+    """
+    global _ml_preloaded
+    import gc
+    from app.services import warmup
+    
+    if not _wants_ml(sender):
+        return
+    
+    timings = warmup.run_warmup(services=warmup.ML_SERVICES)
+    _ml_preloaded = True
+    # Keep the cyclic GC from touching (and so un-sharing) the preloaded objects in children
+    gc.freeze()
+    logger.info(f"Preloaded ML models for pool processes (ms): {timings}")
+
+
+@worker_process_init.connect
+def _init_ml_models(**kwargs):
+    """Warm ML models in a pool process if they were not inherited from the main process"""
+    from app.services import registry, warmup
+    
+    if _ml_preloaded and not registry.is_loaded('batch_analyzer'):
+        warmup.run_warmup(services=warmup.ML_SERVICES)
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+@worker_process_shutdown.connect
+def _close_browser_pool(**kwargs):
+    """Quit pooled browsers when a worker process exits"""
+    from app.services.browser_pool import close_browser_pool
+    close_browser_pool()
+
+
+def _build_duplicate_index(db, restaurant_id: int):
+    """
+    Build a near-duplicate index over a restaurant's stored unique reviews
     
     Args:
-        place_id: Google Places ID
-        restaurant_id: Database restaurant ID (optional)
-        
+        db: Database session
+        restaurant_id: Database restaurant ID
+    
     Returns:
-        Dict with scraping results
+        NearDuplicateDetector seeded with the stored reviews
+    """
+    from app.ml.near_duplicates import NearDuplicateDetector
+    from app.models.database import Review
+    from app.core.config import settings
+    
+    detector = NearDuplicateDetector(threshold=settings.NEAR_DUPLICATE_THRESHOLD)
+    
+    stored = db.query(Review.id, Review.review_text).filter(
+        Review.restaurant_id == restaurant_id,
+        Review.is_duplicate == False
+    ).all()
+    
+    for review_id, review_text in stored:
+        detector.add(review_id, review_text)
+    
+    return detector
+
+
+def _mark_duplicate(duplicate_index, text: str) -> bool:
+    """Check text against the index, adding it if it is new content"""
+    if duplicate_index is None:
+        return False
+    
+    key = ('new', len(duplicate_index))
+    return duplicate_index.add_if_unique(key, text) is not None
+
+
+def _review_rows(restaurant_id: int, source: str, reviews: List[dict], known_keys: set, duplicate_index, scraped_at: datetime) -> List[dict]:
+    """
+    Build Review column dicts for the scraped reviews that are not stored yet
+    
+    Args:
+        restaurant_id: Database restaurant ID
+        source: Review source ('google_maps' or 'reddit')
+        reviews: Scraped review dicts
+        known_keys: Stored review keys (see review_store.stored_review_keys), updated in place
+        duplicate_index: Near-duplicate index, updated in place (may be None)
+        scraped_at: Scrape timestamp
     """
+    from app.services.review_store import is_new_review, review_content_hash
+    
+    rows = []
+    for review_data in reviews:
+        # Only save new reviews with text
+        if not review_data.get('text') or not is_new_review(known_keys, restaurant_id, source, review_data):
+            continue
+        
+        rows.append({
+            'restaurant_id': restaurant_id,
+            'review_text': review_data['text'],
+            'rating': review_data.get('rating'),
+            'author': review_data.get('author'),
+            'review_date': review_data.get('date'),
+            'source': source,
+            'external_id': review_data.get('review_id') or None,
+            'content_hash': review_content_hash(restaurant_id, source, review_data.get('author'), review_data['text']),
+            'scraped_at': scraped_at,
+            'is_processed': False,
+            'is_duplicate': _mark_duplicate(duplicate_index, review_data['text'])
+        })
+    
+    return rows
+
+
+def _review_watermark(restaurant) -> Optional[dict]:
+    """Incremental-scraping watermark stored on a restaurant, if any"""
+    if not restaurant or not (restaurant.review_watermark_id or restaurant.review_watermark_date):
+        return None
+    return {
+        'review_id': restaurant.review_watermark_id,
+        'date': restaurant.review_watermark_date
+    }
+
+
+def _advance_watermark(restaurant, reviews: List[dict], scraped_at: datetime):
+    """Move a restaurant's watermark to the newest of the scraped reviews"""
+    from app.ml.review_sampler import parse_review_date
+    
+    dated = [
+        (parse_review_date(review.get('date'), scraped_at), -idx, review)
+        for idx, review in enumerate(reviews)
+    ]
+    dated = [entry for entry in dated if entry[0] is not None]
+    if not dated:
+        return
+    
+    newest_date, _, newest = max(dated, key=lambda entry: entry[:2])
+    if restaurant.review_watermark_date and newest_date < restaurant.review_watermark_date:
+        return
+    
+    restaurant.review_watermark_id = newest.get('review_id') or None
+    restaurant.review_watermark_date = newest_date
+
+
+def _queue_ml(restaurant_ids: List[int]):
+    """
+    Queue ML for restaurants with new reviews according to ML_PIPELINE_MODE
+    
+    'immediate' sends a task right away; 'batched' adds the restaurants to
+    the shared ML buffer and releases any full group (partial groups are
+    released by flush_ml_batches_task). If Redis is unavailable the
+    restaurants are sent immediately.
+    """
+    from app.core.config import settings
+    
+    if settings.ML_PIPELINE_MODE == 'batched':
+        from redis.exceptions import RedisError
+        from app.services.ml_pipeline import get_ml_buffer
+        
+        try:
+            buffer = get_ml_buffer()
+            buffer.add(restaurant_ids)
+        except RedisError as e:
+            logger.warning(f"ML buffer unavailable, queueing ML immediately: {e}")
+        else:
+            try:
+                _release_ml_groups(buffer)
+            except Exception as e:
+                # The restaurants are in the buffer; the periodic flush releases them
+                logger.warning(f"Could not release ML groups, leaving them for the next flush: {e}")
+            return
+    
+    if len(restaurant_ids) == 1:
+        process_ml_task.delay(restaurant_ids[0])
+    else:
+        process_ml_batch_task.delay(restaurant_ids=restaurant_ids)
+
+
+def _release_ml_groups(buffer, max_wait: Optional[float] = None) -> int:
+    """Send one process_ml_batch_task per ready group in the ML buffer"""
+    from app.core.config import settings
+    
+    groups = 0
+    while True:
+        # A group whose task cannot be sent goes back into the buffer
+        with buffer.claim(max(1, settings.ML_BATCH_SIZE), max_wait) as restaurant_ids:
+            if not restaurant_ids:
+                return groups
+            process_ml_batch_task.delay(restaurant_ids=restaurant_ids)
+        groups += 1
+        logger.info(f"Released ML group of {len(restaurant_ids)} restaurants")
+
+
+def _http_cache_stats() -> Optional[dict]:
+    """Response cache hit ratios for this worker process (None when disabled)"""
+    from app.services.http_cache import get_http_cache
+    
+    cache = get_http_cache()
+    return cache.stats() if cache else None
+
+
+def _review_sample_fields(review) -> dict:
+    """Fields ReviewSampler stratifies and weights on, from a Review row"""
+    return {
+        'text': review.review_text,
+        'rating': review.rating,
+        'source': review.source,
+        'author': review.author,
+        'date': review.review_date,
+        'scraped_at': review.scraped_at
+    }
+
+
+def _google_scraper():
+    """GoogleMapsScraper configured from settings, leasing browsers from this worker process's pool"""
     from app.services.google_maps_scraper import GoogleMapsScraper
-    from app.services.reddit_scraper import RedditScraper
-    from app.models.database import get_session_local, Restaurant, Review, ScrapingJob
+    from app.services.browser_pool import get_browser_pool
+    from app.services.snapshot_archive import get_snapshot_archive
     from app.core.config import settings
     
-    logger.info(f"Starting scraping task for place_id: {place_id}")
+    return GoogleMapsScraper(
+        delay_seconds=settings.SCRAPING_DELAY_SECONDS,
+        browser_pool=get_browser_pool(),
+        scroll_timeout=settings.SCROLL_WAIT_TIMEOUT,
+        max_stalls=settings.SCROLL_MAX_STALLS,
+        block_resources=settings.SCRAPE_BLOCK_RESOURCES,
+        blocked_resources=[c.strip() for c in settings.SCRAPE_BLOCKED_RESOURCES.split(',') if c.strip()],
+        archive=get_snapshot_archive()
+    )
+
+
+def _store_scrape(db, restaurant, google_reviews: List[dict]) -> Tuple[int, int]:
+    """
+    Save scraped Google reviews plus supplementary Reddit mentions for a restaurant
     
-    # Create database session
-    SessionLocal = get_session_local()
-    db = SessionLocal()
+    Also advances the review watermark and last_scraped.
     
-    # Create or update scraping job
-    job = None
-    if restaurant_id:
-        job = ScrapingJob(
-            restaurant_id=restaurant_id,
-            place_id=place_id,
-            status='running'
-        )
-        db.add(job)
+    Args:
+        db: Database session
+        restaurant: Restaurant row
+        google_reviews: Reviews from GoogleMapsScraper
+    
+    Returns:
+        (reviews stored, near-duplicates among them)
+    """
+    from app.services import registry
+    from app.services.review_store import bulk_insert_reviews, stored_review_keys
+    
+    reviews_scraped = 0
+    duplicates_found = 0
+    
+    # Index stored reviews so reposts and re-scraped text are marked as duplicates
+    duplicate_index = _build_duplicate_index(db, restaurant.id)
+    known_keys = stored_review_keys(db, restaurant.id)
+    
+    # 1. Save Google reviews to database
+    if google_reviews:
+        scraped_at = datetime.utcnow()
+        rows = _review_rows(restaurant.id, 'google_maps', google_reviews, known_keys, duplicate_index, scraped_at)
+        inserted, duplicates = bulk_insert_reviews(db, rows)
+        reviews_scraped += inserted
+        duplicates_found += duplicates
+        
+        _advance_watermark(restaurant, google_reviews, scraped_at)
         db.commit()
-        db.refresh(job)
+        logger.info(f"Saved {inserted} new Google reviews to database ({duplicates} near-duplicates)")
     
+    # 2. Try Reddit scraping (supplementary)
     try:
-        reviews_scraped = 0
+        logger.info("Attempting Reddit scraping...")
+        reddit_scraper = registry.get_reddit_scraper()
         
-        # 1. Scrape Google Maps reviews
-        logger.info("Scraping Google Maps...")
-        google_scraper = GoogleMapsScraper(delay_seconds=settings.SCRAPING_DELAY_SECONDS)
+        # Search by the restaurant's stored name and address; answered from
+        # the crawled city corpus when available
+        reddit_reviews = reddit_scraper.search_restaurant_mentions(
+            restaurant_name=restaurant.name,
+            location=restaurant.address,
+            db=db
+        )
         
-        google_reviews = google_scraper.scrape_restaurant_reviews(
-            place_id=place_id,
-            max_reviews=settings.MAX_REVIEWS_PER_RESTAURANT
+        # Save Reddit mentions
+        rows = _review_rows(
+            restaurant.id, 'reddit', reddit_reviews[:20],  # Limit Reddit reviews
+            known_keys, duplicate_index, datetime.utcnow()
         )
+        inserted, duplicates = bulk_insert_reviews(db, rows)
+        reviews_scraped += inserted
+        duplicates_found += duplicates
         
-        logger.info(f"Scraped {len(google_reviews)} reviews from Google Maps")
-        
-        # 2. Save Google reviews to database
-        if restaurant_id and google_reviews:
-            for review_data in google_reviews:
-                if review_data.get('text'):  # Only save reviews with text
-                    review = Review(
-                        restaurant_id=restaurant_id,
-                        review_text=review_data['text'],
-                        rating=review_data.get('rating'),
-                        author=review_data.get('author'),
-                        review_date=review_data.get('date'),
-                        source='google_maps',
-                        scraped_at=datetime.utcnow(),
-                        is_processed=False
-                    )
-                    db.add(review)
-                    reviews_scraped += 1
-            
-            db.commit()
-            logger.info(f"Saved {reviews_scraped} Google reviews to database")
+        db.commit()
+        logger.info(f"Saved {inserted} new Reddit mentions to database")
+    
+    except Exception as e:
+        logger.warning(f"Reddit scraping failed (non-critical): {e}")
+    
+    # 3. Update restaurant last_scraped timestamp
+    restaurant.last_scraped = datetime.utcnow()
+    db.commit()
+    
+    return reviews_scraped, duplicates_found
+
+
+@shared_task(bind=True, max_retries=3, name='app.services.background_jobs.scrape_restaurant_task')
+def scrape_restaurant_task(self, job_id: int):
+    """
+    Background task to scrape restaurant reviews
+    
+    The job row is created by whoever queued the scrape (see
+    app.services.job_lifecycle.create_jobs). The task holds a lease on the
+    place while it runs and moves the job pending -> running ->
+    completed/failed with compare-and-set transitions, so a duplicate or
+    redelivered message for the same job does nothing. If another job still
+    holds the lease, the task retries once it could have expired and fails
+    the job when retries run out.
+    
+    Args:
+        job_id: ScrapingJob ID
+    
+    Returns:
+        Dict with scraping results
+    """
+    from app.models.database import get_session_local, Restaurant, ScrapingJob
+    from app.services.job_lifecycle import PlaceLeases, transition
+    from app.services.job_events import publish_job_event
+    from app.core.redis_client import get_redis
+    from app.core.config import settings
+    
+    # Create database session
+    SessionLocal = get_session_local()
+    db = SessionLocal()
+    google_scraper = None
+    
+    try:
+        job = db.get(ScrapingJob, job_id)
+        if job is None:
+            logger.warning(f"Scraping job {job_id} not found")
+            return {'status': 'missing', 'job_id': job_id}
+        place_id, restaurant_id = job.place_id, job.restaurant_id
         
-        # 3. Try Reddit scraping (supplementary)
-        try:
-            logger.info("Attempting Reddit scraping...")
-            reddit_scraper = RedditScraper()
+        with PlaceLeases(get_redis(), {place_id: job_id}, settings.JOB_LEASE_SECONDS) as leases:
+            if not leases.held:
+                # Wait out the other job's lease rather than leave ours pending until it is reaped
+                if self.request.retries < self.max_retries:
+                    logger.info(f"Job {job_id}: {place_id} is leased by another job, retrying")
+                    raise self.retry(countdown=settings.JOB_LEASE_SECONDS)
+                transition(db, job_id, ['pending'], 'failed',
+                           error_message='Place is leased by another job', completed_at=datetime.utcnow())
+                return {'status': 'failed', 'job_id': job_id, 'place_id': place_id}
+            if not transition(db, job_id, ['pending'], 'running', started_at=datetime.utcnow()):
+                return {'status': 'skipped', 'job_id': job_id, 'place_id': place_id}
+            
+            logger.info(f"Starting scraping job {job_id} for place_id: {place_id}")
             
-            # Get restaurant name from database
-            if restaurant_id:
-                restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
-                if restaurant:
-                    reddit_reviews = reddit_scraper.search_restaurant_mentions(
-                        restaurant_name=restaurant.name,
-                        location=restaurant.address
+            try:
+                restaurant = db.get(Restaurant, restaurant_id)
+                
+                # 1. Scrape Google Maps reviews
+                logger.info("Scraping Google Maps...")
+                # Lease a browser from this worker process's pool instead of launching Chrome per job
+                google_scraper = _google_scraper()
+                
+                # With a watermark only reviews newer than the last scrape are fetched
+                google_reviews = google_scraper.scrape_restaurant_reviews(
+                    place_id=place_id,
+                    max_reviews=settings.MAX_REVIEWS_PER_RESTAURANT,
+                    watermark=_review_watermark(restaurant),
+                    progress=lambda phase, loaded: publish_job_event(
+                        job_id, 'running', place_id=place_id, phase=phase, reviews_loaded=loaded
                     )
-                    
-                    # Save Reddit mentions
-                    for review_data in reddit_reviews[:20]:  # Limit Reddit reviews
-                        if review_data.get('text'):
-                            review = Review(
-                                restaurant_id=restaurant_id,
-                                review_text=review_data['text'],
-                                author=review_data.get('author'),
-                                review_date=review_data.get('date'),
-                                source='reddit',
-                                scraped_at=datetime.utcnow(),
-                                is_processed=False
-                            )
-                            db.add(review)
-                            reviews_scraped += 1
-                    
-                    db.commit()
-                    logger.info(f"Saved {len(reddit_reviews)} Reddit mentions to database")
-        
-        except Exception as e:
-            logger.warning(f"Reddit scraping failed (non-critical): {e}")
-        
-        # 4. Update restaurant last_scraped timestamp
-        if restaurant_id:
-            restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
-            if restaurant:
-                restaurant.last_scraped = datetime.utcnow()
-                db.commit()
-        
-        # 5. Update scraping job status
-        if job:
-            job.status = 'completed'
-            job.reviews_scraped = reviews_scraped
-            job.completed_at = datetime.utcnow()
-            db.commit()
-        
-        # 6. Trigger ML processing
-        if reviews_scraped > 0 and restaurant_id:
-            process_ml_task.delay(restaurant_id)
-        
-        logger.info(f"Scraping task completed successfully. Total reviews: {reviews_scraped}")
+                )
+                
+                logger.info(f"Scraped {len(google_reviews)} reviews from Google Maps")
+                publish_job_event(job_id, 'running', place_id=place_id, phase='store', reviews_loaded=len(google_reviews))
+                
+                # 2. Save Google reviews and Reddit mentions
+                reviews_scraped, duplicates_found = _store_scrape(db, restaurant, google_reviews)
+                
+                # 3. Complete the job
+                transition(db, job_id, ['running'], 'completed',
+                           reviews_scraped=reviews_scraped, completed_at=datetime.utcnow())
+            
+            except Exception as e:
+                logger.error(f"Error in scraping job {job_id}: {e}", exc_info=True)
+                db.rollback()
+                
+                # Back to pending while a retry is scheduled, so the retry can claim it again
+                retrying = self.request.retries < self.max_retries
+                if retrying:
+                    transition(db, job_id, ['running'], 'pending', error_message=str(e))
+                else:
+                    transition(db, job_id, ['running'], 'failed',
+                               error_message=str(e), completed_at=datetime.utcnow())
+                
+                # Retry the task
+                raise self.retry(exc=e, countdown=60)
+        
+        # 4. Trigger ML processing (only if there is new unique content)
+        if reviews_scraped - duplicates_found > 0:
+            _queue_ml([restaurant_id])
+        
+        logger.info(f"Scraping task completed successfully. Total reviews: {reviews_scraped} ({duplicates_found} near-duplicates)")
         
         return {
             'status': 'success',
+            'job_id': job_id,
             'place_id': place_id,
-            'reviews_scraped': reviews_scraped
+            'reviews_scraped': reviews_scraped,
+            'duplicates_found': duplicates_found,
+            'scrape_metrics': google_scraper.last_metrics,
+            'http_cache': _http_cache_stats()
         }
+    
+    finally:
+        if google_scraper:
+            google_scraper.close()
+        db.close()
+
+
+@shared_task(name='app.services.background_jobs.scrape_batch_task')
+def scrape_batch_task(batch_id: str, place_ids: List[str], chunk_size: Optional[int] = None):
+    """
+    Create jobs for a list of places and fan them out in chunks
+    
+    Unknown places get restaurant rows and every job is created in one bulk
+    insert; places that already have a pending/running job are skipped.
+    Each chunk is scraped by one scrape_chunk_task on a single browser.
+    
+    Args:
+        batch_id: Batch identifier stored on every job (see GET /scraping/batch/{batch_id})
+        place_ids: Google Places IDs
+        chunk_size: Places per chunk task (defaults to SCRAPE_BATCH_CHUNK_SIZE)
+    
+    Returns:
+        Dict with the number of jobs and chunks queued and the places skipped
+    """
+    from app.services.review_store import dialect_insert
+    from app.services.job_lifecycle import create_jobs, fail_unqueued_jobs
+    from app.models.database import get_session_local, Restaurant
+    from app.core.config import settings
+    
+    place_ids = list(dict.fromkeys(place_ids))
+    chunk_size = max(1, chunk_size or settings.SCRAPE_BATCH_CHUNK_SIZE)
+    
+    SessionLocal = get_session_local()
+    db = SessionLocal()
+    
+    try:
+        db.execute(
+            dialect_insert(db)(Restaurant)
+            .values([{'place_id': place_id, 'name': f"Restaurant_{place_id[:8]}"} for place_id in place_ids])
+            .on_conflict_do_nothing(index_elements=['place_id'])
+        )
+        restaurant_ids = dict(
+            db.query(Restaurant.place_id, Restaurant.id).filter(Restaurant.place_id.in_(place_ids)).all()
+        )
+        # Places with a job in flight are skipped by the insert itself
+        created = create_jobs(db, [(restaurant_ids[place_id], place_id) for place_id in place_ids], batch_id=batch_id)
+        job_ids = [created[place_id] for place_id in place_ids if place_id in created]
+        busy = {place_id for place_id in place_ids if place_id not in created}
+        db.commit()
         
-    except Exception as e:
-        logger.error(f"Error in scraping task: {e}", exc_info=True)
+        chunks = [job_ids[i:i + chunk_size] for i in range(0, len(job_ids), chunk_size)]
+        for sent, chunk in enumerate(chunks):
+            try:
+                scrape_chunk_task.delay(chunk)
+            except Exception as e:
+                # The broker is unreachable: fail this chunk's jobs and every later one's
+                logger.error(f"Batch {batch_id}: failed to queue chunk {sent + 1}/{len(chunks)}: {e}")
+                fail_unqueued_jobs(db, [job_id for unsent in chunks[sent:] for job_id in unsent], e)
+                raise
+    finally:
+        db.close()
+    
+    logger.info(f"Batch {batch_id}: queued {len(job_ids)} jobs in {len(chunks)} chunks, skipped {len(busy)} in progress")
+    return {'status': 'success', 'batch_id': batch_id, 'jobs': len(job_ids), 'chunks': len(chunks), 'skipped': sorted(busy)}
+
+
+@shared_task(name='app.services.background_jobs.scrape_chunk_task')
+def scrape_chunk_task(job_ids: List[int]):
+    """
+    Scrape a chunk of batch jobs with one leased browser
+    
+    Places are scraped concurrently in tabs (see
+    GoogleMapsScraper.scrape_many_restaurants); results are stored per job,
+    so one failing place does not fail the rest of the chunk. Places the
+    scraper could not scrape fail their job without touching last_scraped. ML for the
+    restaurants with new content is queued as a single batch task.
+    
+    Like scrape_restaurant_task, each job is claimed under a place lease
+    with a pending -> running transition; jobs claimed elsewhere are skipped.
+    Each job's scrape progress is published as job events too.
+    
+    Args:
+        job_ids: ScrapingJob IDs created by scrape_batch_task
+    
+    Returns:
+        Dict with per-status job counts and reviews stored
+    """
+    from app.models.database import get_session_local, Restaurant, ScrapingJob
+    from app.services.job_lifecycle import PlaceLeases, transition
+    from app.services.job_events import publish_job_event
+    from app.core.redis_client import get_redis
+    from app.core.config import settings
+    
+    SessionLocal = get_session_local()
+    db = SessionLocal()
+    google_scraper = None
+    
+    try:
+        pending = db.query(ScrapingJob.id, ScrapingJob.place_id, ScrapingJob.restaurant_id).filter(
+            ScrapingJob.id.in_(job_ids),
+            ScrapingJob.status == 'pending'
+        ).all()
+        if not pending:
+            return {'status': 'success', 'completed': 0, 'failed': 0, 'reviews_scraped': 0}
+        
+        with PlaceLeases(get_redis(), {job.place_id: job.id for job in pending}, settings.JOB_LEASE_SECONDS) as leases:
+            jobs = [
+                job for job in pending
+                if job.place_id in leases.held
+                and transition(db, job.id, ['pending'], 'running', started_at=datetime.utcnow())
+            ]
+            if not jobs:
+                return {'status': 'success', 'completed': 0, 'failed': 0, 'reviews_scraped': 0}
+            
+            restaurants = {
+                restaurant.id: restaurant
+                for restaurant in db.query(Restaurant).filter(Restaurant.id.in_([job.restaurant_id for job in jobs])).all()
+            }
+            
+            job_for_place = {job.place_id: job.id for job in jobs}
+            try:
+                google_scraper = _google_scraper()
+                results = google_scraper.scrape_many_restaurants(
+                    [job.place_id for job in jobs],
+                    max_reviews=settings.MAX_REVIEWS_PER_RESTAURANT,
+                    tabs=settings.SCRAPE_TABS_PER_BROWSER,
+                    watermarks={job.place_id: _review_watermark(restaurants.get(job.restaurant_id)) for job in jobs},
+                    progress=lambda place_id, phase, loaded: publish_job_event(
+                        job_for_place[place_id], 'running', place_id=place_id, phase=phase, reviews_loaded=loaded
+                    )
+                )
+            except Exception as e:
+                # Scraper setup failed (scrape errors themselves leave places out of results)
+                logger.error(f"Error in batch chunk {job_ids}: {e}", exc_info=True)
+                for job in jobs:
+                    transition(db, job.id, ['running'], 'failed', error_message=str(e), completed_at=datetime.utcnow())
+                raise
+            
+            counts = defaultdict(int)
+            ml_restaurant_ids = []
+            for job in jobs:
+                if job.place_id not in results:
+                    # The scraper dropped the place (tab error or browser crash); storing nothing
+                    # would mark it freshly scraped and keep the scheduler away for hours
+                    transition(db, job.id, ['running'], 'failed',
+                               error_message='Scrape failed in browser', completed_at=datetime.utcnow())
+                    counts['failed'] += 1
+                    continue
+                try:
+                    publish_job_event(job.id, 'running', place_id=job.place_id, phase='store',
+                                      reviews_loaded=len(results[job.place_id]))
+                    reviews_scraped, duplicates_found = _store_scrape(db, restaurants[job.restaurant_id], results[job.place_id])
+                    transition(db, job.id, ['running'], 'completed',
+                               reviews_scraped=reviews_scraped, completed_at=datetime.utcnow())
+                    counts['completed'] += 1
+                    counts['reviews_scraped'] += reviews_scraped
+                    if reviews_scraped - duplicates_found > 0:
+                        ml_restaurant_ids.append(job.restaurant_id)
+                except Exception as e:
+                    logger.error(f"Failed to store batch job {job.id} ({job.place_id}): {e}", exc_info=True)
+                    db.rollback()
+                    transition(db, job.id, ['running'], 'failed', error_message=str(e), completed_at=datetime.utcnow())
+                    counts['failed'] += 1
         
-        # Update job status to failed
-        if job:
-            job.status = 'failed'
-            job.error_message = str(e)
-            job.completed_at = datetime.utcnow()
-            db.commit()
+        if ml_restaurant_ids:
+            _queue_ml(ml_restaurant_ids)
         
-        # Retry the task
-        raise self.retry(exc=e, countdown=60, max_retries=3)
+        logger.info(f"Chunk of {len(jobs)} jobs done: {dict(counts)}")
+        return {
+            'status': 'success',
+            'completed': counts['completed'],
+            'failed': counts['failed'],
+            'reviews_scraped': counts['reviews_scraped'],
+            'scrape_metrics': google_scraper.last_metrics
+        }
     
     finally:
-        google_scraper.close()
+        if google_scraper:
+            google_scraper.close()
         db.close()
 
 
+def _run_ml(db, restaurant_ids: List[int], reprocess: bool = False) -> dict:
+    """
+    Score unprocessed reviews and refresh stored insights for restaurants
+    
+    Only reviews without a score (or all, with reprocess) are scored.
+    Insights are recomputed from each restaurant's full processed review set
+    and stored only when that set differs from the one the stored insights
+    were computed from (or with reprocess).
+    
+    Args:
+        db: Database session
+        restaurant_ids: Database restaurant IDs
+        reprocess: Re-score every review and recompute every insight
+    
+    Returns:
+        Dict with reviews_processed, per-restaurant insights (recomputed
+        ones only), unchanged restaurant ids and timings_ms
+    """
+    from app.services import registry
+    from app.services.insight_store import load_insights, review_set_fingerprint, save_insights, stored_fingerprint
+    from app.ml.review_sampler import sample_reviews
+    from app.models.database import Review
+    from app.core.config import settings
+    
+    start = time.perf_counter()
+    timings = {}
+    
+    # Near-duplicates are never analyzed
+    reviews = db.query(Review).filter(
+        Review.restaurant_id.in_(restaurant_ids),
+        Review.is_duplicate == False
+    ).order_by(Review.restaurant_id, Review.id).all()
+    
+    reviews_by_restaurant = defaultdict(list)
+    for review in reviews:
+        reviews_by_restaurant[review.restaurant_id].append(review)
+    
+    ids = [rid for rid in restaurant_ids if reviews_by_restaurant.get(rid)]
+    if not ids:
+        return {'status': 'no_reviews', 'reviews_processed': 0, 'insights': {}, 'unchanged': [], 'timings_ms': timings}
+    
+    # Shared per-process instance (preloaded at worker start), not rebuilt per task
+    setup_start = time.perf_counter()
+    batch_analyzer = registry.get_batch_analyzer()
+    timings['setup'] = _elapsed_ms(setup_start)
+    
+    # Score each review once; stored scores are reused for restaurant-level sentiment
+    sentiment_start = time.perf_counter()
+    pending = [
+        [r for r in reviews_by_restaurant[rid] if reprocess or not r.is_processed or r.sentiment_score is None]
+        for rid in ids
+    ]
+    scores = batch_analyzer.score_reviews([[r.review_text for r in group] for group in pending])
+    reviews_processed = 0
+    for group, group_scores in zip(pending, scores):
+        for review, compound in zip(group, group_scores):
+            review.sentiment_score = compound
+            review.is_processed = True
+            reviews_processed += 1
+    db.commit()
+    timings['sentiment'] = _elapsed_ms(sentiment_start)
+    
+    # Recompute insights only where the processed review set changed
+    stored = load_insights(db, ids)
+    fingerprints = {rid: review_set_fingerprint(r.id for r in reviews_by_restaurant[rid]) for rid in ids}
+    changed = [rid for rid in ids if reprocess or stored_fingerprint(stored.get(rid)) != fingerprints[rid]]
+    unchanged = [rid for rid in ids if rid not in changed]
+    
+    insights = []
+    if changed:
+        # Restaurant-level insights use a bounded, deterministic sample of each review set
+        sampled_texts, sampled_scores = [], []
+        for rid in changed:
+            restaurant_reviews = reviews_by_restaurant[rid]
+            keep = sample_reviews([_review_sample_fields(r) for r in restaurant_reviews])
+            sampled_texts.append([restaurant_reviews[i].review_text for i in keep])
+            sampled_scores.append([restaurant_reviews[i].sentiment_score for i in keep])
+        
+        insights_start = time.perf_counter()
+        insights = batch_analyzer.analyze_batch(
+            sampled_texts,
+            sentiment_scores=sampled_scores,
+            top_dishes=settings.TOP_DISHES_COUNT,
+            top_complaints=settings.TOP_COMPLAINTS_COUNT
+        )
+        timings['insights'] = _elapsed_ms(insights_start)
+        
+        for rid, result in zip(changed, insights):
+            save_insights(db, rid, result, len(reviews_by_restaurant[rid]), fingerprints[rid])
+        db.commit()
+    
+    timings['total'] = _elapsed_ms(start)
+    return {
+        'status': 'success',
+        'reviews_processed': reviews_processed,
+        'insights': {str(rid): result for rid, result in zip(changed, insights)},
+        'unchanged': unchanged,
+        'timings_ms': timings
+    }
+
+
 @shared_task(name='app.services.background_jobs.process_ml_task')
 def process_ml_task(restaurant_id: int):
     """
     Background task to process ML analysis on scraped reviews
     
+    Scores new reviews and stores the restaurant's insights (see _run_ml).
+    
     Args:
         restaurant_id: Database restaurant ID
-        
+    
     Returns:
-        Dict with ML results
+        Dict with ML results and timings_ms (setup, sentiment, insights, total)
     """
-    from app.ml.sentiment_analyzer import SentimentAnalyzer
-    from app.ml.topic_modeler import TopicModeler
-    from app.ml.keyword_extractor import KeywordExtractor
-    from app.models.database import get_session_local, Restaurant, Review
+    from app.models.database import get_session_local
     
     logger.info(f"Starting ML processing for restaurant_id: {restaurant_id}")
     
@@ -182,43 +750,257 @@ def process_ml_task(restaurant_id: int):
     db = SessionLocal()
     
     try:
-        # Get unprocessed reviews
-        reviews = db.query(Review).filter(
-            Review.restaurant_id == restaurant_id,
-            Review.is_processed == False
-        ).all()
+        result = _run_ml(db, [restaurant_id])
         
-        if not reviews:
-            logger.warning(f"No unprocessed reviews found for restaurant_id: {restaurant_id}")
+        if result['status'] == 'no_reviews':
+            logger.warning(f"No reviews found for restaurant_id: {restaurant_id}")
             return {'status': 'no_reviews'}
         
-        review_texts = [r.review_text for r in reviews]
-        
-        # Run ML models
-        sentiment_analyzer = SentimentAnalyzer()
-        topic_modeler = TopicModeler()
-        keyword_extractor = KeywordExtractor()
+        logger.info(
+            f"ML processing completed for {result['reviews_processed']} reviews, "
+            f"insights {'unchanged' if result['unchanged'] else 'updated'} (ms: {result['timings_ms']})"
+        )
         
-        # Sentiment analysis
-        for review in reviews:
-            sentiment_scores = sentiment_analyzer.analyze_single_review(review.review_text)
-            review.sentiment_score = sentiment_scores['compound']
-            review.is_processed = True
+        return {
+            'status': 'success',
+            'restaurant_id': restaurant_id,
+            'reviews_processed': result['reviews_processed'],
+            'insights_updated': not result['unchanged'],
+            'timings_ms': result['timings_ms']
+        }
+    
+    except Exception as e:
+        logger.error(f"Error in ML processing task: {e}", exc_info=True)
+        return {'status': 'error', 'message': str(e)}
+    
+    finally:
+        db.close()
+
+
+@shared_task(name='app.services.background_jobs.process_ml_batch_task')
+def process_ml_batch_task(restaurant_ids: List[int], reprocess: bool = False):
+    """
+    Background task to run batched ML analysis over many restaurants
+    
+    Loads all reviews for the given restaurants in one query, scores review
+    sentiment and computes restaurant-level insights in a single batched
+    pass, storing them for the search path (see _run_ml).
+    
+    Args:
+        restaurant_ids: Database restaurant IDs
+        reprocess: Re-score reviews that were already processed and
+            recompute all insights
+    
+    Returns:
+        Dict with recomputed per-restaurant insights and timings_ms (setup,
+        sentiment, insights, total)
+    """
+    from app.models.database import get_session_local
+    
+    logger.info(f"Starting batched ML processing for {len(restaurant_ids)} restaurants")
+    
+    SessionLocal = get_session_local()
+    db = SessionLocal()
+    
+    try:
+        result = _run_ml(db, restaurant_ids, reprocess=reprocess)
         
-        db.commit()
+        if result['status'] == 'no_reviews':
+            logger.warning(f"No reviews found for restaurant_ids: {restaurant_ids}")
+            return {'status': 'no_reviews'}
         
-        logger.info(f"ML processing completed for {len(reviews)} reviews")
+        logger.info(
+            f"Batched ML processing completed: {len(result['insights'])} insights updated, "
+            f"{len(result['unchanged'])} unchanged ({result['reviews_processed']} reviews scored, "
+            f"ms: {result['timings_ms']})"
+        )
         
         return {
             'status': 'success',
-            'restaurant_id': restaurant_id,
-            'reviews_processed': len(reviews)
+            'restaurants_processed': len(result['insights']) + len(result['unchanged']),
+            'reviews_processed': result['reviews_processed'],
+            'insights': result['insights'],
+            'timings_ms': result['timings_ms']
         }
-        
+    
     except Exception as e:
-        logger.error(f"Error in ML processing task: {e}", exc_info=True)
+        logger.error(f"Error in batched ML processing task: {e}", exc_info=True)
         return {'status': 'error', 'message': str(e)}
     
     finally:
         db.close()
 
+
+@shared_task(name='app.services.background_jobs.flush_ml_batches_task')
+def flush_ml_batches_task():
+    """
+    Periodic job: release ML groups whose oldest restaurant has waited
+    ML_BATCH_MAX_WAIT_SECONDS (ML_PIPELINE_MODE=batched)
+    
+    Returns:
+        Dict with the number of groups released
+    """
+    from app.services.ml_pipeline import get_ml_buffer
+    from app.core.config import settings
+    
+    if settings.ML_PIPELINE_MODE != 'batched':
+        return {'status': 'disabled', 'groups': 0}
+    
+    groups = _release_ml_groups(get_ml_buffer(), max_wait=settings.ML_BATCH_MAX_WAIT_SECONDS)
+    return {'status': 'success', 'groups': groups}
+
+
+@shared_task(name='app.services.background_jobs.crawl_city_corpus_task')
+def crawl_city_corpus_task(subreddit: str):
+    """
+    Crawl a city subreddit once and store its posts and comments
+    
+    Restaurant scrapes in that city then answer Reddit mentions from the
+    stored corpus instead of searching the API per restaurant.
+    
+    Args:
+        subreddit: City subreddit name
+    
+    Returns:
+        Dict with crawl results
+    """
+    from app.services import registry
+    from app.services.city_corpus import store_corpus_items
+    from app.models.database import get_session_local
+    from app.core.config import settings
+    
+    logger.info(f"Crawling city corpus r/{subreddit}")
+    
+    SessionLocal = get_session_local()
+    db = SessionLocal()
+    
+    try:
+        scraper = registry.get_reddit_scraper()
+        items = scraper.crawl_subreddit(subreddit, post_limit=settings.REDDIT_CORPUS_POST_LIMIT)
+        stored = store_corpus_items(db, subreddit, items)
+        db.commit()
+        
+        return {
+            'status': 'success',
+            'subreddit': subreddit,
+            'items_crawled': len(items),
+            'items_stored': stored
+        }
+    
+    except Exception as e:
+        logger.error(f"Error crawling r/{subreddit}: {e}", exc_info=True)
+        db.rollback()
+        return {'status': 'error', 'subreddit': subreddit, 'message': str(e)}
+    
+    finally:
+        db.close()
+
+
+@shared_task(name='app.services.background_jobs.crawl_city_corpora_task')
+def crawl_city_corpora_task():
+    """
+    Periodic job: queue a corpus crawl for every city with stored restaurants
+    
+    Returns:
+        Dict with the subreddits queued
+    """
+    from app.services.city_corpus import city_subreddit
+    from app.models.database import get_session_local, Restaurant
+    
+    SessionLocal = get_session_local()
+    db = SessionLocal()
+    
+    try:
+        addresses = db.query(Restaurant.address).filter(Restaurant.address.isnot(None)).distinct().all()
+        subreddits = sorted({city_subreddit(address) for (address,) in addresses} - {None})
+    finally:
+        db.close()
+    
+    for subreddit in subreddits:
+        crawl_city_corpus_task.delay(subreddit)
+    
+    logger.info(f"Queued corpus crawls for {len(subreddits)} city subreddits")
+    return {'status': 'success', 'subreddits': subreddits}
+
+
+@shared_task(name='app.services.background_jobs.schedule_scrapes_task')
+def schedule_scrapes_task():
+    """
+    Periodic job: enqueue refreshes for the highest-priority restaurants
+    
+    See app.services.scrape_scheduler for the ranking and budget.
+    
+    Returns:
+        Dict with the place_ids queued, highest priority first
+    """
+    from app.services.scrape_scheduler import plan_refreshes
+    from app.services.job_lifecycle import create_jobs, fail_unqueued_jobs
+    from app.models.database import get_session_local
+    from app.core.config import settings
+    
+    if not settings.SCHEDULER_ENABLED:
+        return {'status': 'disabled', 'queued': []}
+    
+    SessionLocal = get_session_local()
+    db = SessionLocal()
+    
+    try:
+        planned = plan_refreshes(db)
+        # Pending job rows count against the budget on the next run
+        created = create_jobs(db, [(restaurant.id, restaurant.place_id) for restaurant, _ in planned])
+        db.commit()
+        queued = [
+            (created[restaurant.place_id], restaurant.place_id, priority)
+            for restaurant, priority in planned if restaurant.place_id in created
+        ]
+        
+        # Enqueued in priority order; workers prefetch one task at a time, so order is kept
+        for sent, (job_id, place_id, priority) in enumerate(queued):
+            try:
+                scrape_restaurant_task.delay(job_id)
+            except Exception as e:
+                # The broker is unreachable: fail this job and the ones not yet sent
+                logger.error(f"Failed to queue scheduled refresh of {place_id}: {e}")
+                fail_unqueued_jobs(db, [unsent for unsent, _, _ in queued[sent:]], e)
+                raise
+            logger.info(f"Scheduled refresh of {place_id} (priority {priority:.2f})")
+    finally:
+        db.close()
+    
+    return {'status': 'success', 'queued': [place_id for _, place_id, _ in queued]}
+
+
+@shared_task(name='app.services.background_jobs.reap_stale_jobs_task')
+def reap_stale_jobs_task():
+    """
+    Periodic job: fail scraping jobs orphaned by crashed workers
+    
+    See app.services.job_lifecycle.reap_stale_jobs. Without Redis the
+    leases cannot be checked, so nothing is reaped until it is back.
+    
+    Returns:
+        Dict with the number of running and pending jobs reaped
+    """
+    from redis.exceptions import RedisError
+    from app.services.job_lifecycle import reap_stale_jobs
+    from app.core.redis_client import get_redis
+    from app.models.database import get_session_local
+    from app.core.config import settings
+    
+    SessionLocal = get_session_local()
+    db = SessionLocal()
+    
+    try:
+        reaped = reap_stale_jobs(
+            db, get_redis(), settings.JOB_LEASE_SECONDS,
+            timedelta(hours=settings.JOB_PENDING_TIMEOUT_HOURS)
+        )
+    except RedisError as e:
+        logger.warning(f"Skipping stale job reaping, lease store unavailable: {e}")
+        return {'status': 'skipped'}
+    finally:
+        db.close()
+    
+    if reaped['running'] or reaped['pending']:
+        logger.warning(f"Reaped stale scraping jobs: {reaped}")
+    return {'status': 'success', **reaped}
@@ -0,0 +1,188 @@
+"""
+Browser Pool
+
+Keeps headless Chrome instances alive across Celery scraping tasks in the
+same worker process, so each job no longer pays for a Chrome launch and a
+ChromeDriver lookup.
+
+Browsers are health-checked before each lease, recycled after a maximum
+number of uses (Chrome slowly leaks memory on long-lived Maps sessions), and
+have cookies/storage reset between places.
+"""
+
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+from app.services.webdriver_manager import WebDriverManager
+
+logger = logging.getLogger(__name__)
+
+
+class PooledBrowser:
+    """A WebDriverManager plus usage bookkeeping"""
+    
+    def __init__(self, headless: bool = True, measure_network: bool = True):
+        self.manager = WebDriverManager(headless=headless, measure_network=measure_network)
+        self.uses = 0
+    
+    def close(self):
+        self.manager.close()
+
+
+class BrowserPool:
+    """Per-process pool of reusable Chrome browsers"""
+    
+    def __init__(
+        self,
+        size: int = 1,
+        max_uses: int = 20,
+        headless: bool = True,
+        acquire_timeout: float = 300,
+        measure_network: bool = True
+    ):
+        """
+        Initialize pool
+        
+        Args:
+            size: Maximum number of concurrent browsers
+            max_uses: Leases per browser before it is recycled
+            headless: Run browsers in headless mode
+            acquire_timeout: Seconds to wait for a free browser
+            measure_network: Record per-page network stats in each browser
+        """
+        self.size = size
+        self.max_uses = max_uses
+        self.headless = headless
+        self.acquire_timeout = acquire_timeout
+        self.measure_network = measure_network
+        
+        # Slots hold an idle PooledBrowser, or None when a browser still has to be launched
+        self._slots = queue.LifoQueue()
+        for _ in range(size):
+            self._slots.put(None)
+        
+        self._lock = threading.Lock()
+        self._browsers = set()
+        self.stats = {'leases': 0, 'launches': 0, 'recycled': 0, 'unhealthy': 0}
+    
+    @contextmanager
+    def lease(self):
+        """
+        Borrow a browser for one scrape
+        
+        Yields:
+            WebDriverManager with a live driver
+        """
+        try:
+            browser = self._slots.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No browser available within {self.acquire_timeout}s")
+        
+        try:
+            browser = self._prepare(browser)
+        except Exception:
+            # Give the slot back so a later lease can retry the launch
+            self._slots.put(None)
+            raise
+        
+        browser.uses += 1
+        self.stats['leases'] += 1
+        
+        try:
+            yield browser.manager
+        finally:
+            if self._reset(browser):
+                self._slots.put(browser)
+            else:
+                self._discard(browser)
+                self._slots.put(None)
+    
+    def _prepare(self, browser: Optional[PooledBrowser]) -> PooledBrowser:
+        """Return a usable browser, replacing exhausted or unhealthy ones"""
+        if browser is not None:
+            if browser.uses >= self.max_uses:
+                logger.info(f"Recycling browser after {browser.uses} uses")
+                self.stats['recycled'] += 1
+                self._discard(browser)
+                browser = None
+            elif not browser.manager.is_healthy():
+                logger.warning("Pooled browser failed health check, relaunching")
+                self.stats['unhealthy'] += 1
+                self._discard(browser)
+                browser = None
+        
+        if browser is None:
+            browser = PooledBrowser(headless=self.headless, measure_network=self.measure_network)
+            browser.manager.get_driver()
+            self.stats['launches'] += 1
+            with self._lock:
+                self._browsers.add(browser)
+        
+        return browser
+    
+    def _reset(self, browser: PooledBrowser) -> bool:
+        """Clear per-place state; returns False if the browser should be discarded"""
+        try:
+            browser.manager.reset_state()
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to reset browser state, discarding browser: {e}")
+            return False
+    
+    def _discard(self, browser: Optional[PooledBrowser]):
+        if browser is None:
+            return
+        with self._lock:
+            self._browsers.discard(browser)
+        browser.close()
+    
+    def close(self):
+        """Quit every browser owned by the pool"""
+        with self._lock:
+            browsers = list(self._browsers)
+            self._browsers.clear()
+        for browser in browsers:
+            browser.close()
+        logger.info(f"Browser pool closed ({len(browsers)} browsers, stats: {self.stats})")
+
+
+_pool: Optional[BrowserPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """
+    Return this process's browser pool, creating it on first use
+    
+    The pool is keyed by PID so a forked Celery child never reuses browsers
+    launched by its parent.
+    """
+    global _pool, _pool_pid
+    from app.core.config import settings
+    
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = BrowserPool(
+                size=settings.BROWSER_POOL_SIZE,
+                max_uses=settings.BROWSER_MAX_USES,
+                measure_network=settings.SCRAPE_MEASURE_NETWORK
+            )
+            _pool_pid = os.getpid()
+    
+    return _pool
+
+
+def close_browser_pool():
+    """Close this process's browser pool, if one was created"""
+    global _pool, _pool_pid
+    
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.close()
+        _pool = None
+        _pool_pid = None
@@ -0,0 +1,259 @@
+"""
+City Corpus
+
+Stores the posts and comments of a city's subreddit, crawled once per city
+by a periodic job, and answers restaurant mention lookups from it locally.
+
+Without it every restaurant scrape re-ran the same r/<city> searches, so a
+city with hundreds of restaurants re-downloaded the same threads hundreds of
+times. Lookups go through an in-memory name-mention index (token -> items)
+built per subreddit and rebuilt whenever the stored corpus changes.
+"""
+
+import logging
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT statement
+INSERT_BATCH_SIZE = 500
+
+# Trailing address parts that are countries rather than cities
+_COUNTRIES = {'usa', 'us', 'united states', 'united states of america', 'canada', 'uk', 'united kingdom'}
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z0-9]+)*")
+
+
+def city_from_location(location: Optional[str]) -> Optional[str]:
+    """
+    Best-effort city name from a location or formatted address
+    
+    Handles both 'Austin, TX' and '123 Main St, Austin, TX 78701, USA' by
+    skipping street parts (starting with a number) and trailing countries.
+    """
+    parts = [part.strip() for part in (location or '').split(',') if part.strip()]
+    while parts and parts[-1].lower() in _COUNTRIES:
+        parts.pop()
+    while len(parts) > 1 and parts[0][0].isdigit():
+        parts.pop(0)
+    return parts[0] if parts else None
+
+
+def city_subreddit(location: Optional[str]) -> Optional[str]:
+    """Subreddit name for a location's city (lowercased, spaces removed)"""
+    city = city_from_location(location)
+    return city.replace(' ', '').lower() if city else None
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens, with curly apostrophes folded to straight ones"""
+    return _TOKEN.findall((text or '').lower().replace('’', "'"))
+
+
+class MentionIndex:
+    """Inverted index from name tokens to corpus items"""
+    
+    def __init__(self, items: Sequence[Dict]):
+        """
+        Build index
+        
+        Args:
+            items: Corpus item dicts with kind, title, text, author, score, created_at
+        """
+        self.items = list(items)
+        self._normalized: List[str] = []
+        self._postings: Dict[str, set] = {}
+        
+        for idx, item in enumerate(self.items):
+            tokens = tokenize(f"{item.get('title') or ''} {item['text']}")
+            self._normalized.append(f" {' '.join(tokens)} ")
+            for token in set(tokens):
+                self._postings.setdefault(token, set()).add(idx)
+    
+    def __len__(self) -> int:
+        return len(self.items)
+    
+    def find(self, name: str) -> List[Dict]:
+        """
+        Items mentioning the name as a phrase, highest score first
+        
+        Candidates come from intersecting the postings of the name's tokens;
+        the phrase check then rejects items where the words appear apart.
+        """
+        tokens = tokenize(name)
+        if not tokens:
+            return []
+        
+        postings = sorted((self._postings.get(token, set()) for token in set(tokens)), key=len)
+        candidates = set.intersection(*postings) if postings else set()
+        
+        phrase = f" {' '.join(tokens)} "
+        matches = [self.items[idx] for idx in candidates if phrase in self._normalized[idx]]
+        return sorted(matches, key=lambda item: -(item.get('score') or 0))
+
+
+_indexes: Dict[str, Tuple[Tuple, MentionIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_mention_index(db, subreddit: str) -> Optional[MentionIndex]:
+    """
+    Return the mention index for a subreddit, rebuilding it if the corpus changed
+    
+    Returns:
+        MentionIndex, or None if the subreddit has never been crawled
+    """
+    from sqlalchemy import func
+    from app.models.database import RedditCorpusItem
+    
+    version = db.query(func.count(RedditCorpusItem.id), func.max(RedditCorpusItem.crawled_at)).filter(
+        RedditCorpusItem.subreddit == subreddit
+    ).one()
+    if not version[0]:
+        return None
+    version = tuple(version)
+    
+    with _indexes_lock:
+        cached = _indexes.get(subreddit)
+        if cached and cached[0] == version:
+            return cached[1]
+    
+    rows = db.query(RedditCorpusItem).filter(RedditCorpusItem.subreddit == subreddit).all()
+    index = MentionIndex([
+        {
+            'kind': row.kind,
+            'title': row.title,
+            'text': row.text,
+            'author': row.author,
+            'score': row.score,
+            'created_at': row.created_at,
+        }
+        for row in rows
+    ])
+    
+    with _indexes_lock:
+        _indexes[subreddit] = (version, index)
+    logger.info(f"Built mention index for r/{subreddit} over {len(index)} items")
+    return index
+
+
+def last_crawled(db, subreddit: str) -> Optional[datetime]:
+    """When a subreddit was last crawled, or None if never"""
+    from sqlalchemy import func
+    from app.models.database import RedditCorpusItem
+    
+    return db.query(func.max(RedditCorpusItem.crawled_at)).filter(
+        RedditCorpusItem.subreddit == subreddit
+    ).scalar()
+
+
+def search_corpus(db, location: Optional[str], restaurant_name: str, limit: int = 50, max_age_hours: float = 48) -> Optional[List[Dict]]:
+    """
+    Answer a restaurant mention search from the stored city corpus
+    
+    Args:
+        db: Database session
+        location: Restaurant location/address (selects the city subreddit)
+        restaurant_name: Name to look for
+        limit: Maximum number of mentions
+        max_age_hours: Corpus older than this is treated as missing
+    
+    Returns:
+        Mention dicts (text, author, date, score, type) as returned by
+        RedditScraper.search_restaurant_mentions, or None when there is no
+        fresh corpus for the city and the caller should query the API
+    """
+    subreddit = city_subreddit(location)
+    if not subreddit:
+        return None
+    
+    crawled = last_crawled(db, subreddit)
+    if crawled is None or crawled < datetime.utcnow() - timedelta(hours=max_age_hours):
+        return None
+    
+    index = get_mention_index(db, subreddit)
+    if index is None:
+        return None
+    
+    mentions = []
+    for item in index.find(restaurant_name):
+        # Same minimum lengths as the API search path
+        if item['kind'] == 'post':
+            if len(item['text']) <= 50:
+                continue
+            text = f"{item['title']}\n\n{item['text']}"
+        else:
+            if len(item['text']) <= 30:
+                continue
+            text = item['text']
+        
+        mentions.append({
+            'text': text,
+            'author': item['author'] or 'deleted',
+            'date': item['created_at'].strftime('%Y-%m-%d') if item['created_at'] else '',
+            'score': item['score'],
+            'type': item['kind']
+        })
+        if len(mentions) >= limit:
+            break
+    
+    logger.info(f"Found {len(mentions)} mentions of {restaurant_name} in r/{subreddit} corpus")
+    return mentions
+
+
+def store_corpus_items(db, subreddit: str, items: Sequence[Dict], batch_size: int = INSERT_BATCH_SIZE) -> int:
+    """
+    Store crawled posts/comments, skipping ones already stored
+    
+    Args:
+        db: Database session (committed by the caller)
+        subreddit: Subreddit the items were crawled from
+        items: Item dicts from RedditScraper.crawl_subreddit
+        batch_size: Rows per INSERT statement
+    
+    Returns:
+        Number of new items stored
+    """
+    from app.models.database import RedditCorpusItem
+    from app.services.review_store import dialect_insert
+    
+    crawled_at = datetime.utcnow()
+    rows = {}
+    for item in items:
+        rows.setdefault(item['reddit_id'], {
+            'subreddit': subreddit.lower(),
+            'reddit_id': item['reddit_id'],
+            'kind': item['kind'],
+            'post_id': item.get('post_id'),
+            'title': item.get('title'),
+            'text': item['text'],
+            'author': item.get('author'),
+            'score': item.get('score') or 0,
+            'created_at': item.get('created_at'),
+            'crawled_at': crawled_at,
+        })
+    
+    insert = dialect_insert(db)
+    batch = list(rows.values())
+    inserted = 0
+    for start in range(0, len(batch), batch_size):
+        stmt = (
+            insert(RedditCorpusItem)
+            .values(batch[start:start + batch_size])
+            .on_conflict_do_nothing(index_elements=['reddit_id'])
+            .returning(RedditCorpusItem.id)
+        )
+        inserted += len(db.execute(stmt).scalars().all())
+    
+    # Mark the whole corpus as fresh, including items seen on earlier crawls
+    if batch:
+        db.query(RedditCorpusItem).filter(
+            RedditCorpusItem.subreddit == subreddit.lower(),
+            RedditCorpusItem.reddit_id.in_(list(rows))
+        ).update({'crawled_at': crawled_at}, synchronize_session=False)
+    
+    logger.info(f"Stored {inserted} new of {len(rows)} crawled items for r/{subreddit}")
+    return inserted
@@ -10,49 +10,507 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.common.keys import Keys
+import json
 import time
 import logging
-from typing import List, Dict
-from app.services.webdriver_manager import WebDriverManager
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, List, Dict, Optional
+from app.services.webdriver_manager import WebDriverManager, BLOCKED_RESOURCE_PATTERNS
+from app.services.maps_selectors import (
+    REVIEW_SELECTORS,
+    REVIEW_TEXT_SELECTORS,
+    REVIEW_RATING_SELECTOR,
+    REVIEW_AUTHOR_SELECTORS,
+    REVIEW_DATE_SELECTORS,
+    MORE_BUTTON_SELECTOR,
+    SORT_BUTTON_SELECTOR,
+    SORT_MENU_ITEM_SELECTOR,
+)
+from app.ml.review_sampler import parse_review_date
 
 logger = logging.getLogger(__name__)
 
+# Resource categories blocked by default (see BLOCKED_RESOURCE_PATTERNS)
+DEFAULT_BLOCKED_RESOURCES = ['fonts', 'stylesheets', 'images', 'map_tiles', 'analytics', 'media']
+
+# Clicks "More" on every truncated review, then resolves once no review has a
+# "More" button left (watched with a MutationObserver), or after arguments[2]
+# ms. Returns the number of reviews still truncated. Run before
+# EXTRACT_REVIEWS_SCRIPT so the expanded text has rendered when it is read.
+EXPAND_REVIEWS_SCRIPT = """
+const selectors = arguments[0];
+const maxReviews = arguments[1];
+const timeoutMs = arguments[2];
+const done = arguments[arguments.length - 1];
+
+let elements = [];
+for (const selector of selectors.review) {
+    elements = Array.from(document.querySelectorAll(selector));
+    if (elements.length) break;
+}
+elements = elements.slice(0, maxReviews);
+
+const truncated = () => elements.filter(element => element.querySelector(selectors.more)).length;
+if (truncated() === 0) {
+    done(0);
+    return;
+}
+
+let timer = null;
+const observer = new MutationObserver(() => {
+    if (truncated() === 0) {
+        observer.disconnect();
+        clearTimeout(timer);
+        done(0);
+    }
+});
+observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+timer = setTimeout(() => {
+    observer.disconnect();
+    done(truncated());
+}, timeoutMs);
+
+for (const element of elements) {
+    element.querySelectorAll(selectors.more).forEach(button => button.click());
+}
+"""
+
+# Returns all (already expanded) reviews as a JSON array in a single
+# WebDriver round-trip. Mirrors _parse_review_element.
+EXTRACT_REVIEWS_SCRIPT = """
+const selectors = arguments[0];
+const maxReviews = arguments[1];
+
+let elements = [];
+for (const selector of selectors.review) {
+    elements = Array.from(document.querySelectorAll(selector));
+    if (elements.length) break;
+}
+elements = elements.slice(0, maxReviews);
+
+const firstText = (element, list) => {
+    for (const selector of list) {
+        const node = element.querySelector(selector);
+        const text = node ? (node.innerText || '').trim() : '';
+        if (text) return text;
+    }
+    return '';
+};
+
+return JSON.stringify(elements.map(element => {
+    let rating = null;
+    const stars = element.querySelector(selectors.rating);
+    if (stars) {
+        const value = parseFloat((stars.getAttribute('aria-label') || '').split(' ')[0]);
+        if (!isNaN(value)) rating = value;
+    }
+    return {
+        text: firstText(element, selectors.text),
+        rating: rating,
+        author: firstText(element, selectors.author),
+        date: firstText(element, selectors.date),
+        review_id: element.getAttribute('data-review-id') || ''
+    };
+}));
+"""
+
+# Resolves as soon as the number of review elements exceeds arguments[1]
+# (watched with a MutationObserver), or after arguments[2] ms. Returns the
+# current review count.
+WAIT_FOR_REVIEWS_SCRIPT = """
+const selector = arguments[0];
+const previousCount = arguments[1];
+const timeoutMs = arguments[2];
+const done = arguments[arguments.length - 1];
+
+const count = () => document.querySelectorAll(selector).length;
+if (count() > previousCount) {
+    done(count());
+    return;
+}
+
+let timer = null;
+const observer = new MutationObserver(() => {
+    if (count() > previousCount) {
+        observer.disconnect();
+        clearTimeout(timer);
+        done(count());
+    }
+});
+observer.observe(document.body, {childList: true, subtree: true});
+timer = setTimeout(() => {
+    observer.disconnect();
+    done(count());
+}, timeoutMs);
+"""
+
+
+class _TabScrape:
+    """State of one place being scraped in a browser tab (multi-tab mode)"""
+    
+    def __init__(self, place_id: str, handle: str, watermark: Optional[Dict] = None):
+        self.place_id = place_id
+        self.handle = handle
+        self.watermark = watermark
+        self.sorted_newest = False
+        self.state = 'loading'
+        self.navigated = False
+        self.started = time.perf_counter()
+        self.deadline = time.monotonic() + 10
+        self.container = None
+        self.count = 0
+        self.scrolls = 0
+        self.stalls = 0
+
 
 class GoogleMapsScraper:
     """Scrapes reviews from Google Maps"""
     
-    def __init__(self, delay_seconds=2):
+    # Safety cap on scroll rounds per place
+    MAX_SCROLLS = 50
+    
+    # Sleep between multi-tab rounds in which no tab made progress
+    TAB_POLL_INTERVAL = 0.1
+    
+    # Progress phase reported for each tab state (named like the single-page phases)
+    TAB_PHASES = {'loading': 'page_ready', 'opening': 'open_reviews', 'scrolling': 'scroll', 'extracting': 'extract'}
+    
+    def __init__(
+        self,
+        delay_seconds=2,
+        browser_pool=None,
+        extraction_mode='script',
+        scroll_timeout=2.0,
+        max_stalls=2,
+        block_resources=True,
+        blocked_resources: Optional[List[str]] = None,
+        archive=None,
+        rate_limiter=None
+    ):
         """
         Initialize scraper
         
         Args:
-            delay_seconds: Delay between requests (rate limiting)
+            delay_seconds: Minimum interval between page navigations (rate
+                limiting); only waits if the previous navigation was sooner
+            browser_pool: Optional BrowserPool to lease browsers from; when
+                omitted the scraper owns a single browser of its own
+            extraction_mode: 'script' extracts all reviews with one
+                execute_script call; 'elements' walks each review element
+                through WebDriver (slower, kept as a fallback)
+            scroll_timeout: Seconds to wait for new reviews after each scroll
+            max_stalls: Consecutive scrolls without new reviews before
+                loading stops
+            block_resources: Block heavy resources (fonts, CSS, map tiles,
+                analytics, ...) via CDP; disable to debug page rendering
+            blocked_resources: Categories from BLOCKED_RESOURCE_PATTERNS to
+                block (defaults to DEFAULT_BLOCKED_RESOURCES)
+            archive: Optional SnapshotArchive; each scraped page's HTML is
+                archived for offline re-parsing and benchmarking
+            rate_limiter: Limiter every navigation draws from; defaults to
+                the fleet-wide Google Maps budget shared by all workers
         """
         self.delay_seconds = delay_seconds
-        self.webdriver_manager = WebDriverManager(headless=True)
+        self.browser_pool = browser_pool
+        self.extraction_mode = extraction_mode
+        self.scroll_timeout = scroll_timeout
+        self.max_stalls = max_stalls
+        self.block_resources = block_resources
+        self.blocked_resources = blocked_resources if blocked_resources is not None else DEFAULT_BLOCKED_RESOURCES
+        self.archive = archive
+        if rate_limiter is None:
+            from app.services.rate_limiter import get_target_limiter
+            rate_limiter = get_target_limiter('google_maps')
+        self.rate_limiter = rate_limiter
+        self.last_metrics: Dict[str, float] = {}  # Per-phase seconds plus network/scroll counters
+        self._last_navigation = 0.0
+        self._implicit_wait_disabled = False
+        self._progress: Optional[Callable[[str, int], None]] = None
+        self.webdriver_manager = None if browser_pool else WebDriverManager(headless=True)
+    
+    def blocked_url_patterns(self) -> List[str]:
+        """URL patterns this scraper blocks, per its resource profile"""
+        if not self.block_resources:
+            return []
+        
+        patterns = []
+        for category in self.blocked_resources:
+            if category not in BLOCKED_RESOURCE_PATTERNS:
+                logger.warning(f"Unknown blocked resource category: {category}")
+                continue
+            patterns.extend(BLOCKED_RESOURCE_PATTERNS[category])
+        return patterns
     
-    def scrape_restaurant_reviews(self, place_id: str, max_reviews: int = 100) -> List[Dict]:
+    @contextmanager
+    def _browser(self):
+        """Yield a WebDriverManager from the pool, or this scraper's own, with the blocking profile applied"""
+        if self.browser_pool:
+            with self.browser_pool.lease() as manager:
+                manager.set_blocked_urls(self.blocked_url_patterns())
+                yield manager
+        else:
+            self.webdriver_manager.get_driver()
+            self.webdriver_manager.set_blocked_urls(self.blocked_url_patterns())
+            yield self.webdriver_manager
+    
+    def scrape_restaurant_reviews(
+        self,
+        place_id: str,
+        max_reviews: int = 100,
+        watermark: Optional[Dict] = None,
+        progress: Optional[Callable[[str, int], None]] = None
+    ) -> List[Dict]:
         """
         Scrape reviews for a restaurant from Google Maps
         
         Args:
             place_id: Google Places ID
             max_reviews: Maximum number of reviews to scrape
+            watermark: Newest already-stored review, as a dict with
+                'review_id' and/or 'date'. Reviews are then sorted by newest,
+                scrolling stops at the watermark review and only newer
+                reviews are returned.
+            progress: Optional callback(phase, reviews_loaded), called as
+                each phase starts and whenever scrolling loads more reviews
+        
+        Returns:
+            List of review dictionaries with text, rating, author, date, review_id
+        
+        Raises:
+            Exception: Any browser or page error, so the caller can retry or
+                fail the job instead of recording an empty scrape
+        """
+        self.last_metrics = {}
+        self._progress = progress
+        start = time.perf_counter()
+        
+        try:
+            with self._browser() as manager:
+                # Discard traffic from earlier pages before measuring this one
+                manager.network_stats()
+                reviews = self._scrape_with_driver(manager.get_driver(), place_id, max_reviews, watermark)
+                self.last_metrics.update(manager.network_stats() or {})
             
+            self.last_metrics['total'] = round(time.perf_counter() - start, 2)
+            logger.info(f"Successfully scraped {len(reviews)} reviews for place_id: {place_id} (timings: {self.last_metrics})")
+        
+        except Exception as e:
+            logger.error(f"Error scraping reviews for place_id {place_id}: {e}")
+            raise
+        
+        finally:
+            self._progress = None
+        
+        return reviews
+    
+    def scrape_many_restaurants(
+        self,
+        place_ids: List[str],
+        max_reviews: int = 100,
+        tabs: int = 3,
+        watermarks: Optional[Dict[str, Dict]] = None,
+        progress: Optional[Callable[[str, str, int], None]] = None
+    ) -> Dict[str, List[Dict]]:
+        """
+        Scrape several restaurants concurrently in tabs of a single browser
+        
+        Each tab works through a small state machine (loading -> opening
+        reviews -> scrolling -> extracting) and the scraper round-robins
+        between tabs, so while one tab waits on the network the others make
+        progress. No extra browser processes are started.
+        
+        Args:
+            place_ids: Google Places IDs to scrape
+            max_reviews: Maximum number of reviews per restaurant
+            tabs: Number of tabs (window handles) to use
+            watermarks: Optional place_id -> watermark (see
+                scrape_restaurant_reviews) for incremental scraping
+            progress: Optional callback(place_id, phase, reviews_loaded),
+                called as each place enters a phase and whenever scrolling
+                loads more of its reviews
+        
         Returns:
-            List of review dictionaries with text, rating, author, date
+            Dict of place_id -> list of review dictionaries; places whose
+            scrape failed (tab error, browser crash) are missing, so callers
+            can tell them apart from places without new reviews
         """
-        reviews = []
+        results = {}
+        self.last_metrics = {}
+        start = time.perf_counter()
         
         try:
-            driver = self.webdriver_manager.get_driver()
+            with self._browser() as manager:
+                manager.network_stats()
+                driver = manager.get_driver()
+                try:
+                    self._scrape_tabs(driver, deque(place_ids), max_reviews, tabs, results, watermarks or {}, progress)
+                finally:
+                    self._close_extra_tabs(driver)
+                self.last_metrics.update(manager.network_stats() or {})
+        except Exception as e:
+            logger.error(f"Error in multi-tab scrape of {len(place_ids)} places: {e}")
+        
+        self.last_metrics['places'] = len(place_ids)
+        self.last_metrics['total'] = round(time.perf_counter() - start, 2)
+        logger.info(
+            f"Multi-tab scrape finished: {sum(len(r) for r in results.values())} reviews "
+            f"for {len(results)}/{len(place_ids)} places (metrics: {self.last_metrics})"
+        )
+        return results
+    
+    def _scrape_tabs(
+        self,
+        driver,
+        pending: deque,
+        max_reviews: int,
+        tabs: int,
+        results: Dict[str, List[Dict]],
+        watermarks: Dict[str, Dict],
+        progress: Optional[Callable[[str, str, int], None]] = None
+    ):
+        """Round-robin the tab state machines until every place is done"""
+        handles = [driver.current_window_handle]
+        for _ in range(min(tabs, len(pending)) - 1):
+            driver.switch_to.new_window('tab')
+            handles.append(driver.current_window_handle)
+        
+        active = {}
+        for handle in handles:
+            driver.switch_to.window(handle)
+            active[handle] = self._start_tab(driver, handle, pending.popleft(), watermarks)
+            self._report_tab(progress, active[handle])
+        
+        with self._no_implicit_wait(driver):
+            while active:
+                progressed = False
+                for handle, task in list(active.items()):
+                    driver.switch_to.window(handle)
+                    try:
+                        state, count = task.state, task.count
+                        reviews = self._advance_tab(driver, task, max_reviews)
+                        progressed = progressed or task.state != state
+                        if reviews is None:
+                            if task.state != state or task.count != count:
+                                self._report_tab(progress, task)
+                            continue
+                        
+                        results[task.place_id] = reviews
+                        logger.info(
+                            f"Scraped {len(reviews)} reviews for place_id: {task.place_id} "
+                            f"in {time.perf_counter() - task.started:.1f}s"
+                        )
+                    except Exception as e:
+                        # Left out of results, so the caller sees the failure
+                        logger.error(f"Error scraping place_id {task.place_id} in tab: {e}")
+                    
+                    progressed = True
+                    if pending:
+                        active[handle] = self._start_tab(driver, handle, pending.popleft(), watermarks)
+                        self._report_tab(progress, active[handle])
+                    else:
+                        del active[handle]
+                
+                if not progressed:
+                    time.sleep(self.TAB_POLL_INTERVAL)
+    
+    def _start_tab(self, driver, handle: str, place_id: str, watermarks: Dict[str, Dict]) -> _TabScrape:
+        """Begin loading a place in the current tab without blocking on the page load"""
+        self._throttle()
+        logger.info(f"Navigating tab to Google Maps for place_id: {place_id}")
+        # The token lives on the current document; it is gone once the new page has replaced it
+        driver.execute_script(
+            "window.__scrapeToken = true; window.location.href = arguments[0]",
+            self._maps_url(place_id)
+        )
+        return _TabScrape(place_id, handle, watermarks.get(place_id))
+    
+    def _advance_tab(self, driver, task: _TabScrape, max_reviews: int) -> Optional[List[Dict]]:
+        """
+        Take one non-blocking step for the place loading in the current tab
+        
+        Returns:
+            The extracted reviews once the place is done, otherwise None
+        """
+        now = time.monotonic()
+        
+        if task.state == 'loading':
+            # A reused tab still shows the previous place until the navigation commits,
+            # so its main pane and reviews must not be mistaken for this place's
+            if not task.navigated:
+                task.navigated = driver.execute_script("return !window.__scrapeToken")
+                if not task.navigated:
+                    if now > task.deadline:
+                        raise TimeoutException(f"Navigation to place_id {task.place_id} did not complete")
+                    return None
             
-            # Build Google Maps URL with place_id
-            url = f"https://www.google.com/maps/search/?api=1&query=Google&query_place_id={place_id}"
-            logger.info(f"Navigating to Google Maps for place_id: {place_id}")
+            if driver.find_elements(By.CSS_SELECTOR, "div[role='main']") or now > task.deadline:
+                buttons = driver.find_elements(By.CSS_SELECTOR, "button[aria-label*='Reviews']")
+                if buttons:
+                    buttons[0].click()
+                task.state = 'opening'
+                task.deadline = now + 5
+            return None
+        
+        if task.state == 'opening':
+            if self._count_reviews(driver) or now > task.deadline:
+                if task.watermark:
+                    task.sorted_newest = self._sort_by_newest(driver)
+                task.container = self._find_scrollable_element(driver)
+                task.state = 'scrolling' if task.container else 'extracting'
+                task.deadline = now
+            return None
+        
+        if task.state == 'scrolling':
+            count = self._count_reviews(driver)
+            if count > task.count:
+                task.count = count
+                task.stalls = 0
+                task.deadline = now
+            elif now >= task.deadline and task.scrolls:
+                task.stalls += 1
             
+            if (task.count >= max_reviews or task.stalls >= self.max_stalls or task.scrolls >= self.MAX_SCROLLS
+                    or (task.sorted_newest and self._watermark_loaded(driver, task.watermark))):
+                task.state = 'extracting'
+            elif now >= task.deadline:
+                driver.execute_script("arguments[0].scrollTo(0, arguments[0].scrollHeight)", task.container)
+                task.scrolls += 1
+                task.deadline = now + self.scroll_timeout
+            return None
+        
+        reviews = self._extract_reviews(driver, max_reviews)
+        self._archive_snapshot(driver, task.place_id, reviews)
+        return self._apply_watermark(reviews, task.watermark, task.sorted_newest)
+    
+    def _count_reviews(self, driver) -> int:
+        return driver.execute_script(
+            "return document.querySelectorAll(arguments[0]).length",
+            self._review_count_selector()
+        )
+    
+    def _close_extra_tabs(self, driver):
+        """Close all but the first tab"""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+    
+    @staticmethod
+    def _maps_url(place_id: str) -> str:
+        """Build Google Maps URL with place_id"""
+        return f"https://www.google.com/maps/search/?api=1&query=Google&query_place_id={place_id}"
+    
+    def _scrape_with_driver(self, driver, place_id: str, max_reviews: int, watermark: Optional[Dict] = None) -> List[Dict]:
+        """Navigate to a place and extract its reviews with the given driver"""
+        url = self._maps_url(place_id)
+        logger.info(f"Navigating to Google Maps for place_id: {place_id}")
+        
+        with self._phase('page_ready'):
+            self._throttle()
             driver.get(url)
-            time.sleep(self.delay_seconds)
             
             # Wait for page to load
             try:
@@ -61,7 +519,8 @@ class GoogleMapsScraper:
                 )
             except TimeoutException:
                 logger.warning("Page load timeout, continuing anyway...")
-            
+        
+        with self._phase('open_reviews'):
             # Try to find and click the reviews tab
             try:
                 # Look for reviews button/tab
@@ -69,7 +528,6 @@ class GoogleMapsScraper:
                     EC.element_to_be_clickable((By.CSS_SELECTOR, "button[aria-label*='Reviews']"))
                 )
                 reviews_button.click()
-                time.sleep(2)
                 logger.info("Clicked on reviews tab")
             except Exception as e:
                 logger.warning(f"Could not click reviews tab: {e}")
@@ -77,29 +535,160 @@ class GoogleMapsScraper:
                 try:
                     reviews_section = driver.find_element(By.CSS_SELECTOR, "div[aria-label*='Reviews']")
                     driver.execute_script("arguments[0].scrollIntoView();", reviews_section)
-                    time.sleep(2)
                 except:
                     pass
             
-            # Scroll to load more reviews
+            # Wait for the first reviews instead of sleeping a fixed amount
+            try:
+                WebDriverWait(driver, 5, poll_frequency=0.1).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, self._review_count_selector()))
+                )
+            except TimeoutException:
+                logger.warning("No reviews rendered after opening reviews tab")
+            
+            # Newest first, so incremental scrapes can stop at the watermark
+            sorted_newest = self._sort_by_newest(driver) if watermark else False
+            self.last_metrics['sorted_newest'] = sorted_newest
+        
+        # Scroll to load more reviews
+        with self._phase('scroll'):
             reviews_container = self._find_scrollable_element(driver)
             if reviews_container:
-                self._scroll_reviews(driver, reviews_container, max_reviews)
-            
-            # Extract reviews
+                self._scroll_reviews(driver, reviews_container, max_reviews, watermark if sorted_newest else None)
+        
+        # Extract reviews
+        with self._phase('extract'):
             reviews = self._extract_reviews(driver, max_reviews)
-            
-            logger.info(f"Successfully scraped {len(reviews)} reviews for place_id: {place_id}")
-            
+        
+        with self._phase('archive'):
+            self._archive_snapshot(driver, place_id, reviews)
+        
+        return self._apply_watermark(reviews, watermark, sorted_newest)
+    
+    def _archive_snapshot(self, driver, place_id: str, reviews: List[Dict]):
+        """Archive the page HTML (with truncated reviews already expanded)"""
+        if self.archive is None:
+            return
+        try:
+            self.archive.store(driver.page_source, place_id, reviews_extracted=len(reviews), url=driver.current_url)
         except Exception as e:
-            logger.error(f"Error scraping reviews for place_id {place_id}: {e}")
+            logger.warning(f"Failed to archive snapshot for place_id {place_id}: {e}")
+    
+    def _sort_by_newest(self, driver) -> bool:
+        """Switch the reviews pane to 'Newest' order; returns False if sorting failed"""
+        try:
+            with self._no_implicit_wait(driver):
+                buttons = driver.find_elements(By.CSS_SELECTOR, SORT_BUTTON_SELECTOR)
+                if not buttons:
+                    logger.warning("Sort button not found, reviews stay in default order")
+                    return False
+                
+                first_review = driver.find_elements(By.CSS_SELECTOR, self._review_count_selector())
+                buttons[0].click()
+                items = WebDriverWait(driver, 3, poll_frequency=0.1).until(
+                    lambda d: d.find_elements(By.CSS_SELECTOR, SORT_MENU_ITEM_SELECTOR)
+                )
+                # Menu order is Most relevant, Newest, Highest, Lowest; prefer matching the label
+                newest = next((item for item in items if 'newest' in item.text.lower()), None)
+                if newest is None and len(items) > 1:
+                    newest = items[1]
+                if newest is None:
+                    return False
+                newest.click()
+                
+                # The list re-renders in the new order
+                if first_review:
+                    WebDriverWait(driver, 5, poll_frequency=0.1).until(EC.staleness_of(first_review[0]))
+                WebDriverWait(driver, 5, poll_frequency=0.1).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, self._review_count_selector()))
+                )
+            logger.info("Sorted reviews by newest")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not sort reviews by newest: {e}")
+            return False
+    
+    def _watermark_loaded(self, driver, watermark: Optional[Dict]) -> bool:
+        """Check whether the watermark review is already in the loaded list"""
+        review_id = (watermark or {}).get('review_id')
+        if not review_id:
+            return False
+        return driver.execute_script(
+            "return document.querySelector('[data-review-id=\"' + CSS.escape(arguments[0]) + '\"]') !== null",
+            review_id
+        )
+    
+    def _apply_watermark(self, reviews: List[Dict], watermark: Optional[Dict], sorted_newest: bool) -> List[Dict]:
+        """
+        Keep only reviews newer than the watermark
         
-        finally:
-            # Don't close driver yet - reuse for next scrape
-            pass
+        With newest-first order everything from the watermark review onwards
+        is already stored. Reviews dated before the watermark date are dropped
+        too; Google's relative dates round the age down, so a new review never
+        parses as older than the watermark.
+        """
+        if not watermark:
+            return reviews
+        
+        review_id = watermark.get('review_id')
+        if sorted_newest and review_id:
+            for idx, review in enumerate(reviews):
+                if review.get('review_id') == review_id:
+                    reviews = reviews[:idx]
+                    break
         
+        since_date = watermark.get('date')
+        if since_date:
+            now = datetime.utcnow()
+            reviews = [
+                review for review in reviews
+                if (parse_review_date(review.get('date'), now) or now) >= since_date
+            ]
+        
+        logger.info(f"{len(reviews)} reviews newer than watermark")
         return reviews
     
+    @contextmanager
+    def _phase(self, name):
+        """Record the wall-clock duration of a scrape phase in last_metrics"""
+        self._report(name, self.last_metrics.get('reviews_loaded', 0))
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.last_metrics[name] = round(time.perf_counter() - start, 2)
+    
+    def _report(self, phase: str, reviews_loaded: int):
+        """Pass progress to the caller's callback; a failing callback never fails the scrape"""
+        if self._progress is None:
+            return
+        try:
+            self._progress(phase, reviews_loaded)
+        except Exception as e:
+            logger.debug(f"Progress callback failed: {e}")
+    
+    def _report_tab(self, progress: Optional[Callable[[str, str, int], None]], task: _TabScrape):
+        """Pass a tab's phase and reviews loaded to the caller's callback, like _report"""
+        if progress is None:
+            return
+        try:
+            progress(task.place_id, self.TAB_PHASES[task.state], task.count)
+        except Exception as e:
+            logger.debug(f"Progress callback failed: {e}")
+    
+    def _throttle(self):
+        """Keep at least delay_seconds between navigations and stay within the fleet budget"""
+        wait = self._last_navigation + self.delay_seconds - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self.rate_limiter.acquire()
+        self._last_navigation = time.monotonic()
+    
+    @staticmethod
+    def _review_count_selector() -> str:
+        # div.section-review is only used by the legacy layout, which doesn't lazy-load
+        return ", ".join(REVIEW_SELECTORS[:3])
+    
     def _find_scrollable_element(self, driver):
         """Find the scrollable reviews container"""
         selectors = [
@@ -109,107 +698,160 @@ class GoogleMapsScraper:
             "div.section-scrollbox"
         ]
         
-        for selector in selectors:
-            try:
-                element = driver.find_element(By.CSS_SELECTOR, selector)
-                if element:
-                    logger.info(f"Found scrollable element with selector: {selector}")
-                    return element
-            except NoSuchElementException:
-                continue
+        with self._no_implicit_wait(driver):
+            for selector in selectors:
+                try:
+                    element = driver.find_element(By.CSS_SELECTOR, selector)
+                    if element:
+                        logger.info(f"Found scrollable element with selector: {selector}")
+                        return element
+                except NoSuchElementException:
+                    continue
         
         logger.warning("Could not find scrollable reviews container")
         return None
     
-    def _scroll_reviews(self, driver, container, max_reviews):
-        """Scroll through reviews to load more"""
+    def _scroll_reviews(self, driver, container, max_reviews, watermark: Optional[Dict] = None):
+        """
+        Scroll through reviews until max_reviews are loaded or loading stalls
+        
+        After each scroll, waits (up to scroll_timeout) for the review count
+        to grow instead of sleeping a fixed interval, so fast pages are not
+        held back and the end of the list is detected after max_stalls
+        fruitless scrolls. With a watermark (newest-first order), scrolling
+        also stops once the watermark review has been loaded.
+        """
         logger.info("Starting to scroll reviews...")
         
-        last_height = driver.execute_script("return arguments[0].scrollHeight", container)
+        selector = self._review_count_selector()
+        timeout_ms = int(self.scroll_timeout * 1000)
+        count = len(driver.find_elements(By.CSS_SELECTOR, selector))
         scrolls = 0
-        max_scrolls = 20  # Limit to avoid infinite scrolling
+        stalls = 0
         
-        while scrolls < max_scrolls:
-            # Scroll down
-            driver.execute_script("arguments[0].scrollTo(0, arguments[0].scrollHeight)", container)
-            time.sleep(1.5)
-            
-            # Calculate new height
-            new_height = driver.execute_script("return arguments[0].scrollHeight", container)
-            
-            # Check if we've reached the bottom
-            if new_height == last_height:
-                logger.info("Reached end of reviews")
+        while count < max_reviews and scrolls < self.MAX_SCROLLS:
+            if self._watermark_loaded(driver, watermark):
+                logger.info("Reached already-stored reviews")
                 break
             
-            last_height = new_height
+            driver.execute_script("arguments[0].scrollTo(0, arguments[0].scrollHeight)", container)
+            new_count = driver.execute_async_script(WAIT_FOR_REVIEWS_SCRIPT, selector, count, timeout_ms)
             scrolls += 1
             
-            # Check if we have enough reviews
-            review_elements = driver.find_elements(By.CSS_SELECTOR, "div.jftiEf, div[data-review-id], div.gws-localreviews__google-review")
-            if len(review_elements) >= max_reviews:
-                logger.info(f"Loaded enough reviews: {len(review_elements)}")
-                break
+            if new_count > count:
+                count = new_count
+                stalls = 0
+                self._report('scroll', count)
+            else:
+                stalls += 1
+                if stalls >= self.max_stalls:
+                    logger.info("Reached end of reviews")
+                    break
         
-        logger.info(f"Completed {scrolls} scrolls")
+        self.last_metrics['scrolls'] = scrolls
+        self.last_metrics['reviews_loaded'] = count
+        logger.info(f"Completed {scrolls} scrolls, {count} reviews loaded")
     
     def _extract_reviews(self, driver, max_reviews) -> List[Dict]:
         """Extract review data from loaded page"""
-        reviews = []
+        if self.extraction_mode == 'script':
+            try:
+                return self._extract_reviews_script(driver, max_reviews)
+            except Exception as e:
+                logger.warning(f"Script extraction failed, falling back to element extraction: {e}")
         
-        # Multiple selectors to try (Google Maps HTML changes frequently)
-        selectors = [
-            "div.jftiEf",
-            "div[data-review-id]",
-            "div.gws-localreviews__google-review",
-            "div.section-review"
-        ]
+        return self._extract_reviews_elements(driver, max_reviews)
+    
+    def _extract_reviews_script(self, driver, max_reviews) -> List[Dict]:
+        """Expand truncated reviews, then extract every review in one execute_script round-trip"""
+        selectors = {
+            'review': REVIEW_SELECTORS,
+            'text': REVIEW_TEXT_SELECTORS,
+            'rating': REVIEW_RATING_SELECTOR,
+            'author': REVIEW_AUTHOR_SELECTORS,
+            'date': REVIEW_DATE_SELECTORS,
+            'more': MORE_BUTTON_SELECTOR
+        }
         
-        review_elements = []
-        for selector in selectors:
-            review_elements = driver.find_elements(By.CSS_SELECTOR, selector)
-            if review_elements:
-                logger.info(f"Found {len(review_elements)} reviews with selector: {selector}")
-                break
+        # Clicking "More" re-renders the text asynchronously, so expand and wait
+        # first; reading innerText in the same pass returns the truncated text
+        truncated = driver.execute_async_script(
+            EXPAND_REVIEWS_SCRIPT, selectors, max_reviews, int(self.scroll_timeout * 1000)
+        )
+        if truncated:
+            logger.debug(f"{truncated} reviews still truncated after expanding")
         
-        if not review_elements:
-            logger.warning("No review elements found")
-            return reviews
+        payload = driver.execute_script(EXTRACT_REVIEWS_SCRIPT, selectors, max_reviews)
         
-        for idx, element in enumerate(review_elements[:max_reviews]):
-            try:
-                review_data = self._parse_review_element(element, driver)
-                if review_data and review_data['text']:
-                    reviews.append(review_data)
-            except Exception as e:
-                logger.debug(f"Error parsing review {idx}: {e}")
-                continue
+        reviews = [review for review in json.loads(payload or '[]') if review.get('text')]
+        logger.info(f"Extracted {len(reviews)} reviews in one script call")
+        return reviews
+    
+    def _extract_reviews_elements(self, driver, max_reviews) -> List[Dict]:
+        """Extract reviews element by element through WebDriver"""
+        reviews = []
+        
+        with self._no_implicit_wait(driver):
+            review_elements = []
+            for selector in REVIEW_SELECTORS:
+                review_elements = driver.find_elements(By.CSS_SELECTOR, selector)
+                if review_elements:
+                    logger.info(f"Found {len(review_elements)} reviews with selector: {selector}")
+                    break
+            
+            if not review_elements:
+                logger.warning("No review elements found")
+                return reviews
+            
+            for idx, element in enumerate(review_elements[:max_reviews]):
+                try:
+                    review_data = self._parse_review_element(element, driver)
+                    if review_data and review_data['text']:
+                        reviews.append(review_data)
+                except Exception as e:
+                    logger.debug(f"Error parsing review {idx}: {e}")
+                    continue
         
         return reviews
     
+    @contextmanager
+    def _no_implicit_wait(self, driver):
+        """
+        Disable the implicit wait while probing optional selectors
+        
+        Otherwise every selector fallback that is missing stalls for the full
+        implicit wait (10s) before raising NoSuchElementException. Nested
+        uses keep the wait disabled until the outermost one exits.
+        """
+        if self._implicit_wait_disabled:
+            yield
+            return
+        
+        driver.implicitly_wait(0)
+        self._implicit_wait_disabled = True
+        try:
+            yield
+        finally:
+            self._implicit_wait_disabled = False
+            driver.implicitly_wait(WebDriverManager.IMPLICIT_WAIT_SECONDS)
+    
     def _parse_review_element(self, element, driver) -> Dict:
         """Parse individual review element"""
         review = {
             'text': '',
             'rating': None,
             'author': '',
-            'date': ''
+            'date': '',
+            'review_id': element.get_attribute('data-review-id') or ''
         }
         
         try:
             # Extract review text
-            text_selectors = [
-                "span.wiI7pd",
-                "span[data-expandable-section]",
-                "div.MyEned",
-                "span.review-full-text"
-            ]
-            
-            for selector in text_selectors:
+            for selector in REVIEW_TEXT_SELECTORS:
                 try:
                     # Check if there's a "More" button and click it
                     try:
-                        more_button = element.find_element(By.CSS_SELECTOR, "button[aria-label*='More']")
+                        more_button = element.find_element(By.CSS_SELECTOR, MORE_BUTTON_SELECTOR)
                         driver.execute_script("arguments[0].click();", more_button)
                         time.sleep(0.3)
                     except:
@@ -224,7 +866,7 @@ class GoogleMapsScraper:
             
             # Extract rating (count stars)
             try:
-                stars = element.find_elements(By.CSS_SELECTOR, "span.hCCjke[aria-label*='stars'], span[aria-label*='stars']")
+                stars = element.find_elements(By.CSS_SELECTOR, REVIEW_RATING_SELECTOR)
                 if stars:
                     aria_label = stars[0].get_attribute('aria-label')
                     if aria_label:
@@ -235,8 +877,7 @@ class GoogleMapsScraper:
             
             # Extract author name
             try:
-                author_selectors = ["div.d4r55", "span.x3PK2d", "div.TSUbDb"]
-                for selector in author_selectors:
+                for selector in REVIEW_AUTHOR_SELECTORS:
                     try:
                         author_element = element.find_element(By.CSS_SELECTOR, selector)
                         review['author'] = author_element.text.strip()
@@ -249,8 +890,7 @@ class GoogleMapsScraper:
             
             # Extract date
             try:
-                date_selectors = ["span.rsqaWe", "span.DZVBPb", "span.dehysf"]
-                for selector in date_selectors:
+                for selector in REVIEW_DATE_SELECTORS:
                     try:
                         date_element = element.find_element(By.CSS_SELECTOR, selector)
                         review['date'] = date_element.text.strip()
@@ -260,15 +900,16 @@ class GoogleMapsScraper:
                         continue
             except:
                 pass
-            
+        
         except Exception as e:
             logger.debug(f"Error in _parse_review_element: {e}")
         
         return review
     
     def close(self):
-        """Close the WebDriver"""
-        self.webdriver_manager.close()
+        """Close the WebDriver (pooled browsers stay open for reuse)"""
+        if self.webdriver_manager:
+            self.webdriver_manager.close()
     
     def __enter__(self):
         """Context manager entry"""
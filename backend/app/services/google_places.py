@@ -4,8 +4,8 @@ Google Places API Service
 Handles interaction with Google Places API to find restaurants.
 """
 
-import googlemaps
 from typing import List, Dict, Optional
+import asyncio
 import logging
 from app.core.config import settings
 
@@ -20,15 +20,36 @@ class GooglePlacesService:
         self.api_key = settings.GOOGLE_PLACES_API_KEY
         self.client = None
         
+        from app.services.rate_limiter import get_target_limiter
+        # Every API call that is not served from the cache draws from the fleet-wide Places budget
+        self.rate_limiter = get_target_limiter('places_api')
+        
         if self.api_key and self.api_key != "":
             try:
-                self.client = googlemaps.Client(key=self.api_key)
+                import googlemaps  # Deferred: only needed once a key is configured
+                from app.services.http_cache import cached_session
+                # Identical lookups within their TTL are served from the on-disk cache
+                self.client = googlemaps.Client(
+                    key=self.api_key,
+                    requests_session=cached_session(rate_limiter=self.rate_limiter)
+                )
                 logger.info("Google Places API client initialized")
             except Exception as e:
                 logger.warning(f"Failed to initialize Google Places client: {e}")
         else:
             logger.warning("Google Places API key not configured")
     
+    async def _call(self, method, *args, **kwargs):
+        """
+        Call a googlemaps client method off the event loop
+        
+        The client's session draws from the rate limiter (which may sleep or
+        wait on Redis) on every cache miss, and the HTTP call blocks too, so
+        both run in a worker thread instead of stalling every other request
+        served by this process.
+        """
+        return await asyncio.to_thread(method, *args, **kwargs)
+    
     async def find_restaurants(
         self,
         location: str,
@@ -53,7 +74,7 @@ class GooglePlacesService:
         
         try:
             # First, geocode the location to get coordinates
-            geocode_result = self.client.geocode(location)
+            geocode_result = await self._call(self.client.geocode, location)
             
             if not geocode_result:
                 raise Exception(f"Location not found: {location}")
@@ -64,7 +85,8 @@ class GooglePlacesService:
             logger.info(f"Location coordinates: {lat}, {lng}")
             
             # Search for restaurants using Places API
-            places_result = self.client.places_nearby(
+            places_result = await self._call(
+                self.client.places_nearby,
                 location=(lat, lng),
                 radius=radius,
                 type='restaurant',
@@ -76,7 +98,8 @@ class GooglePlacesService:
             
             for place in results:
                 # Get more details about the place
-                place_details = self.client.place(
+                place_details = await self._call(
+                    self.client.place,
                     place_id=place['place_id'],
                     fields=['name', 'rating', 'formatted_address', 'place_id', 'user_ratings_total', 'photo']
                 )
@@ -142,7 +165,8 @@ class GooglePlacesService:
             logger.info(f"Searching by name/text: {query}")
             
             # Use text search for finding specific restaurants
-            places_result = self.client.places(
+            places_result = await self._call(
+                self.client.places,
                 query=query,
                 type='restaurant'
             )
@@ -153,7 +177,8 @@ class GooglePlacesService:
             for place in results:
                 # Get more details about the place
                 try:
-                    place_details = self.client.place(
+                    place_details = await self._call(
+                        self.client.place,
                         place_id=place['place_id'],
                         fields=['name', 'rating', 'formatted_address', 'place_id', 'user_ratings_total', 'geometry', 'photo']
                     )
@@ -211,7 +236,8 @@ class GooglePlacesService:
             raise Exception("Google Places API not configured")
         
         try:
-            place_details = self.client.place(
+            place_details = await self._call(
+                self.client.place,
                 place_id=place_id,
                 fields=['name', 'rating', 'formatted_address', 'reviews', 'photo']
             )
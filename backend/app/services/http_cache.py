@@ -0,0 +1,362 @@
+"""
+HTTP Response Cache
+
+Persistent, on-disk cache for GET responses made by the Reddit (PRAW) and
+Google Places clients.
+
+Celery retries and repeated scrape triggers re-issue identical requests;
+with the cache mounted on the clients' requests sessions, anything fetched
+within its endpoint's TTL is served from disk without an outbound call.
+
+Entries are zlib-compressed files named by a hash of the request, shared by
+every process on the host. The directory is bounded by size: when it grows
+past max_bytes the least recently used entries are evicted. Each process
+only sees its own writes between checks, so the size is re-read from disk
+periodically and eviction runs under a file lock shared by all processes.
+
+Sessions can also carry a rate limiter, which is drawn from only for
+requests that actually go out, so cache hits do not spend API quota.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: eviction is only serialized within a process
+    fcntl = None
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# (endpoint class, URL pattern, TTL seconds); first match wins, unmatched URLs are not cached
+ENDPOINT_TTLS: List[Tuple[str, str, int]] = [
+    ('google_geocode', r'maps\.googleapis\.com/maps/api/geocode/', 30 * 24 * 3600),
+    ('google_details', r'maps\.googleapis\.com/maps/api/place/details/', 24 * 3600),
+    ('google_search', r'maps\.googleapis\.com/maps/api/place/(nearbysearch|textsearch)/', 6 * 3600),
+    ('reddit_search', r'oauth\.reddit\.com/r/[^/]+/search', 6 * 3600),
+    ('reddit_comments', r'oauth\.reddit\.com/comments/', 6 * 3600),
+    ('reddit_listing', r'oauth\.reddit\.com/r/[^/]+/(new|top|hot)', 3600),
+]
+
+# Headers that describe the original transfer or live quota state, not the content
+_DROPPED_HEADERS = {
+    'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'date',
+    'set-cookie', 'x-ratelimit-remaining', 'x-ratelimit-used', 'x-ratelimit-reset',
+}
+
+
+class ResponseCache:
+    """Size-bounded on-disk store of compressed responses"""
+    
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        compress_level: int = 6,
+        size_check_interval: float = 30.0
+    ):
+        """
+        Initialize cache
+        
+        Args:
+            directory: Cache directory (created if missing)
+            max_bytes: Total size of stored entries before LRU eviction
+            compress_level: zlib compression level
+            size_check_interval: Seconds between re-reading the directory
+                size from disk (to account for other processes' writes)
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self.size_check_interval = size_check_interval
+        os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._lock_fallback = threading.Lock()
+        self._lock_path = os.path.join(directory, '.evict.lock')
+        self._size = sum(size for _, size, _ in self._entries())
+        self._size_checked = time.monotonic()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._evictions = 0
+    
+    @staticmethod
+    def endpoint_class(url: str) -> Optional[Tuple[str, int]]:
+        """Endpoint class and TTL for a URL, or None if it is not cacheable"""
+        for name, pattern, ttl in ENDPOINT_TTLS:
+            if re.search(pattern, url):
+                return name, ttl
+        return None
+    
+    @staticmethod
+    def key(method: str, url: str) -> str:
+        """Cache key for a request (auth headers are not part of the key)"""
+        return hashlib.sha256(f"{method.upper()} {url}".encode('utf-8')).hexdigest()
+    
+    def get(self, key: str, endpoint: str, ttl: int) -> Optional[Tuple[Dict, bytes]]:
+        """
+        Look up a fresh entry
+        
+        Returns:
+            (metadata, body) or None on miss/expiry
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                payload = zlib.decompress(f.read())
+            meta_line, body = payload.split(b'\n', 1)
+            meta = json.loads(meta_line)
+        except (OSError, ValueError, zlib.error):
+            self._count(endpoint, 'misses')
+            return None
+        
+        if time.time() - meta['stored_at'] > ttl:
+            self._count(endpoint, 'misses')
+            return None
+        
+        # Refresh mtime so eviction is least-recently-used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._count(endpoint, 'hits')
+        return meta, body
+    
+    def put(self, key: str, endpoint: str, meta: Dict, body: bytes):
+        """Store an entry, evicting old entries if the cache is over its size bound"""
+        meta = dict(meta, stored_at=time.time())
+        data = zlib.compress(json.dumps(meta).encode('utf-8') + b'\n' + body, self.compress_level)
+        
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+        
+        # Atomic replace: other processes never read a partial entry
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        
+        self._count(endpoint, 'stores')
+        with self._lock:
+            self._size += len(data) - previous
+            due = self._size > self.max_bytes or time.monotonic() - self._size_checked >= self.size_check_interval
+        if due:
+            self._enforce_limit()
+    
+    def _enforce_limit(self):
+        """
+        Re-read the directory size from disk and evict if it is over max_bytes
+        
+        The in-memory size only tracks this process's writes, so the decision
+        is made on the on-disk total, under a lock file so concurrent
+        processes do not evict the same entries twice.
+        """
+        with self._eviction_lock():
+            entries = list(self._entries())
+            total = sum(size for _, size, _ in entries)
+            evicted = 0
+            
+            if total > self.max_bytes:
+                target = self.max_bytes * 0.9
+                for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+                    if total <= target:
+                        break
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        continue
+                    total -= size
+                    evicted += 1
+            
+            with self._lock:
+                self._size = total
+                self._size_checked = time.monotonic()
+                self._evictions += evicted
+        
+        if evicted:
+            logger.info(f"HTTP cache evicted {evicted} entries ({total / 1024 / 1024:.1f}MB remaining)")
+    
+    @contextmanager
+    def _eviction_lock(self):
+        """Exclusive lock on the cache directory, shared by every process on the host"""
+        if fcntl is None:
+            with self._lock_fallback:
+                yield
+            return
+        
+        with open(self._lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _entries(self):
+        """(path, size, mtime) of every stored entry"""
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith('.z'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.z")
+    
+    def _count(self, endpoint: str, field: str):
+        with self._lock:
+            counters = self._stats.setdefault(endpoint, {'hits': 0, 'misses': 0, 'stores': 0})
+            counters[field] = counters.get(field, 0) + 1
+    
+    def stats(self) -> Dict:
+        """
+        Hit/miss counters and hit ratio per endpoint class (this process)
+        
+        Returns:
+            Dict with 'endpoints', overall 'hit_ratio', 'size_bytes' (as of
+            the last size check) and 'evictions'
+        """
+        with self._lock:
+            endpoints = {name: dict(counters, hit_ratio=_ratio(counters)) for name, counters in self._stats.items()}
+            evictions = self._evictions
+            size = self._size
+        
+        hits = sum(c['hits'] for c in endpoints.values())
+        misses = sum(c['misses'] for c in endpoints.values())
+        return {
+            'endpoints': endpoints,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': _ratio({'hits': hits, 'misses': misses}),
+            'size_bytes': size,
+            'evictions': evictions,
+        }
+
+
+def _ratio(counters: Dict[str, int]) -> float:
+    lookups = counters.get('hits', 0) + counters.get('misses', 0)
+    return round(counters.get('hits', 0) / lookups, 3) if lookups else 0.0
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """requests transport adapter that draws from a rate limiter before each outbound request"""
+    
+    def __init__(self, rate_limiter=None, **kwargs):
+        super().__init__(**kwargs)
+        self.rate_limiter = rate_limiter
+    
+    def send(self, request, **kwargs):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        return super().send(request, **kwargs)
+
+
+class CachingAdapter(RateLimitedAdapter):
+    """
+    requests transport adapter that serves cacheable GETs from a ResponseCache
+    
+    The rate limiter is only drawn from on a cache miss.
+    """
+    
+    def __init__(self, cache: ResponseCache, rate_limiter=None, **kwargs):
+        super().__init__(rate_limiter=rate_limiter, **kwargs)
+        self.cache = cache
+    
+    def send(self, request, **kwargs):
+        endpoint = self.cache.endpoint_class(request.url) if request.method == 'GET' else None
+        if endpoint is None:
+            return super().send(request, **kwargs)
+        
+        name, ttl = endpoint
+        key = self.cache.key(request.method, request.url)
+        
+        cached = self.cache.get(key, name, ttl)
+        if cached is not None:
+            return self._build_response(request, *cached)
+        
+        response = super().send(request, **kwargs)
+        if response.status_code == 200:
+            # Reading .content here is fine: callers would read the whole body anyway
+            self.cache.put(key, name, {
+                'status': response.status_code,
+                'reason': response.reason,
+                'headers': {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS},
+                'encoding': response.encoding,
+            }, response.content)
+        return response
+    
+    @staticmethod
+    def _build_response(request, meta: Dict, body: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = meta['status']
+        response.reason = meta.get('reason')
+        response.headers = CaseInsensitiveDict(meta.get('headers', {}))
+        response.headers['X-Cache'] = 'HIT'
+        response.encoding = meta.get('encoding')
+        response._content = body
+        response.url = request.url
+        response.request = request
+        return response
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[ResponseCache]:
+    """This process's response cache, or None when HTTP_CACHE_ENABLED is off"""
+    global _cache
+    from app.core.config import settings
+    
+    if not settings.HTTP_CACHE_ENABLED:
+        return None
+    
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(settings.HTTP_CACHE_DIR, max_bytes=settings.HTTP_CACHE_MAX_MB * 1024 * 1024)
+            logger.info(f"HTTP response cache at {settings.HTTP_CACHE_DIR} ({settings.HTTP_CACHE_MAX_MB}MB)")
+    return _cache
+
+
+def cached_session(rate_limiter=None) -> requests.Session:
+    """
+    requests.Session for API clients, with the response cache mounted when enabled
+    
+    Pass to googlemaps.Client(requests_session=...) or
+    praw.Reddit(requestor_kwargs={'session': ...}).
+    
+    Args:
+        rate_limiter: Limiter drawn from for every request that is not
+            served from the cache
+    """
+    session = requests.Session()
+    cache = get_http_cache()
+    if cache is not None:
+        adapter = CachingAdapter(cache, rate_limiter=rate_limiter)
+    elif rate_limiter is not None:
+        adapter = RateLimitedAdapter(rate_limiter)
+    else:
+        return session
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
@@ -0,0 +1,94 @@
+"""
+Insight Store
+
+Persists restaurant-level ML insights (sentiment, vibes, dishes,
+complaints) computed by the background ML tasks, so the search path can
+serve scraped restaurants without running any ML.
+
+Insights are keyed to a fingerprint of the processed review set they were
+computed from; the ML tasks only recompute them when that set changes.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Sequence
+
+
+def review_set_fingerprint(review_ids: Iterable[int]) -> str:
+    """Order-independent SHA-256 fingerprint of a set of review ids"""
+    joined = ','.join(str(rid) for rid in sorted(review_ids))
+    return hashlib.sha256(joined.encode('utf-8')).hexdigest()
+
+
+def load_insights(db, restaurant_ids: Sequence[int]) -> Dict[int, object]:
+    """Stored RestaurantInsight rows by restaurant id"""
+    from app.models.database import RestaurantInsight
+    
+    if not restaurant_ids:
+        return {}
+    rows = db.query(RestaurantInsight).filter(RestaurantInsight.restaurant_id.in_(list(restaurant_ids))).all()
+    return {row.restaurant_id: row for row in rows}
+
+
+def save_insights(db, restaurant_id: int, insights: Dict, review_count: int, fingerprint: str):
+    """
+    Insert or update a restaurant's insights (committed by the caller)
+    
+    A single upsert, so two ML tasks saving the same restaurant's first
+    insights concurrently don't collide on the unique restaurant_id.
+    
+    Args:
+        db: Database session
+        restaurant_id: Database restaurant ID
+        insights: BatchAnalyzer result (trueSentiment, vibeCheck,
+            mustTryDishes, commonComplaints)
+        review_count: Number of processed reviews analyzed
+        fingerprint: review_set_fingerprint of those reviews
+    """
+    from app.models.database import RestaurantInsight
+    from app.services.review_store import dialect_insert
+    
+    values = {
+        'true_sentiment': insights['trueSentiment'],
+        'vibe_check': insights['vibeCheck'],
+        'must_try_dishes': insights['mustTryDishes'],
+        'common_complaints': insights['commonComplaints'],
+        'review_count': review_count,
+        'review_set_hash': fingerprint,
+        'computed_at': datetime.utcnow(),
+    }
+    stmt = dialect_insert(db)(RestaurantInsight).values(restaurant_id=restaurant_id, **values)
+    db.execute(stmt.on_conflict_do_update(index_elements=['restaurant_id'], set_=values))
+
+
+def insights_for_places(db, place_ids: Sequence[str]) -> Dict[str, Dict]:
+    """
+    Stored insights for the given places, in the search response format
+    
+    Returns:
+        Dict of place_id -> {trueSentiment, vibeCheck, mustTryDishes,
+        commonComplaints}; places without stored insights are absent
+    """
+    from app.models.database import Restaurant, RestaurantInsight
+    
+    if not place_ids:
+        return {}
+    rows = db.query(Restaurant.place_id, RestaurantInsight).join(
+        RestaurantInsight, RestaurantInsight.restaurant_id == Restaurant.id
+    ).filter(Restaurant.place_id.in_(list(place_ids))).all()
+    
+    return {place_id: to_response(insight) for place_id, insight in rows}
+
+
+def to_response(insight) -> Dict:
+    """RestaurantInsight row -> search response insight fields"""
+    return {
+        'trueSentiment': insight.true_sentiment,
+        'vibeCheck': insight.vibe_check or [],
+        'mustTryDishes': insight.must_try_dishes or [],
+        'commonComplaints': insight.common_complaints or [],
+    }
+
+
+def stored_fingerprint(insight) -> Optional[str]:
+    return insight.review_set_hash if insight is not None else None
@@ -0,0 +1,149 @@
+"""
+Job Events
+
+Live progress for scraping jobs, pushed to clients instead of having them
+poll GET /scraping/status/{job_id}.
+
+Every job status transition (see app.services.job_lifecycle) and the
+scrape tasks' progress (phase, reviews loaded so far) is published as a
+JSON event on the Redis channel jobs:events:<job_id>. The latest event is
+also kept under jobs:last:<job_id> for a while, so a client that
+subscribes mid-job starts from the current state. The SSE endpoint
+GET /scraping/status/{job_id}/events relays these events to clients.
+
+Publishing is best-effort: progress events are never worth failing or
+stalling a scrape, so while Redis is unreachable they are dropped. A
+stream therefore re-reads the job from the database whenever it has been
+quiet for a keepalive period, and ends once the job is finished even if
+its final event was lost.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Statuses after which a job publishes nothing more
+TERMINAL_STATUSES = ('completed', 'failed')
+
+# How long the latest event of a job is kept for late subscribers
+SNAPSHOT_TTL_SECONDS = 3600
+
+# Seconds to skip publishing after Redis failed, instead of timing out on every event
+RETRY_INTERVAL = 30
+
+_retry_at = 0.0
+
+
+def channel(job_id: int) -> str:
+    return f"jobs:events:{job_id}"
+
+
+def snapshot_key(job_id: int) -> str:
+    return f"jobs:last:{job_id}"
+
+
+def publish_job_event(job_id: int, status: str, **data) -> Dict:
+    """
+    Publish a job event and keep it as the job's latest state
+    
+    Args:
+        job_id: ScrapingJob ID
+        status: Job status (pending, running, completed, failed)
+        **data: Extra event fields (phase, reviews_loaded, reviews_scraped,
+            error_message, ...)
+    
+    Returns:
+        The event
+    """
+    global _retry_at
+    from redis.exceptions import RedisError
+    from app.core.redis_client import get_redis
+    
+    event = dict(data, job_id=job_id, status=status, at=datetime.utcnow().isoformat())
+    if time.monotonic() < _retry_at:
+        return event
+    
+    payload = json.dumps(event, default=str)
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.set(snapshot_key(job_id), payload, ex=SNAPSHOT_TTL_SECONDS)
+        pipe.publish(channel(job_id), payload)
+        pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Job events unavailable, dropping events for {RETRY_INTERVAL}s: {e}")
+        _retry_at = time.monotonic() + RETRY_INTERVAL
+    return event
+
+
+def job_snapshot(job) -> Dict:
+    """Event describing a ScrapingJob row's current state"""
+    event = {'job_id': job.id, 'status': job.status, 'place_id': job.place_id, 'reviews_scraped': job.reviews_scraped}
+    if job.error_message:
+        event['error_message'] = job.error_message
+    return event
+
+
+def load_job_snapshot(job_id: int) -> Optional[Dict]:
+    """The job's current state from the database (None if unreadable)"""
+    from sqlalchemy.exc import SQLAlchemyError
+    from app.models.database import get_session_local, ScrapingJob
+    
+    db = get_session_local()()
+    try:
+        job = db.get(ScrapingJob, job_id)
+        return job_snapshot(job) if job else None
+    except SQLAlchemyError as e:
+        logger.warning(f"Failed to re-read job {job_id}: {e}")
+        return None
+    finally:
+        db.close()
+
+
+async def stream_job_events(job_id: int, initial: Dict, keepalive: float) -> AsyncIterator[Optional[Dict]]:
+    """
+    Yield a job's events until it completes or fails
+    
+    Subscribes before reading the stored latest event, so nothing published
+    in between is missed. Yields None every `keepalive` seconds without an
+    event, so the caller can keep the connection alive and notice
+    disconnected clients. Each quiet period also re-reads the job from the
+    database and yields its final state if it finished without a
+    (delivered) terminal event.
+    
+    Args:
+        job_id: ScrapingJob ID
+        initial: The job's state as read from the database; sent first
+            unless Redis holds a newer event
+        keepalive: Maximum seconds between yields
+    
+    Raises:
+        redis.exceptions.RedisError: If Redis is unreachable
+    """
+    import redis.asyncio as aioredis
+    from app.core.config import settings
+    
+    client = aioredis.Redis.from_url(settings.REDIS_URL, socket_connect_timeout=1)
+    pubsub = client.pubsub()
+    try:
+        await pubsub.subscribe(channel(job_id))
+        
+        latest = await client.get(snapshot_key(job_id))
+        event = json.loads(latest) if latest and initial['status'] not in TERMINAL_STATUSES else initial
+        yield event
+        
+        while event is None or event['status'] not in TERMINAL_STATUSES:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=keepalive)
+            if message:
+                event = json.loads(message['data'])
+            else:
+                current = await asyncio.to_thread(load_job_snapshot, job_id)
+                event = current if current and current['status'] in TERMINAL_STATUSES else None
+            yield event
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
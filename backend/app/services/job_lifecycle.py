@@ -0,0 +1,269 @@
+"""
+Scraping Job Lifecycle
+
+One ScrapingJob row per scrape, created by whoever queues the scrape and
+passed to the task by id:
+
+    pending -> running -> completed
+                       -> failed
+                       -> pending   (retry scheduled)
+
+- At most one pending/running job per place_id, enforced by a partial
+  unique index (ix_scraping_jobs_active_place), so concurrent triggers
+  cannot both create one.
+- Every status change is a compare-and-set UPDATE ... WHERE status IN (...);
+  a transition that lost a race changes nothing and reports False. Successful
+  transitions are published as job events (app.services.job_events).
+- While a job runs, its worker holds a Redis lease on the place_id
+  (lease:place:<place_id> = job id) that a heartbeat thread keeps renewing.
+  If the worker dies the lease expires, and reap_stale_jobs() fails the
+  orphaned running job so the place can be scraped again.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Statuses of jobs that hold a place (at most one per place_id)
+IN_FLIGHT_STATUSES = ('pending', 'running')
+
+# Transition fields included in the published job event
+EVENT_FIELDS = ('reviews_scraped', 'error_message')
+
+# Renew if we still own the lease, or take it back if it lapsed (e.g. Redis restarted)
+_RENEW_SCRIPT = """
+local owner = redis.call('GET', KEYS[1])
+if owner == ARGV[1] or not owner then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def create_jobs(db, places: Sequence[Tuple[int, str]], batch_id: Optional[str] = None) -> Dict[str, int]:
+    """
+    Create pending jobs in one insert, skipping places that already have one in flight
+    
+    Args:
+        db: Database session (committed by the caller)
+        places: (restaurant_id, place_id) pairs
+        batch_id: Optional batch identifier stored on every job
+    
+    Returns:
+        Dict of place_id -> new job id, for the places that got a job
+    """
+    from app.models.database import ScrapingJob
+    from app.services.review_store import dialect_insert
+    
+    rows = {
+        place_id: {
+            'restaurant_id': restaurant_id,
+            'place_id': place_id,
+            'status': 'pending',
+            'batch_id': batch_id,
+            'created_at': datetime.utcnow(),
+        }
+        for restaurant_id, place_id in places
+    }
+    if not rows:
+        return {}
+    
+    stmt = (
+        dialect_insert(db)(ScrapingJob)
+        .values(list(rows.values()))
+        .on_conflict_do_nothing(
+            index_elements=['place_id'],
+            index_where=ScrapingJob.status.in_(IN_FLIGHT_STATUSES)
+        )
+        .returning(ScrapingJob.place_id, ScrapingJob.id)
+    )
+    return dict(db.execute(stmt).all())
+
+
+def in_flight_job(db, place_id: str):
+    """The pending/running job for a place, if any"""
+    from app.models.database import ScrapingJob
+    
+    return db.query(ScrapingJob).filter(
+        ScrapingJob.place_id == place_id,
+        ScrapingJob.status.in_(IN_FLIGHT_STATUSES)
+    ).first()
+
+
+def transition(db, job_id: int, from_statuses: Iterable[str], to_status: str, **fields) -> bool:
+    """
+    Compare-and-set a job's status, committing and publishing a job event on success
+    
+    Args:
+        db: Database session
+        job_id: ScrapingJob ID
+        from_statuses: Statuses the job must currently have
+        to_status: New status
+        **fields: Other columns to set with the transition
+    
+    Returns:
+        True if the job was in one of from_statuses and has been moved
+    """
+    from app.models.database import ScrapingJob
+    from app.services.job_events import publish_job_event
+    
+    updated = db.query(ScrapingJob).filter(
+        ScrapingJob.id == job_id,
+        ScrapingJob.status.in_(list(from_statuses))
+    ).update(dict(fields, status=to_status), synchronize_session=False)
+    db.commit()
+    
+    if not updated:
+        logger.info(f"Job {job_id}: transition to '{to_status}' skipped (not in {list(from_statuses)})")
+        return False
+    
+    publish_job_event(job_id, to_status, **{name: fields[name] for name in EVENT_FIELDS if name in fields})
+    return True
+
+
+def fail_unqueued_jobs(db, job_ids: Iterable[int], error: Exception) -> None:
+    """
+    Fail pending jobs whose task could not be sent to the broker
+    
+    Otherwise the pending rows would hold their places (and the scheduler
+    budget) until reap_stale_jobs() expires them.
+    
+    Args:
+        db: Database session
+        job_ids: ScrapingJob IDs that were created but never queued
+        error: The enqueue error, recorded as the jobs' error_message
+    """
+    now = datetime.utcnow()
+    for job_id in job_ids:
+        transition(db, job_id, ['pending'], 'failed', error_message=f"Could not queue task: {error}", completed_at=now)
+
+
+def lease_key(place_id: str) -> str:
+    return f"lease:place:{place_id}"
+
+
+class PlaceLeases:
+    """
+    Redis leases on the places a worker is scraping, renewed by a heartbeat
+    
+    Use as a context manager; `held` lists the places whose lease was
+    acquired. If Redis is unreachable every place counts as held (the job
+    status transitions still keep scrapes exclusive) and the heartbeat keeps
+    trying to take the leases.
+    """
+    
+    def __init__(self, client, owners: Dict[str, int], ttl_seconds: float):
+        """
+        Args:
+            client: redis.Redis client
+            owners: place_id -> job id holding it
+            ttl_seconds: Lease lifetime; renewed every third of it
+        """
+        self.client = client
+        self.owners = {place_id: str(job_id) for place_id, job_id in owners.items()}
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.held: List[str] = []
+        self._renew = client.register_script(_RENEW_SCRIPT)
+        self._release = client.register_script(_RELEASE_SCRIPT)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def __enter__(self):
+        from redis.exceptions import RedisError
+        
+        try:
+            self.held = [
+                place_id for place_id, owner in self.owners.items()
+                if self.client.set(lease_key(place_id), owner, nx=True, px=self.ttl_ms)
+            ]
+        except RedisError as e:
+            logger.warning(f"Lease store unavailable, scraping without leases: {e}")
+            self.held = list(self.owners)
+        
+        if self.held:
+            self._thread = threading.Thread(target=self._heartbeat, name='lease-heartbeat', daemon=True)
+            self._thread.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        from redis.exceptions import RedisError
+        
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        for place_id in self.held:
+            try:
+                self._release(keys=[lease_key(place_id)], args=[self.owners[place_id]])
+            except RedisError as e:
+                logger.warning(f"Failed to release lease on {place_id}: {e}")
+    
+    def _heartbeat(self):
+        from redis.exceptions import RedisError
+        
+        while not self._stop.wait(self.ttl_ms / 3000):
+            for place_id in self.held:
+                try:
+                    if not self._renew(keys=[lease_key(place_id)], args=[self.owners[place_id], self.ttl_ms]):
+                        logger.error(f"Lease on {place_id} was taken over by another job")
+                except RedisError as e:
+                    logger.warning(f"Failed to renew lease on {place_id}: {e}")
+
+
+def reap_stale_jobs(db, client, lease_seconds: float, pending_timeout: timedelta, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Fail jobs orphaned by crashed workers or lost messages
+    
+    A running job whose lease is gone (its worker stopped heartbeating) is
+    failed once it has been running longer than a lease period. A pending
+    job older than pending_timeout is failed as never started.
+    
+    Args:
+        db: Database session
+        client: redis.Redis client holding the leases
+        lease_seconds: Lease TTL (grace period for freshly started jobs)
+        pending_timeout: Maximum time a job may wait to start
+        now: Reference time (defaults to utcnow)
+    
+    Returns:
+        Dict with the number of running and pending jobs reaped
+    """
+    from app.models.database import ScrapingJob
+    
+    now = now or datetime.utcnow()
+    reaped = {'running': 0, 'pending': 0}
+    
+    running = db.query(ScrapingJob.id, ScrapingJob.place_id).filter(
+        ScrapingJob.status == 'running',
+        ScrapingJob.started_at < now - timedelta(seconds=lease_seconds)
+    ).all()
+    if running:
+        owners = client.mget([lease_key(place_id) for _, place_id in running])
+        for (job_id, place_id), owner in zip(running, owners):
+            if owner is not None and owner.decode() == str(job_id):
+                continue
+            if transition(db, job_id, ['running'], 'failed',
+                          error_message='Worker lost: lease expired', completed_at=now):
+                logger.warning(f"Reaped job {job_id} for {place_id}: lease expired")
+                reaped['running'] += 1
+    
+    stale_pending = db.query(ScrapingJob.id).filter(
+        ScrapingJob.status == 'pending',
+        ScrapingJob.created_at < now - pending_timeout
+    ).all()
+    for (job_id,) in stale_pending:
+        if transition(db, job_id, ['pending'], 'failed',
+                      error_message='Never started: task lost or expired', completed_at=now):
+            reaped['pending'] += 1
+    
+    return reaped
@@ -0,0 +1,27 @@
+"""
+Google Maps Selectors
+
+CSS selectors for Google Maps review markup, shared by the live Selenium
+scraper and the offline snapshot parser so a class-name change only has to
+be fixed here.
+"""
+
+# Selectors to try, in order (Google Maps HTML changes frequently)
+REVIEW_SELECTORS = [
+    "div.jftiEf",
+    "div[data-review-id]",
+    "div.gws-localreviews__google-review",
+    "div.section-review"
+]
+REVIEW_TEXT_SELECTORS = [
+    "span.wiI7pd",
+    "span[data-expandable-section]",
+    "div.MyEned",
+    "span.review-full-text"
+]
+REVIEW_RATING_SELECTOR = "span.hCCjke[aria-label*='stars'], span[aria-label*='stars']"
+REVIEW_AUTHOR_SELECTORS = ["div.d4r55", "span.x3PK2d", "div.TSUbDb"]
+REVIEW_DATE_SELECTORS = ["span.rsqaWe", "span.DZVBPb", "span.dehysf"]
+MORE_BUTTON_SELECTOR = "button[aria-label*='More']"
+SORT_BUTTON_SELECTOR = "button[aria-label*='Sort'], button[data-value='Sort']"
+SORT_MENU_ITEM_SELECTOR = "div[role='menuitemradio']"
@@ -0,0 +1,110 @@
+"""
+ML Pipeline
+
+Groups completed scrapes so ML runs as one process_ml_batch_task per group
+instead of one tiny task per restaurant (ML_PIPELINE_MODE=batched).
+
+Scrape tasks add restaurant ids to a Redis sorted set scored by when they
+were added (a restaurant re-scraped before its group runs is queued once).
+A group is released when it reaches ML_BATCH_SIZE restaurants, which the
+adding scrape task does immediately, or when its oldest restaurant has
+waited ML_BATCH_MAX_WAIT_SECONDS, which the periodic flush task does.
+A group whose task cannot be sent is put back with its original scores, so
+it is released again by the next flush instead of being lost.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Atomically pop up to ARGV[1] of the oldest ids, but only if that many are
+# waiting or the oldest was added before ARGV[2] (a unix timestamp). Returns
+# id, score pairs as a flat list so the group can be put back.
+_TAKE_SCRIPT = """
+local count = tonumber(ARGV[1])
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+if #oldest == 0 then
+    return {}
+end
+if redis.call('ZCARD', KEYS[1]) < count and tonumber(oldest[2]) > tonumber(ARGV[2]) then
+    return {}
+end
+local taken = redis.call('ZRANGE', KEYS[1], 0, count - 1, 'WITHSCORES')
+local ids = {}
+for i = 1, #taken, 2 do
+    ids[#ids + 1] = taken[i]
+end
+redis.call('ZREM', KEYS[1], unpack(ids))
+return taken
+"""
+
+
+class MLBatchBuffer:
+    """Restaurants with new reviews waiting for batched ML, shared by all workers"""
+    
+    def __init__(self, client, key: str = 'ml:pending'):
+        """
+        Initialize buffer
+        
+        Args:
+            client: redis.Redis client
+            key: Sorted set holding the waiting restaurant ids
+        """
+        self.client = client
+        self.key = key
+        self._take = client.register_script(_TAKE_SCRIPT)
+    
+    def add(self, restaurant_ids: Sequence[int]):
+        """Queue restaurants; ones already waiting keep their original position"""
+        now = time.time()
+        self.client.zadd(self.key, {str(rid): now for rid in restaurant_ids}, nx=True)
+    
+    def take(self, count: int, max_wait: Optional[float] = None) -> List[int]:
+        """
+        Pop the next group if it is ready
+        
+        Args:
+            count: Group size
+            max_wait: Also release a partial group once its oldest restaurant
+                has waited this many seconds (None releases only full groups)
+        
+        Returns:
+            Restaurant ids, oldest first (empty if no group is ready)
+        """
+        return [rid for rid, _ in self._take_scored(count, max_wait)]
+    
+    @contextmanager
+    def claim(self, count: int, max_wait: Optional[float] = None) -> Iterator[List[int]]:
+        """
+        Pop the next group like take(), putting it back if the block raises
+        
+        Use around sending the group's task: if the broker is unreachable the
+        ids are re-added with their original scores, keeping their place in
+        line for the next release.
+        """
+        taken = self._take_scored(count, max_wait)
+        try:
+            yield [rid for rid, _ in taken]
+        except BaseException:
+            if taken:
+                self.client.zadd(self.key, {str(rid): score for rid, score in taken}, nx=True)
+                logger.warning(f"Returned ML group of {len(taken)} restaurants to the buffer")
+            raise
+    
+    def _take_scored(self, count: int, max_wait: Optional[float]) -> List[Tuple[int, float]]:
+        cutoff = time.time() - max_wait if max_wait is not None else 0
+        flat = self._take(keys=[self.key], args=[count, cutoff])
+        return [(int(flat[i]), float(flat[i + 1])) for i in range(0, len(flat), 2)]
+    
+    def __len__(self) -> int:
+        return self.client.zcard(self.key)
+
+
+def get_ml_buffer() -> MLBatchBuffer:
+    """The ML batch buffer on the Celery Redis"""
+    from app.core.redis_client import get_redis
+    
+    return MLBatchBuffer(get_redis())
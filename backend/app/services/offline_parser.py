@@ -0,0 +1,196 @@
+"""
+Offline Review Parser
+
+Re-extracts Google Maps reviews from archived page snapshots (see
+app.services.snapshot_archive) with BeautifulSoup + lxml, using the same
+selectors as the live scraper (app.services.maps_selectors). No browser is
+needed, and archives are parsed in parallel on all cores.
+
+After Google changes its class names, fix maps_selectors.py and run:
+    python -m app.services.offline_parser --archive /path/to/archive --out reviews.jsonl
+    python -m app.services.offline_parser --archive /path/to/archive --store
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.services.maps_selectors import (
+    REVIEW_SELECTORS,
+    REVIEW_TEXT_SELECTORS,
+    REVIEW_RATING_SELECTOR,
+    REVIEW_AUTHOR_SELECTORS,
+    REVIEW_DATE_SELECTORS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def parse_reviews_html(html: str, max_reviews: Optional[int] = None) -> List[Dict]:
+    """
+    Extract reviews from Google Maps page HTML
+    
+    Mirrors GoogleMapsScraper's extraction: the first review selector that
+    matches wins, and each field takes the first non-empty selector match.
+    
+    Args:
+        html: Page HTML
+        max_reviews: Maximum number of reviews to return
+    
+    Returns:
+        List of review dictionaries with text, rating, author, date, review_id
+    """
+    from bs4 import BeautifulSoup
+    
+    soup = BeautifulSoup(html, 'lxml')
+    
+    elements = []
+    for selector in REVIEW_SELECTORS:
+        elements = soup.select(selector)
+        if elements:
+            break
+    
+    reviews = []
+    for element in elements[:max_reviews]:
+        review = {
+            'text': _first_text(element, REVIEW_TEXT_SELECTORS),
+            'rating': _rating(element),
+            'author': _first_text(element, REVIEW_AUTHOR_SELECTORS),
+            'date': _first_text(element, REVIEW_DATE_SELECTORS),
+            'review_id': element.get('data-review-id') or ''
+        }
+        if review['text']:
+            reviews.append(review)
+    
+    return reviews
+
+
+def _first_text(element, selectors: List[str]) -> str:
+    for selector in selectors:
+        node = element.select_one(selector)
+        text = node.get_text('\n', strip=True) if node else ''
+        if text:
+            return text
+    return ''
+
+
+def _rating(element) -> Optional[float]:
+    stars = element.select_one(REVIEW_RATING_SELECTOR)
+    if stars is None:
+        return None
+    try:
+        return float((stars.get('aria-label') or '').split()[0])
+    except (ValueError, IndexError):
+        return None
+
+
+def _parse_snapshot(job: Tuple[str, Dict]) -> Tuple[Dict, List[Dict], Optional[str]]:
+    """Worker: load and parse one archived snapshot"""
+    from app.services.snapshot_archive import SnapshotArchive
+    
+    directory, entry = job
+    try:
+        html = SnapshotArchive(directory).load(entry['digest'])
+        return entry, parse_reviews_html(html), None
+    except Exception as e:
+        return entry, [], str(e)
+
+
+def reparse_archive(directory: str, processes: Optional[int] = None, latest_only: bool = True) -> Iterator[Tuple[Dict, List[Dict]]]:
+    """
+    Re-extract reviews from every archived snapshot on a process pool
+    
+    Args:
+        directory: Archive directory
+        processes: Worker processes (defaults to all cores)
+        latest_only: Only parse the most recent snapshot per place
+    
+    Yields:
+        (index entry, reviews) per snapshot, in completion order
+    """
+    from app.services.snapshot_archive import SnapshotArchive
+    
+    jobs = [(directory, entry) for entry in SnapshotArchive(directory).entries(latest_only=latest_only)]
+    processes = processes or os.cpu_count() or 1
+    logger.info(f"Re-parsing {len(jobs)} snapshots on {processes} processes")
+    
+    with multiprocessing.Pool(processes) as pool:
+        for entry, reviews, error in pool.imap_unordered(_parse_snapshot, jobs, chunksize=4):
+            if error:
+                logger.warning(f"Failed to parse snapshot {entry['digest'][:12]}: {error}")
+            yield entry, reviews
+
+
+def _store(results: List[Tuple[Dict, List[Dict]]]) -> int:
+    """Insert re-extracted reviews for known restaurants (existing ones are skipped)"""
+    from datetime import datetime
+    from app.models.database import get_session_local, Restaurant
+    from app.services.review_store import bulk_insert_reviews, review_content_hash
+    
+    SessionLocal = get_session_local()
+    db = SessionLocal()
+    inserted = 0
+    try:
+        place_ids = {entry['place_id'] for entry, _ in results}
+        restaurant_ids = dict(
+            db.query(Restaurant.place_id, Restaurant.id).filter(Restaurant.place_id.in_(place_ids)).all()
+        )
+        
+        rows = []
+        for entry, reviews in results:
+            restaurant_id = restaurant_ids.get(entry['place_id'])
+            if restaurant_id is None:
+                continue
+            for review in reviews:
+                rows.append({
+                    'restaurant_id': restaurant_id,
+                    'review_text': review['text'],
+                    'rating': review['rating'],
+                    'author': review['author'],
+                    'review_date': review['date'],
+                    'source': 'google_maps',
+                    'external_id': review['review_id'] or None,
+                    'content_hash': review_content_hash(restaurant_id, 'google_maps', review['author'], review['text']),
+                    'scraped_at': datetime.fromisoformat(entry['captured_at']),
+                    'is_processed': False,
+                    'is_duplicate': False
+                })
+        
+        inserted, _ = bulk_insert_reviews(db, rows)
+        db.commit()
+    finally:
+        db.close()
+    return inserted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract reviews from archived Google Maps snapshots")
+    parser.add_argument('--archive', required=True, help="Snapshot archive directory")
+    parser.add_argument('--out', help="Write reviews as JSON lines to this file")
+    parser.add_argument('--store', action='store_true', help="Insert new reviews into the database")
+    parser.add_argument('--processes', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--all-captures', action='store_true', help="Parse every capture, not just the latest per place")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    results = list(reparse_archive(args.archive, args.processes, latest_only=not args.all_captures))
+    total = sum(len(reviews) for _, reviews in results)
+    print(f"Extracted {total} reviews from {len(results)} snapshots", file=sys.stderr)
+    
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            for entry, reviews in results:
+                for review in reviews:
+                    f.write(json.dumps(dict(review, place_id=entry['place_id'], digest=entry['digest'])) + '\n')
+    
+    if args.store:
+        print(f"Inserted {_store(results)} new reviews", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""
+Rate Limiter
+
+Token-bucket rate limiting for outbound API and scraping requests.
+
+TokenBucket limits a single process. RedisTokenBucket keeps the bucket in
+Redis so every Celery worker shares one budget per target; use
+get_target_limiter() for the configured per-target budgets (Google Maps
+page loads, Reddit API, Google Places API).
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by all callers in a process"""
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize bucket
+        
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens (burst size); the bucket starts full
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Take tokens, waiting until they are available
+        
+        Args:
+            tokens: Number of tokens to take
+            timeout: Maximum seconds to wait (None waits indefinitely)
+        
+        Returns:
+            True if the tokens were taken, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+            
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, rate: float, capacity: float) -> TokenBucket:
+    """
+    Return the process-wide bucket for a target, creating it on first use
+    
+    Args:
+        name: Target name (e.g. 'reddit')
+        rate: Tokens per second, used when the bucket is created
+        capacity: Burst size, used when the bucket is created
+    """
+    with _buckets_lock:
+        bucket = _buckets.get(name)
+        if bucket is None:
+            bucket = TokenBucket(rate=rate, capacity=capacity)
+            _buckets[name] = bucket
+            logger.info(f"Created rate limiter '{name}' ({rate:.2f}/s, burst {capacity})")
+    return bucket
+
+
+# Atomically refill the bucket from Redis server time and take tokens.
+# Returns the seconds to wait as a string (Lua numbers are truncated to
+# integers in replies); "0" means the tokens were taken.
+_ACQUIRE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisTokenBucket:
+    """
+    Token bucket stored in Redis and shared by every process using the same key
+    
+    Refill and take happen in one Lua script, so concurrent workers never
+    overdraw the bucket. If Redis is unreachable, callers fall back to a
+    process-local bucket with the same budget rather than failing.
+    """
+    
+    KEY_PREFIX = 'ratelimit:'
+    # Seconds to limit locally before trying Redis again after an error
+    RETRY_INTERVAL = 30
+    
+    def __init__(self, client, name: str, rate: float, capacity: float):
+        """
+        Initialize bucket
+        
+        Args:
+            client: redis.Redis client
+            name: Target name; the bucket lives at ratelimit:<name>
+            rate: Tokens added per second across all workers
+            capacity: Maximum tokens (burst size)
+        """
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.key = f"{self.KEY_PREFIX}{name}"
+        self._script = client.register_script(_ACQUIRE_SCRIPT)
+        self._fallback: Optional[TokenBucket] = None
+        self._retry_at = 0.0
+    
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Take tokens, waiting until they are available
+        
+        Args:
+            tokens: Number of tokens to take
+            timeout: Maximum seconds to wait (None waits indefinitely)
+        
+        Returns:
+            True if the tokens were taken, False on timeout
+        """
+        from redis.exceptions import RedisError
+        
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        while True:
+            if time.monotonic() < self._retry_at:
+                return self._local().acquire(tokens, None if deadline is None else max(0.0, deadline - time.monotonic()))
+            try:
+                wait = float(self._script(keys=[self.key], args=[self.rate, self.capacity, tokens]))
+            except RedisError as e:
+                logger.warning(f"Redis rate limiter '{self.name}' unavailable, limiting per process for {self.RETRY_INTERVAL}s: {e}")
+                self._retry_at = time.monotonic() + self.RETRY_INTERVAL
+                continue
+            
+            if wait <= 0:
+                return True
+            
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+    
+    def _local(self) -> TokenBucket:
+        if self._fallback is None:
+            self._fallback = get_rate_limiter(self.name, self.rate, self.capacity)
+        return self._fallback
+
+
+def target_budgets() -> Dict[str, Tuple[float, float]]:
+    """Fleet-wide (tokens per second, burst) per rate-limited target"""
+    from app.core.config import settings
+    
+    return {
+        'google_maps': (settings.GOOGLE_MAPS_REQUESTS_PER_MINUTE / 60.0, settings.GOOGLE_MAPS_RATE_BURST),
+        'reddit': (settings.REDDIT_REQUESTS_PER_MINUTE / 60.0, settings.REDDIT_RATE_BURST),
+        'places_api': (settings.PLACES_API_REQUESTS_PER_SECOND, settings.PLACES_API_RATE_BURST),
+    }
+
+
+_targets: Dict[str, object] = {}
+_targets_lock = threading.Lock()
+
+
+def get_target_limiter(target: str):
+    """
+    Return the limiter for a target's configured budget
+    
+    With RATE_LIMIT_DISTRIBUTED the budget is shared fleet-wide through
+    Redis; otherwise each process gets its own TokenBucket.
+    
+    Args:
+        target: 'google_maps', 'reddit' or 'places_api'
+    
+    Returns:
+        RedisTokenBucket or TokenBucket (both provide acquire())
+    """
+    from app.core.config import settings
+    
+    rate, capacity = target_budgets()[target]
+    if not settings.RATE_LIMIT_DISTRIBUTED:
+        return get_rate_limiter(target, rate, capacity)
+    
+    with _targets_lock:
+        limiter = _targets.get(target)
+        if limiter is None:
+            from app.core.redis_client import get_redis
+            limiter = RedisTokenBucket(get_redis(), target, rate=rate, capacity=capacity)
+            _targets[target] = limiter
+            logger.info(f"Created distributed rate limiter '{target}' ({rate:.2f}/s, burst {capacity})")
+    return limiter
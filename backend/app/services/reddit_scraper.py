@@ -5,41 +5,104 @@ Searches Reddit for restaurant mentions and sentiment data.
 Uses PRAW (Python Reddit API Wrapper) - fully legal with API access.
 """
 
-import praw
-from praw.exceptions import PRAWException
 import logging
 import os
-from typing import List, Dict
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Dict, Optional
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Subreddits searched for every restaurant (plus the city's subreddit)
+DEFAULT_SUBREDDITS = [
+    'food',
+    'restaurant',
+    'FoodPorn',
+    'AskCulinary',
+    'Cooking'
+]
+
 
 class RedditScraper:
     """Scrapes restaurant mentions from Reddit"""
     
-    def __init__(self):
-        """Initialize Reddit API client"""
+    def __init__(self, max_workers: int = 1, rate_limiter=None):
+        """
+        Initialize Reddit API client
+        
+        Args:
+            max_workers: Threads for concurrent subreddit search and comment
+                fetching (1 searches serially)
+            rate_limiter: Limiter every API request not served from the HTTP
+                cache draws from; defaults to the fleet-wide Reddit budget
+                sized to the API quota
+        """
         self.client_id = os.getenv('REDDIT_CLIENT_ID', '')
         self.client_secret = os.getenv('REDDIT_CLIENT_SECRET', '')
         self.user_agent = os.getenv('REDDIT_USER_AGENT', 'VibeFinder/1.0')
+        self.max_workers = max_workers
+        
+        if rate_limiter is None:
+            from app.services.rate_limiter import get_target_limiter
+            rate_limiter = get_target_limiter('reddit')
+        self.rate_limiter = rate_limiter
         
         self.reddit = None
+        # PRAW is not thread-safe, so worker threads get their own client; the
+        # pool is kept for the scraper's lifetime so those clients are reused
+        self._local = threading.local()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_pid: Optional[int] = None
+        self._pool_lock = threading.Lock()
         
         if self.client_id and self.client_secret:
             try:
-                self.reddit = praw.Reddit(
-                    client_id=self.client_id,
-                    client_secret=self.client_secret,
-                    user_agent=self.user_agent
-                )
+                self.reddit = self._create_client()
                 logger.info("Reddit API client initialized successfully")
             except Exception as e:
                 logger.warning(f"Failed to initialize Reddit client: {e}")
         else:
             logger.warning("Reddit API credentials not configured")
     
-    def search_restaurant_mentions(self, restaurant_name: str, location: str = None, limit: int = 50) -> List[Dict]:
+    def _create_client(self):
+        import praw  # Deferred: only needed once credentials are configured
+        from app.services.http_cache import cached_session
+        # Identical searches within their TTL (e.g. task retries) are served from the on-disk
+        # cache; the session draws from the rate limiter for every request that goes out
+        return praw.Reddit(
+            client_id=self.client_id,
+            client_secret=self.client_secret,
+            user_agent=self.user_agent,
+            requestor_kwargs={'session': cached_session(rate_limiter=self.rate_limiter)}
+        )
+    
+    def _thread_client(self):
+        """Reddit client owned by the calling worker thread"""
+        client = getattr(self._local, 'reddit', None)
+        if client is None:
+            client = self._create_client()
+            self._local.reddit = client
+        return client
+    
+    def _executor(self) -> ThreadPoolExecutor:
+        """Worker pool shared by all searches and crawls of this scraper (one per process)"""
+        with self._pool_lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                # Threads do not survive a fork, so a forked worker builds its own pool
+                self._pool = ThreadPoolExecutor(max_workers=max(1, self.max_workers), thread_name_prefix='reddit')
+                self._pool_pid = os.getpid()
+            return self._pool
+    
+    def close(self):
+        """Shut down the worker pool (in-flight calls finish in the background)"""
+        with self._pool_lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self._pool_pid = None
+    
+    def search_restaurant_mentions(self, restaurant_name: str, location: str = None, limit: int = 50, db=None) -> List[Dict]:
         """
         Search Reddit for mentions of a restaurant
         
@@ -47,70 +110,53 @@ class RedditScraper:
             restaurant_name: Name of the restaurant
             location: Location/city (optional, helps narrow results)
             limit: Maximum number of results
+            db: Database session; when given and the city's subreddit corpus
+                is fresh, mentions are answered locally without API calls
             
         Returns:
             List of dicts with text, author, date
         """
+        if db is not None:
+            from app.services.city_corpus import search_corpus
+            from app.core.config import settings
+            
+            if settings.REDDIT_USE_CITY_CORPUS:
+                mentions = search_corpus(
+                    db, location, restaurant_name, limit=limit,
+                    max_age_hours=settings.REDDIT_CORPUS_MAX_AGE_HOURS
+                )
+                if mentions is not None:
+                    return mentions
+        
         if not self.reddit:
             logger.warning("Reddit client not initialized, skipping search")
             return []
         
+        from praw.exceptions import PRAWException
+        
+        if self.max_workers > 1:
+            return self._search_concurrent(restaurant_name, location, limit)
+        
         mentions = []
         
         try:
-            # Build search query
-            query = f'"{restaurant_name}"'
-            if location:
-                # Extract city name from location
-                city = location.split(',')[0].strip()
-                query += f' {city}'
-            
+            query = self._build_query(restaurant_name, location)
             logger.info(f"Searching Reddit for: {query}")
             
-            # Search relevant subreddits
-            subreddits = [
-                'food',
-                'restaurant',
-                'FoodPorn',
-                'AskCulinary',
-                'Cooking'
-            ]
-            
-            # Add location-specific subreddit if available
-            if location:
-                city = location.split(',')[0].strip().replace(' ', '')
-                subreddits.append(city)
-            
             # Search each subreddit
-            for subreddit_name in subreddits:
+            for subreddit_name in self._subreddits(location):
                 try:
                     subreddit = self.reddit.subreddit(subreddit_name)
                     
                     # Search posts
                     for submission in subreddit.search(query, limit=10):
                         # Add post title and body
-                        if submission.selftext and len(submission.selftext) > 50:
-                            mentions.append({
-                                'text': f"{submission.title}\n\n{submission.selftext}",
-                                'author': str(submission.author) if submission.author else 'deleted',
-                                'date': datetime.fromtimestamp(submission.created_utc).strftime('%Y-%m-%d'),
-                                'score': submission.score,
-                                'type': 'post'
-                            })
+                        post = self._post_mention(submission)
+                        if post:
+                            mentions.append(post)
                         
                         # Get top comments
-                        submission.comments.replace_more(limit=0)
-                        for comment in submission.comments.list()[:5]:
-                            if hasattr(comment, 'body') and len(comment.body) > 30:
-                                # Check if comment mentions the restaurant
-                                if restaurant_name.lower() in comment.body.lower():
-                                    mentions.append({
-                                        'text': comment.body,
-                                        'author': str(comment.author) if comment.author else 'deleted',
-                                        'date': datetime.fromtimestamp(comment.created_utc).strftime('%Y-%m-%d'),
-                                        'score': comment.score,
-                                        'type': 'comment'
-                                    })
+                        mentions.extend(self._comment_mentions(submission, restaurant_name))
                         
                         if len(mentions) >= limit:
                             break
@@ -131,6 +177,193 @@ class RedditScraper:
         
         return mentions[:limit]
     
+    def _search_concurrent(self, restaurant_name: str, location: Optional[str], limit: int) -> List[Dict]:
+        """
+        Search subreddits and fetch comment trees on a thread pool
+        
+        Every request draws from the shared rate limiter. Comment fetches are
+        queued as soon as each subreddit search returns, and outstanding work
+        is cancelled once limit mentions have been collected.
+        """
+        query = self._build_query(restaurant_name, location)
+        logger.info(f"Searching Reddit concurrently ({self.max_workers} threads) for: {query}")
+        
+        mentions = []
+        stop = threading.Event()
+        executor = self._executor()
+        pending = {}
+        
+        try:
+            pending = {
+                executor.submit(self._search_subreddit, name, query, stop): 'search'
+                for name in self._subreddits(location)
+            }
+            
+            while pending and len(mentions) < limit:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.debug(f"Reddit {kind} failed: {e}")
+                        continue
+                    
+                    if kind == 'search':
+                        for submission in result:
+                            post = self._post_mention(submission)
+                            if post:
+                                mentions.append(post)
+                            pending[executor.submit(self._fetch_comments, submission.id, restaurant_name, stop)] = 'comments'
+                    else:
+                        mentions.extend(result)
+        finally:
+            # Return early: drop queued work and let in-flight calls finish in the background
+            stop.set()
+            for future in pending:
+                future.cancel()
+        
+        logger.info(f"Found {len(mentions)} Reddit mentions for {restaurant_name}")
+        return mentions[:limit]
+    
+    def _search_subreddit(self, subreddit_name: str, query: str, stop: threading.Event) -> list:
+        """Run one subreddit search in a worker thread"""
+        if stop.is_set():
+            return []
+        return list(self._thread_client().subreddit(subreddit_name).search(query, limit=10))
+    
+    def _fetch_comments(self, submission_id: str, restaurant_name: str, stop: threading.Event) -> List[Dict]:
+        """Fetch a submission's comments in a worker thread"""
+        if stop.is_set():
+            return []
+        submission = self._thread_client().submission(id=submission_id)
+        return self._comment_mentions(submission, restaurant_name)
+    
+    def _build_query(self, restaurant_name: str, location: Optional[str]) -> str:
+        """Build search query"""
+        from app.services.city_corpus import city_from_location
+        
+        query = f'"{restaurant_name}"'
+        city = city_from_location(location)
+        if city:
+            query += f' {city}'
+        return query
+    
+    def _subreddits(self, location: Optional[str]) -> List[str]:
+        """Relevant subreddits, plus the location-specific subreddit if available"""
+        from app.services.city_corpus import city_subreddit
+        
+        subreddits = list(DEFAULT_SUBREDDITS)
+        city = city_subreddit(location)
+        if city:
+            subreddits.append(city)
+        return subreddits
+    
+    def crawl_subreddit(self, subreddit_name: str, post_limit: int = 500, comments_per_post: int = 50) -> List[Dict]:
+        """
+        Crawl a subreddit's recent and top posts together with their comments
+        
+        Used to build a city corpus once instead of searching it per
+        restaurant. Comment trees are fetched on the thread pool (when
+        max_workers > 1), all under the shared rate limiter.
+        
+        Args:
+            subreddit_name: Subreddit to crawl
+            post_limit: Maximum posts per listing (new and top of the month)
+            comments_per_post: Maximum comments kept per post
+            
+        Returns:
+            List of item dicts with reddit_id, kind, post_id, title, text,
+            author, score, created_at
+        """
+        if not self.reddit:
+            logger.warning("Reddit client not initialized, skipping crawl")
+            return []
+        
+        subreddit = self.reddit.subreddit(subreddit_name)
+        posts = {}
+        for listing in (subreddit.new(limit=post_limit), subreddit.top(time_filter='month', limit=post_limit)):
+            try:
+                for submission in listing:
+                    posts.setdefault(submission.fullname, submission)
+            except Exception as e:
+                logger.warning(f"Error listing r/{subreddit_name}: {e}")
+        
+        items = [self._corpus_post(submission) for submission in posts.values()]
+        
+        def fetch(submission_id):
+            submission = self._thread_client().submission(id=submission_id)
+            submission.comments.replace_more(limit=0)
+            return [
+                self._corpus_comment(comment, submission.fullname)
+                for comment in submission.comments.list()[:comments_per_post]
+                if getattr(comment, 'body', None)
+            ]
+        
+        executor = self._executor()
+        futures = [executor.submit(fetch, submission.id) for submission in posts.values() if submission.num_comments]
+        for future in futures:
+            try:
+                items.extend(future.result())
+            except Exception as e:
+                logger.debug(f"Error fetching comments: {e}")
+        
+        logger.info(f"Crawled {len(posts)} posts and {len(items) - len(posts)} comments from r/{subreddit_name}")
+        return items
+    
+    def _corpus_post(self, submission) -> Dict:
+        return {
+            'reddit_id': submission.fullname,
+            'kind': 'post',
+            'post_id': submission.fullname,
+            'title': submission.title,
+            'text': submission.selftext or '',
+            'author': str(submission.author) if submission.author else 'deleted',
+            'score': submission.score,
+            'created_at': datetime.utcfromtimestamp(submission.created_utc)
+        }
+    
+    def _corpus_comment(self, comment, post_id: str) -> Dict:
+        return {
+            'reddit_id': comment.fullname,
+            'kind': 'comment',
+            'post_id': post_id,
+            'title': None,
+            'text': comment.body,
+            'author': str(comment.author) if comment.author else 'deleted',
+            'score': comment.score,
+            'created_at': datetime.utcfromtimestamp(comment.created_utc)
+        }
+    
+    def _post_mention(self, submission) -> Optional[Dict]:
+        """Post title and body as a mention, if the post has enough text"""
+        if submission.selftext and len(submission.selftext) > 50:
+            return {
+                'text': f"{submission.title}\n\n{submission.selftext}",
+                'author': str(submission.author) if submission.author else 'deleted',
+                'date': datetime.fromtimestamp(submission.created_utc).strftime('%Y-%m-%d'),
+                'score': submission.score,
+                'type': 'post'
+            }
+        return None
+    
+    def _comment_mentions(self, submission, restaurant_name: str) -> List[Dict]:
+        """Top comments that mention the restaurant"""
+        mentions = []
+        submission.comments.replace_more(limit=0)
+        for comment in submission.comments.list()[:5]:
+            if hasattr(comment, 'body') and len(comment.body) > 30:
+                # Check if comment mentions the restaurant
+                if restaurant_name.lower() in comment.body.lower():
+                    mentions.append({
+                        'text': comment.body,
+                        'author': str(comment.author) if comment.author else 'deleted',
+                        'date': datetime.fromtimestamp(comment.created_utc).strftime('%Y-%m-%d'),
+                        'score': comment.score,
+                        'type': 'comment'
+                    })
+        return mentions
+    
     def get_subreddit_posts(self, subreddit_name: str, query: str, limit: int = 20) -> List[Dict]:
         """
         Get posts from a specific subreddit
@@ -0,0 +1,158 @@
+"""
+Service Registry
+
+Lazily constructs the shared API/worker services on first use.
+
+Importing this module is cheap: googlemaps, scikit-learn and vaderSentiment
+are only imported when the corresponding service is first requested (or when
+warm_up() is called explicitly), so uvicorn can serve /health before any
+heavy dependency is loaded.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+_instances: Dict[str, object] = {}
+_lock = threading.RLock()
+
+
+def _build_google_places():
+    from app.services.google_places import GooglePlacesService
+    return GooglePlacesService()
+
+
+def _build_review_scraper():
+    from app.services.review_scraper import ReviewScraper
+    # Share the Places client instead of building a second one
+    return ReviewScraper(google_places=get_google_places())
+
+
+def _build_sentiment_analyzer():
+    from app.ml.sentiment_analyzer import SentimentAnalyzer
+    return SentimentAnalyzer()
+
+
+def _build_topic_modeler():
+    from app.ml.topic_modeler import TopicModeler
+    return TopicModeler()
+
+
+def _build_keyword_extractor():
+    from app.ml.keyword_extractor import KeywordExtractor
+    return KeywordExtractor()
+
+
+def _build_batch_analyzer():
+    from app.ml.batch_analyzer import BatchAnalyzer
+    from app.core.config import settings
+    return BatchAnalyzer(
+        sentiment_analyzer=get_sentiment_analyzer(),
+        topic_modeler=get_topic_modeler(),
+        keyword_extractor=get_keyword_extractor(),
+        duplicate_threshold=settings.NEAR_DUPLICATE_THRESHOLD
+    )
+
+
+def _build_reddit_scraper():
+    from app.services.reddit_scraper import RedditScraper
+    from app.core.config import settings
+    # Long-lived so its worker threads keep their authenticated PRAW clients
+    return RedditScraper(max_workers=settings.REDDIT_SEARCH_WORKERS)
+
+
+# Service name -> factory. Order matters for warm_up().
+_FACTORIES: Dict[str, Callable[[], object]] = {
+    'google_places': _build_google_places,
+    'review_scraper': _build_review_scraper,
+    'sentiment_analyzer': _build_sentiment_analyzer,
+    'topic_modeler': _build_topic_modeler,
+    'keyword_extractor': _build_keyword_extractor,
+    'batch_analyzer': _build_batch_analyzer,
+    'reddit_scraper': _build_reddit_scraper,
+}
+
+def get_service(name: str):
+    """
+    Return the shared instance of a service, constructing it on first use.
+    
+    Args:
+        name: Service name (see _FACTORIES)
+    
+    Returns:
+        Service instance
+    """
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+    
+    with _lock:
+        instance = _instances.get(name)
+        if instance is None:
+            start = time.perf_counter()
+            instance = _FACTORIES[name]()
+            _instances[name] = instance
+            logger.info(f"Constructed {name} in {(time.perf_counter() - start) * 1000:.0f}ms")
+    
+    return instance
+
+
+def get_google_places():
+    return get_service('google_places')
+
+
+def get_review_scraper():
+    return get_service('review_scraper')
+
+
+def get_sentiment_analyzer():
+    return get_service('sentiment_analyzer')
+
+
+def get_topic_modeler():
+    return get_service('topic_modeler')
+
+
+def get_keyword_extractor():
+    return get_service('keyword_extractor')
+
+
+def get_batch_analyzer():
+    return get_service('batch_analyzer')
+
+
+def get_reddit_scraper():
+    return get_service('reddit_scraper')
+
+
+def is_loaded(name: str) -> bool:
+    """Check whether a service has already been constructed"""
+    return name in _instances
+
+
+def warm_up(names=None) -> Dict[str, float]:
+    """
+    Construct services ahead of the first request.
+    
+    Args:
+        names: Service names to construct (defaults to all services)
+    
+    Returns:
+        Dict of service name -> construction time in milliseconds
+        (0 for services that were already loaded)
+    """
+    timings = {}
+    for name in names or _FACTORIES:
+        start = time.perf_counter()
+        try:
+            get_service(name)
+        except Exception as e:
+            logger.error(f"Failed to warm up {name}: {e}")
+            continue
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+    
+    logger.info(f"Service warm-up timings (ms): {timings}")
+    return timings
@@ -18,8 +18,8 @@ logger = logging.getLogger(__name__)
 class ReviewScraper:
     """Service for scraping restaurant reviews"""
     
-    def __init__(self):
-        self.google_places = GooglePlacesService()
+    def __init__(self, google_places: Optional[GooglePlacesService] = None):
+        self.google_places = google_places or GooglePlacesService()
     
     def get_reviews_from_db(self, place_id: str, db_session, max_age_days: int = 7) -> Optional[List]:
         """
@@ -58,7 +58,8 @@ class ReviewScraper:
             
             # Get reviews from database
             reviews = db_session.query(DBReview).filter(
-                DBReview.restaurant_id == restaurant.id
+                DBReview.restaurant_id == restaurant.id,
+                DBReview.is_duplicate == False
             ).all()
             
             if not reviews:
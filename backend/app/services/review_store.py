@@ -0,0 +1,135 @@
+"""
+Review Store
+
+Bulk writes of scraped reviews.
+
+Each review gets a content hash over (restaurant_id, source, author,
+normalized text) backed by a unique index, and rows are written in batches
+with INSERT ... ON CONFLICT DO NOTHING, so repeated scrapes cannot create
+duplicate rows and callers learn how many rows were actually new.
+"""
+
+import hashlib
+import logging
+import re
+from typing import Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT statement
+INSERT_BATCH_SIZE = 500
+
+
+def normalize_review_text(text: str) -> str:
+    """Lowercase and collapse whitespace so trivially re-formatted copies hash equally"""
+    return ' '.join(re.sub(r'\s+', ' ', (text or '').lower()).split())
+
+
+def review_content_hash(restaurant_id: int, source: str, author: Optional[str], text: str) -> str:
+    """
+    Content hash identifying a review within a restaurant
+    
+    Args:
+        restaurant_id: Database restaurant ID
+        source: Review source ('google_maps', 'reddit', ...)
+        author: Review author (may be empty)
+        text: Review text
+    
+    Returns:
+        Hex SHA-256 digest
+    """
+    content = '\x1f'.join([
+        str(restaurant_id),
+        source or '',
+        (author or '').strip().lower(),
+        normalize_review_text(text)
+    ])
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def bulk_insert_reviews(db, rows: Sequence[Dict], batch_size: int = INSERT_BATCH_SIZE) -> Tuple[int, int]:
+    """
+    Insert reviews, skipping any whose content hash is already stored
+    
+    Args:
+        db: Database session (committed by the caller)
+        rows: Review column dicts; content_hash is filled in when missing
+        batch_size: Rows per INSERT statement
+    
+    Returns:
+        Tuple of (rows inserted, inserted rows flagged is_duplicate)
+    """
+    from app.models.database import Review
+    
+    if not rows:
+        return 0, 0
+    
+    # Also dedupe within the payload itself, which ON CONFLICT cannot do for one statement
+    unique_rows = {}
+    for row in rows:
+        row = dict(row)
+        if not row.get('content_hash'):
+            row['content_hash'] = review_content_hash(
+                row['restaurant_id'], row.get('source'), row.get('author'), row['review_text']
+            )
+        unique_rows.setdefault(row['content_hash'], row)
+    
+    insert = dialect_insert(db)
+    inserted = 0
+    duplicates = 0
+    
+    batch = list(unique_rows.values())
+    for start in range(0, len(batch), batch_size):
+        stmt = (
+            insert(Review)
+            .values(batch[start:start + batch_size])
+            .on_conflict_do_nothing(index_elements=['content_hash'])
+            .returning(Review.is_duplicate)
+        )
+        flags = db.execute(stmt).scalars().all()
+        inserted += len(flags)
+        duplicates += sum(1 for flag in flags if flag)
+    
+    logger.info(f"Inserted {inserted} of {len(rows)} reviews ({len(rows) - inserted} already stored)")
+    return inserted, duplicates
+
+
+def dialect_insert(db):
+    """INSERT construct supporting ON CONFLICT for the session's database"""
+    if db.get_bind().dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert
+
+
+def stored_review_keys(db, restaurant_id: int) -> set:
+    """
+    Keys of a restaurant's stored reviews: content hashes plus
+    ('id', source, external_id) for reviews with a source id
+    """
+    from app.models.database import Review
+    
+    stored = db.query(
+        Review.source, Review.external_id, Review.author, Review.review_text, Review.content_hash
+    ).filter(Review.restaurant_id == restaurant_id).all()
+    
+    keys = set()
+    for source, external_id, author, text, content_hash in stored:
+        if external_id:
+            keys.add(('id', source, external_id))
+        # Rows from before content hashes existed are hashed here
+        keys.add(content_hash or review_content_hash(restaurant_id, source, author, text))
+    return keys
+
+
+def is_new_review(known_keys: set, restaurant_id: int, source: str, review_data: Dict) -> bool:
+    """Check a scraped review against stored keys, remembering it if new"""
+    keys = [review_content_hash(restaurant_id, source, review_data.get('author'), review_data['text'])]
+    if review_data.get('review_id'):
+        keys.append(('id', source, review_data['review_id']))
+    
+    if any(key in known_keys for key in keys):
+        return False
+    known_keys.update(keys)
+    return True
@@ -0,0 +1,239 @@
+"""
+Scrape Scheduler
+
+Decides which restaurants to refresh, so scraping no longer depends on
+someone calling POST /scraping/trigger/{place_id}.
+
+Every scheduler run ranks restaurants by the expected value of a refresh:
+
+    priority = (1 + search score) * (review velocity + floor) * age in days
+
+- search score: appearances in search results, decayed exponentially
+  (SEARCH_SCORE_HALF_LIFE_HOURS), so popular pages dominate
+- review velocity: new reviews per day over REVIEW_VELOCITY_WINDOW_DAYS;
+  velocity * age estimates how many reviews a stale page is missing
+- age: days since last_scraped, capped at the velocity window; never-scraped
+  restaurants count as maximally stale
+
+Restaurants refreshed within SCHEDULER_MIN_REFRESH_HOURS or with a job
+already in flight are skipped, and each run only fills the share of the
+global SCHEDULER_SCRAPES_PER_HOUR budget not taken by in-flight jobs.
+"""
+
+import logging
+import math
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.services.job_lifecycle import IN_FLIGHT_STATUSES
+
+logger = logging.getLogger(__name__)
+
+
+def decayed_search_score(score: Optional[float], last_searched: Optional[datetime], now: datetime, half_life_hours: float) -> float:
+    """Search score as of now, halving every half_life_hours since the last search"""
+    if not score or last_searched is None:
+        return 0.0
+    hours = max(0.0, (now - last_searched).total_seconds() / 3600)
+    return score * 0.5 ** (hours / half_life_hours)
+
+
+def _decayed_score_sql(db, score, last_searched, now: datetime, half_life_hours: float):
+    """SQL expression for decayed_search_score(), evaluated against the row being updated"""
+    from sqlalchemy import DateTime, case, func, literal
+    
+    now = literal(now, DateTime)
+    if db.get_bind().dialect.name == 'sqlite':
+        seconds = (func.julianday(now) - func.julianday(last_searched)) * 86400
+    else:
+        seconds = func.extract('epoch', now - last_searched)
+    hours = case((seconds > 0, seconds / 3600.0), else_=0.0)
+    # NULL last_searched (never searched) leaves no score to decay
+    return func.coalesce(score * func.power(0.5, hours / half_life_hours), 0.0)
+
+
+def refresh_priority(search_score: float, velocity: float, age_days: float, window_days: int) -> float:
+    """
+    Expected value of refreshing a restaurant now
+    
+    Args:
+        search_score: Decayed search score
+        velocity: New reviews per day
+        age_days: Days since the last scrape (capped at window_days)
+        window_days: Velocity window; its reciprocal is the velocity floor
+    """
+    return (1 + search_score) * (velocity + 1.0 / window_days) * age_days
+
+
+def record_search_hits(db, restaurants: Sequence[Dict], now: Optional[datetime] = None) -> int:
+    """
+    Count an appearance in search results for each restaurant
+    
+    Unknown restaurants are inserted so the scheduler can pick them up;
+    known ones get their Places metadata refreshed. The score is decayed and
+    incremented in a single UPDATE against the stored row, so concurrent
+    searches for the same restaurant never lose a hit.
+    
+    Args:
+        db: Database session (committed by the caller)
+        restaurants: Place dicts from GooglePlacesService (place_id, name,
+            rating, address, total_ratings)
+        now: Time of the search (defaults to utcnow)
+    
+    Returns:
+        Number of restaurants inserted
+    """
+    from sqlalchemy import update
+    from app.core.config import settings
+    from app.models.database import Restaurant
+    from app.services.review_store import dialect_insert
+    
+    now = now or datetime.utcnow()
+    places = {resto['place_id']: resto for resto in restaurants if resto.get('place_id')}
+    if not places:
+        return 0
+    
+    db.execute(
+        update(Restaurant)
+        .where(Restaurant.place_id.in_(list(places)))
+        .values(
+            search_score=_decayed_score_sql(
+                db, Restaurant.search_score, Restaurant.last_searched, now, settings.SEARCH_SCORE_HALF_LIFE_HOURS
+            ) + 1,
+            last_searched=now
+        )
+        .execution_options(synchronize_session=False)
+    )
+    
+    existing = db.query(Restaurant).filter(Restaurant.place_id.in_(list(places))).all()
+    for restaurant in existing:
+        place = places.pop(restaurant.place_id)
+        restaurant.name = place.get('name') or restaurant.name
+        restaurant.rating = place.get('rating', restaurant.rating)
+        restaurant.address = place.get('address') or restaurant.address
+        restaurant.total_ratings = place.get('total_ratings', restaurant.total_ratings)
+    
+    if not places:
+        return 0
+    
+    # A concurrent search may insert the same place first; its hit is enough
+    stmt = dialect_insert(db)(Restaurant).values([
+        {
+            'place_id': place_id,
+            'name': place.get('name') or f"Restaurant_{place_id[:8]}",
+            'rating': place.get('rating', 0.0),
+            'address': place.get('address'),
+            'total_ratings': place.get('total_ratings', 0),
+            'search_score': 1.0,
+            'last_searched': now,
+        }
+        for place_id, place in places.items()
+    ]).on_conflict_do_nothing(index_elements=['place_id']).returning(Restaurant.id)
+    return len(db.execute(stmt).scalars().all())
+
+
+def review_velocities(db, since: datetime, window_days: int) -> Dict[int, float]:
+    """New non-duplicate reviews per day since a cutoff, by restaurant id"""
+    from sqlalchemy import func
+    from app.models.database import Review
+    
+    rows = db.query(Review.restaurant_id, func.count(Review.id)).filter(
+        Review.created_at >= since,
+        Review.is_duplicate.is_(False)
+    ).group_by(Review.restaurant_id).all()
+    return {restaurant_id: count / window_days for restaurant_id, count in rows}
+
+
+def _live_in_flight(now: datetime):
+    """
+    Filter for jobs that count against the throughput budget
+    
+    Pending rows older than JOB_PENDING_TIMEOUT_HOURS lost their task (or
+    were left behind by the old trigger endpoint) and are about to be failed
+    by the reaper; counting them would let orphans use up the budget.
+    """
+    from sqlalchemy import and_, or_
+    from app.core.config import settings
+    from app.models.database import ScrapingJob
+    
+    return or_(
+        ScrapingJob.status == 'running',
+        and_(
+            ScrapingJob.status == 'pending',
+            ScrapingJob.created_at >= now - timedelta(hours=settings.JOB_PENDING_TIMEOUT_HOURS)
+        )
+    )
+
+
+def in_flight_jobs(db, now: Optional[datetime] = None) -> int:
+    """Number of scraping jobs queued or running"""
+    from app.models.database import ScrapingJob
+    
+    return db.query(ScrapingJob).filter(_live_in_flight(now or datetime.utcnow())).count()
+
+
+def rank_restaurants(db, now: Optional[datetime] = None, limit: Optional[int] = None) -> List[Tuple[object, float]]:
+    """
+    Restaurants due for a refresh, highest priority first
+    
+    Args:
+        db: Database session
+        now: Reference time (defaults to utcnow)
+        limit: Maximum number of restaurants to return
+    
+    Returns:
+        List of (Restaurant, priority)
+    """
+    from sqlalchemy import or_
+    from app.core.config import settings
+    from app.models.database import Restaurant, ScrapingJob
+    
+    now = now or datetime.utcnow()
+    window_days = settings.REVIEW_VELOCITY_WINDOW_DAYS
+    
+    # Every in-flight row holds its place (see job_lifecycle), orphaned or not
+    busy = db.query(ScrapingJob.restaurant_id).filter(ScrapingJob.status.in_(IN_FLIGHT_STATUSES))
+    candidates = db.query(Restaurant).filter(
+        or_(
+            Restaurant.last_scraped.is_(None),
+            Restaurant.last_scraped < now - timedelta(hours=settings.SCHEDULER_MIN_REFRESH_HOURS)
+        ),
+        Restaurant.id.notin_(busy)
+    ).all()
+    velocities = review_velocities(db, now - timedelta(days=window_days), window_days)
+    
+    ranked = []
+    for restaurant in candidates:
+        if restaurant.last_scraped is None:
+            age_days = window_days
+        else:
+            age_days = min(window_days, (now - restaurant.last_scraped).total_seconds() / 86400)
+        search = decayed_search_score(
+            restaurant.search_score, restaurant.last_searched, now, settings.SEARCH_SCORE_HALF_LIFE_HOURS
+        )
+        ranked.append((restaurant, refresh_priority(search, velocities.get(restaurant.id, 0.0), age_days, window_days)))
+    
+    ranked.sort(key=lambda item: -item[1])
+    return ranked[:limit] if limit is not None else ranked
+
+
+def run_budget() -> int:
+    """Scrapes one scheduler run may start under SCHEDULER_SCRAPES_PER_HOUR"""
+    from app.core.config import settings
+    
+    return math.ceil(settings.SCHEDULER_SCRAPES_PER_HOUR * settings.SCHEDULER_INTERVAL_MINUTES / 60)
+
+
+def plan_refreshes(db, now: Optional[datetime] = None) -> List[Tuple[object, float]]:
+    """
+    Pick this run's refreshes within the remaining throughput budget
+    
+    Returns:
+        List of (Restaurant, priority), highest priority first
+    """
+    now = now or datetime.utcnow()
+    available = run_budget() - in_flight_jobs(db, now)
+    if available <= 0:
+        logger.info("Scrape budget exhausted by in-flight jobs, nothing scheduled")
+        return []
+    return rank_restaurants(db, now=now, limit=available)
@@ -0,0 +1,118 @@
+"""
+Scrape Snapshot Archive
+
+Stores the HTML of scraped Google Maps pages, gzip-compressed and addressed
+by the SHA-256 of their content, so reviews can be re-extracted offline
+(see app.services.offline_parser) after a selector change instead of
+re-scraping every place through Selenium. Snapshots also serve as fixtures
+for benchmarks/scraper_benchmark.py.
+
+Layout:
+    <directory>/objects/<sha[:2]>/<sha>.html.gz
+    <directory>/index.jsonl   one line per capture (digest, place_id, ...)
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotArchive:
+    """Content-addressed store of compressed page snapshots"""
+    
+    def __init__(self, directory: str):
+        """
+        Initialize archive
+        
+        Args:
+            directory: Archive root (created if missing)
+        """
+        self.directory = directory
+        self.index_path = os.path.join(directory, 'index.jsonl')
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+    
+    def store(self, html: str, place_id: str, **meta) -> str:
+        """
+        Archive a page snapshot
+        
+        Identical HTML is stored once; every capture still gets an index line.
+        
+        Args:
+            html: Page HTML
+            place_id: Google Places ID the page belongs to
+            **meta: Extra index fields (e.g. reviews_extracted, url)
+        
+        Returns:
+            SHA-256 digest of the HTML
+        """
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(gzip.compress(data, compresslevel=6))
+            os.replace(tmp, path)
+        
+        entry = dict(meta, digest=digest, place_id=place_id, captured_at=datetime.utcnow().isoformat())
+        # One write per line so concurrent appends from several workers do not interleave
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+        
+        logger.info(f"Archived snapshot {digest[:12]} for place_id {place_id} ({len(data) / 1024:.0f}KB)")
+        return digest
+    
+    def load(self, digest: str) -> str:
+        """Return the HTML of an archived snapshot"""
+        with open(self._path(digest), 'rb') as f:
+            return gzip.decompress(f.read()).decode('utf-8')
+    
+    def entries(self, latest_only: bool = True) -> Iterator[Dict]:
+        """
+        Iterate over index entries
+        
+        Args:
+            latest_only: Only yield the most recent capture per place_id
+        """
+        if not os.path.exists(self.index_path):
+            return
+        
+        entries = []
+        with open(self.index_path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    entries.append(json.loads(line))
+        
+        if latest_only:
+            latest = {}
+            for entry in entries:
+                latest[entry['place_id']] = entry
+            entries = list(latest.values())
+        
+        yield from entries
+    
+    def path_for(self, digest: str) -> str:
+        """Filesystem path of a snapshot object"""
+        return self._path(digest)
+    
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, 'objects', digest[:2], f"{digest}.html.gz")
+
+
+def get_snapshot_archive() -> Optional[SnapshotArchive]:
+    """The configured archive, or None when SCRAPE_ARCHIVE_ENABLED is off"""
+    from app.core.config import settings
+    
+    if not settings.SCRAPE_ARCHIVE_ENABLED:
+        return None
+    return SnapshotArchive(settings.SCRAPE_ARCHIVE_DIR)
@@ -0,0 +1,127 @@
+"""
+Background Warm-up
+
+Runs every ML stage once on a small built-in review sample so that the first
+real /search request on a fresh worker does not pay for VADER lexicon loading,
+scikit-learn imports and first-call overhead. The /ready endpoint reports
+not-ready until this has finished.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.services import registry
+
+logger = logging.getLogger(__name__)
+
+# Services a Celery worker needs for ML tasks (see background_jobs._preload_ml_models)
+ML_SERVICES = ['sentiment_analyzer', 'topic_modeler', 'keyword_extractor', 'batch_analyzer']
+
+# Small but realistic sample: enough reviews (>= 10) to exercise the LDA path
+# and enough repeated terms to survive the TF-IDF min_df filter.
+SAMPLE_REVIEWS = [
+    "The margherita pizza was amazing and the garlic knots were delicious.",
+    "Great spot for a date night, quiet and romantic with a nice wine list.",
+    "Service was slow and the pasta came out cold. Disappointing visit.",
+    "Loud and lively bar, perfect for groups of friends on the weekend.",
+    "I recommend the spicy rigatoni, the best pasta I have had in years.",
+    "Cozy place with friendly staff. The chicken parm was excellent.",
+    "Too expensive for the small portions, but the tiramisu was great.",
+    "Family friendly with a kids menu. We loved the margherita pizza.",
+    "The salmon was fresh and perfectly cooked. Must try the lobster risotto.",
+    "Crowded on Friday night and we had a long wait for a table.",
+    "Authentic Italian food, the garlic knots are a must try.",
+    "Outdoor patio seating is lovely in the summer, pizza was delicious.",
+]
+
+
+class WarmupState:
+    """Thread-safe record of the warm-up lifecycle"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.status = 'pending'  # pending, running, ready, failed
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+    
+    def update(self, **fields):
+        with self._lock:
+            for key, value in fields.items():
+                setattr(self, key, value)
+    
+    @property
+    def is_ready(self) -> bool:
+        return self.status == 'ready'
+    
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'status': self.status,
+                'started_at': self.started_at.isoformat() if self.started_at else None,
+                'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+                'error': self.error,
+                'timings_ms': dict(self.timings),
+            }
+
+
+state = WarmupState()
+_thread: Optional[threading.Thread] = None
+
+
+def run_warmup(services: Optional[List[str]] = None) -> Dict[str, float]:
+    """
+    Construct the shared services and run each ML stage on SAMPLE_REVIEWS.
+    
+    Args:
+        services: Services to construct (defaults to all; the ML services
+            are always constructed since every stage uses them)
+    
+    Returns:
+        Dict of stage name -> elapsed milliseconds
+    """
+    timings = {}
+    
+    def timed(name, fn):
+        start = time.perf_counter()
+        fn()
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+    
+    state.update(status='running', started_at=datetime.utcnow(), error=None)
+    
+    try:
+        timings.update(registry.warm_up(services))
+        
+        sentiment_analyzer = registry.get_sentiment_analyzer()
+        topic_modeler = registry.get_topic_modeler()
+        keyword_extractor = registry.get_keyword_extractor()
+        
+        timed('sentiment', lambda: sentiment_analyzer.analyze(SAMPLE_REVIEWS))
+        timed('vibes', lambda: topic_modeler.extract_vibes(SAMPLE_REVIEWS))
+        timed('dishes', lambda: keyword_extractor.extract_dishes(SAMPLE_REVIEWS))
+        timed('complaints', lambda: keyword_extractor.extract_complaints(SAMPLE_REVIEWS))
+        timed('batch', lambda: registry.get_batch_analyzer().analyze_batch([SAMPLE_REVIEWS]))
+        
+        state.update(status='ready', finished_at=datetime.utcnow(), timings=timings)
+        logger.info(f"Warm-up completed (ms): {timings}")
+    
+    except Exception as e:
+        logger.error(f"Warm-up failed: {e}", exc_info=True)
+        state.update(status='failed', finished_at=datetime.utcnow(), error=str(e), timings=timings)
+    
+    return timings
+
+
+def start_background_warmup() -> threading.Thread:
+    """Start run_warmup() in a daemon thread (no-op if running or finished)"""
+    global _thread
+    
+    if _thread is None or (not _thread.is_alive() and not state.is_ready):
+        _thread = threading.Thread(target=run_warmup, name='ml-warmup', daemon=True)
+        _thread.start()
+    
+    return _thread
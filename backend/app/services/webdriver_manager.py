@@ -8,11 +8,71 @@ from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
+import json
 import logging
+import os
 import random
+import threading
+from typing import Dict, Iterable, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# ChromeDriver binary path, resolved once per process
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def get_chromedriver_path() -> str:
+    """
+    Resolve the ChromeDriver binary path once per process
+    
+    Uses CHROMEDRIVER_PATH when set; otherwise ChromeDriverManager().install(),
+    which checks (and may download) the driver over the network, is called
+    only on first use instead of for every browser launch.
+    
+    Returns:
+        Path to the ChromeDriver executable
+    """
+    global _driver_path
+    
+    if _driver_path:
+        return _driver_path
+    
+    with _driver_path_lock:
+        if not _driver_path:
+            _driver_path = os.getenv('CHROMEDRIVER_PATH') or ChromeDriverManager().install()
+            logger.info(f"Using ChromeDriver at {_driver_path}")
+    
+    return _driver_path
+
+
+# URL patterns blocked through CDP Network.setBlockedURLs, by category.
+# None of these are needed to read review text.
+BLOCKED_RESOURCE_PATTERNS: Dict[str, List[str]] = {
+    'fonts': [
+        '*.woff', '*.woff2', '*.ttf', '*.otf',
+        '*fonts.gstatic.com*', '*fonts.googleapis.com*',
+    ],
+    'stylesheets': [
+        '*.css',
+    ],
+    'images': [
+        '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+        '*googleusercontent.com*',
+    ],
+    'map_tiles': [
+        '*/maps/vt*', '*/vt?*', '*/kh?*', '*khms*.google.com*', '*mts*.google.com*',
+        '*streetviewpixels-pa.googleapis.com*', '*/maps/preview/log204*',
+    ],
+    'analytics': [
+        '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+        '*/gen_204*', '*/log?*', '*play.google.com/log*',
+    ],
+    'media': [
+        '*.mp4', '*.webm', '*.mp3',
+    ],
+}
+
 
 class WebDriverManager:
     """Manages Chrome WebDriver instances"""
@@ -24,15 +84,29 @@ class WebDriverManager:
         'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
     ]
     
-    def __init__(self, headless=True):
+    # Implicit wait applied to every find_element call
+    IMPLICIT_WAIT_SECONDS = 10
+    
+    # Origins whose storage is cleared between scrapes
+    RESET_ORIGINS = [
+        'https://www.google.com',
+        'https://maps.google.com',
+        'https://consent.google.com',
+    ]
+    
+    def __init__(self, headless=True, measure_network=True):
         """
         Initialize WebDriver Manager
         
         Args:
             headless: Run browser in headless mode (no GUI)
+            measure_network: Record Chrome performance logs so bytes
+                transferred per page can be measured
         """
         self.headless = headless
+        self.measure_network = measure_network
         self.driver = None
+        self.blocked_urls: List[str] = []
     
     def get_driver(self):
         """
@@ -58,6 +132,11 @@ class WebDriverManager:
             chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
             chrome_options.add_experimental_option('useAutomationExtension', False)
             
+            # Keep background tabs running at full speed (multi-tab scraping)
+            chrome_options.add_argument('--disable-background-timer-throttling')
+            chrome_options.add_argument('--disable-backgrounding-occluded-windows')
+            chrome_options.add_argument('--disable-renderer-backgrounding')
+            
             # Random user agent
             user_agent = random.choice(self.USER_AGENTS)
             chrome_options.add_argument(f'user-agent={user_agent}')
@@ -72,15 +151,18 @@ class WebDriverManager:
             }
             chrome_options.add_experimental_option("prefs", prefs)
             
-            # Auto-download and setup ChromeDriver
-            service = Service(ChromeDriverManager().install())
+            if self.measure_network:
+                chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+            
+            # Auto-download and setup ChromeDriver (cached per process)
+            service = Service(get_chromedriver_path())
             
             # Create driver
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
             
             # Set timeouts
             self.driver.set_page_load_timeout(30)
-            self.driver.implicitly_wait(10)
+            self.driver.implicitly_wait(self.IMPLICIT_WAIT_SECONDS)
             
             logger.info("Chrome WebDriver initialized successfully")
             return self.driver
@@ -89,12 +171,110 @@ class WebDriverManager:
             logger.error(f"Failed to initialize WebDriver: {e}")
             raise
     
+    def set_blocked_urls(self, patterns: Iterable[str]):
+        """
+        Block requests matching the given URL patterns (CDP Network.setBlockedURLs)
+        
+        Only re-sent to Chrome when the pattern list changes, so pooled
+        browsers can switch profiles between scrapers cheaply.
+        
+        Args:
+            patterns: Wildcard URL patterns; empty to disable blocking
+        """
+        patterns = list(patterns)
+        if not self.driver or patterns == self.blocked_urls:
+            return
+        
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+            self.blocked_urls = patterns
+            logger.info(f"Blocking {len(patterns)} URL patterns")
+        except Exception as e:
+            logger.warning(f"Failed to set blocked URLs: {e}")
+    
+    def network_stats(self) -> Optional[Dict[str, int]]:
+        """
+        Summarize network traffic since the last call
+        
+        Drains Chrome's performance log, so call once before navigating to
+        discard earlier traffic and once after the scrape to measure it.
+        
+        Returns:
+            Dict with bytes_transferred, requests and requests_blocked, or
+            None when network measurement is disabled or unavailable
+        """
+        if not self.driver or not self.measure_network:
+            return None
+        
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception as e:
+            logger.debug(f"Performance log unavailable: {e}")
+            return None
+        
+        stats = {'bytes_transferred': 0, 'requests': 0, 'requests_blocked': 0}
+        for entry in entries:
+            message = json.loads(entry['message'])['message']
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.requestWillBeSent':
+                stats['requests'] += 1
+            elif method == 'Network.loadingFinished':
+                stats['bytes_transferred'] += int(params.get('encodedDataLength', 0))
+            elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+                stats['requests_blocked'] += 1
+        
+        return stats
+    
+    def is_healthy(self) -> bool:
+        """Check that the browser is still alive and responding"""
+        if not self.driver:
+            return False
+        
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except Exception as e:
+            logger.warning(f"WebDriver health check failed: {e}")
+            return False
+    
+    def reset_state(self):
+        """
+        Clear cookies, storage and extra tabs so the next page starts clean
+        
+        Used by the browser pool between places so one scrape cannot leak
+        consent banners, session state or cached review panes into the next.
+        """
+        if not self.driver:
+            return
+        
+        # Close any extra tabs, keeping the first one
+        handles = self.driver.window_handles
+        for handle in handles[1:]:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        self.driver.switch_to.window(handles[0])
+        
+        self.driver.delete_all_cookies()
+        try:
+            self.driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            for origin in self.RESET_ORIGINS:
+                self.driver.execute_cdp_cmd('Storage.clearDataForOrigin', {
+                    'origin': origin,
+                    'storageTypes': 'all'
+                })
+        except Exception as e:
+            logger.debug(f"CDP storage reset failed: {e}")
+        
+        self.driver.get('about:blank')
+    
     def close(self):
         """Close and cleanup WebDriver"""
         if self.driver:
             try:
                 self.driver.quit()
                 self.driver = None
+                self.blocked_urls = []
                 logger.info("WebDriver closed successfully")
             except Exception as e:
                 logger.error(f"Error closing WebDriver: {e}")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Scraper Benchmark
+
+Times review extraction against archived Google Maps snapshots (see
+app.services.snapshot_archive) instead of live pages, so selector or
+extraction changes can be compared on identical input.
+
+The offline BeautifulSoup/lxml parser is always measured. With --browser
+each snapshot is also loaded into headless Chrome from disk and the
+scraper's script and element extraction modes are timed on it.
+
+Usage:
+    python benchmarks/scraper_benchmark.py --archive /tmp/vibefinder-snapshots
+    python benchmarks/scraper_benchmark.py --archive /tmp/vibefinder-snapshots --browser --limit 10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def _time(func, repeat: int):
+    """Median seconds of func() over repeat runs, and the last result"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def _benchmark_offline(archive, entries, repeat: int):
+    from app.services.offline_parser import parse_reviews_html
+    
+    rows = []
+    for entry in entries:
+        html = archive.load(entry['digest'])
+        seconds, reviews = _time(lambda: parse_reviews_html(html), repeat)
+        rows.append((entry, seconds, len(reviews)))
+    return rows
+
+
+def _benchmark_browser(archive, entries, repeat: int):
+    from app.services.google_maps_scraper import GoogleMapsScraper
+    from app.services.webdriver_manager import WebDriverManager
+    
+    script_scraper = GoogleMapsScraper(extraction_mode='script')
+    element_scraper = GoogleMapsScraper(extraction_mode='elements')
+    rows = []
+    
+    with WebDriverManager(headless=True, measure_network=False) as driver:
+        with tempfile.TemporaryDirectory() as tmp:
+            for entry in entries:
+                path = os.path.join(tmp, f"{entry['digest']}.html")
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(archive.load(entry['digest']))
+                driver.get(f"file://{path}")
+                
+                script_seconds, script_reviews = _time(lambda: script_scraper._extract_reviews(driver, 10 ** 6), repeat)
+                element_seconds, element_reviews = _time(lambda: element_scraper._extract_reviews(driver, 10 ** 6), repeat)
+                rows.append((entry, script_seconds, len(script_reviews), element_seconds, len(element_reviews)))
+    return rows
+
+
+def _print_table(title: str, header, rows):
+    print(f"\n{title}")
+    print("-" * 78)
+    print("".join(f"{column:>14}" if i else f"{column:<22}" for i, column in enumerate(header)))
+    for row in rows:
+        print("".join(
+            f"{value:>14}" if i else f"{value:<22}"
+            for i, value in enumerate(row)
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark review extraction on archived snapshots")
+    parser.add_argument('--archive', required=True, help="Snapshot archive directory")
+    parser.add_argument('--limit', type=int, default=None, help="Maximum snapshots to benchmark")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement (median is reported)")
+    parser.add_argument('--browser', action='store_true', help="Also time in-browser script/element extraction")
+    args = parser.parse_args()
+    
+    from app.services.snapshot_archive import SnapshotArchive
+    
+    archive = SnapshotArchive(args.archive)
+    entries = list(archive.entries(latest_only=True))[:args.limit]
+    if not entries:
+        print(f"No snapshots in {args.archive}", file=sys.stderr)
+        sys.exit(1)
+    
+    offline = _benchmark_offline(archive, entries, args.repeat)
+    _print_table(
+        "Offline lxml parsing per snapshot",
+        ['place_id', 'parse ms', 'reviews', 'archived'],
+        [
+            (entry['place_id'][:20], f"{seconds * 1000:.1f}", count, entry.get('reviews_extracted', '-'))
+            for entry, seconds, count in offline
+        ]
+    )
+    total = sum(seconds for _, seconds, _ in offline)
+    print(f"\nTotal: {total * 1000:.1f} ms for {len(offline)} snapshots "
+          f"({sum(count for _, _, count in offline)} reviews)")
+    
+    if args.browser:
+        browser = _benchmark_browser(archive, entries, args.repeat)
+        _print_table(
+            "In-browser extraction per snapshot",
+            ['place_id', 'script ms', 'reviews', 'elements ms', 'reviews'],
+            [
+                (entry['place_id'][:20], f"{script_s * 1000:.1f}", script_n, f"{element_s * 1000:.1f}", element_n)
+                for entry, script_s, script_n, element_s, element_n in browser
+            ]
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Serialization Benchmark
+
+Compares Celery's JSON serializer with the msgpackz serializer (see
+app.core.serialization) on task messages carrying review lists, the
+payloads that dominate scraping and ML traffic through Redis.
+
+Reviews are synthetic by default: scraper-shaped dicts (text, rating,
+author, date, review_id) with review-length text built from a restaurant
+vocabulary. With --archive, real reviews are parsed from archived Google
+Maps snapshots (see app.services.snapshot_archive) instead.
+
+Usage:
+    python benchmarks/serialization_benchmark.py
+    python benchmarks/serialization_benchmark.py --archive /tmp/vibefinder-snapshots --sizes 10,100,1000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+WORDS = (
+    "the pasta was amazing and service friendly but a bit slow we waited "
+    "twenty minutes for a table on friday night tacos spicy fresh great "
+    "value portions huge cocktails overpriced ambiance cozy loud music "
+    "brunch menu recommend coming back again staff attentive dessert "
+    "tiramisu dry burger juicy fries cold parking easy location downtown"
+).split()
+
+
+def _synthetic_reviews(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        {
+            'text': " ".join(rng.choice(WORDS) for _ in range(rng.randint(15, 120))).capitalize() + ".",
+            'rating': float(rng.randint(1, 5)),
+            'author': f"Local Guide {rng.randint(1, 10 ** 6)}",
+            'date': f"{rng.randint(1, 11)} months ago",
+            'review_id': f"ChZDSUhNMG9nS0VJQ0FnSUR{rng.getrandbits(64):016x}",
+        }
+        for _ in range(count)
+    ]
+
+
+def _archived_reviews(directory: str):
+    from app.services.offline_parser import parse_reviews_html
+    from app.services.snapshot_archive import SnapshotArchive
+    
+    archive = SnapshotArchive(directory)
+    reviews = []
+    for entry in archive.entries(latest_only=True):
+        reviews.extend(parse_reviews_html(archive.load(entry['digest'])))
+    return reviews
+
+
+def _serializers():
+    """name -> (dumps, loads) as Celery would call them"""
+    from kombu.utils import json as kombu_json
+    from app.core import serialization
+    
+    def msgpackz(codec, threshold=None):
+        def dumps(obj):
+            packed = serialization.msgpack.packb(obj, default=serialization._default, use_bin_type=True)
+            return serialization.compress(packed, threshold=threshold, codec=codec)
+        return dumps, serialization.loads
+    
+    serializers = {
+        'json': (kombu_json.dumps, kombu_json.loads),
+        'msgpack': msgpackz(None, threshold=float('inf')),
+        'msgpack+zlib': msgpackz(serialization.CODEC_ZLIB, threshold=0),
+        'msgpack+zstd': msgpackz(serialization.CODEC_ZSTD, threshold=0),
+    }
+    return serializers
+
+
+def _time(func, repeat: int):
+    """Median seconds of func() over repeat runs, and the last result"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Celery message serializers on review payloads")
+    parser.add_argument('--archive', default=None, help="Snapshot archive directory to take real reviews from")
+    parser.add_argument('--sizes', default='10,100,500', help="Comma-separated reviews per message")
+    parser.add_argument('--repeat', type=int, default=20, help="Runs per measurement (median is reported)")
+    args = parser.parse_args()
+    
+    sizes = [int(size) for size in args.sizes.split(',')]
+    if args.archive:
+        pool = _archived_reviews(args.archive)
+        if not pool:
+            print(f"No reviews in {args.archive}", file=sys.stderr)
+            sys.exit(1)
+        pool = (pool * (max(sizes) // len(pool) + 1))[:max(sizes)]
+    else:
+        pool = _synthetic_reviews(max(sizes))
+    
+    serializers = _serializers()
+    print(f"{'reviews':>8}  {'serializer':<14}{'bytes':>10}{'ratio':>8}{'encode ms':>12}{'decode ms':>12}")
+    print("-" * 64)
+    for size in sizes:
+        # Celery protocol 2 body: (args, kwargs, embed)
+        message = [[pool[:size]], {}, {'callbacks': None, 'errbacks': None, 'chain': None, 'chord': None}]
+        json_bytes = None
+        for name, (dumps, loads) in serializers.items():
+            encode_s, payload = _time(lambda: dumps(message), args.repeat)
+            decode_s, decoded = _time(lambda: loads(payload), args.repeat)
+            assert decoded == message, f"{name} did not round-trip"
+            json_bytes = json_bytes or len(payload)
+            print(f"{size:>8}  {name:<14}{len(payload):>10}{len(payload) / json_bytes:>8.2f}"
+                  f"{encode_s * 1000:>12.3f}{decode_s * 1000:>12.3f}")
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+
+Reports the import cost of each heavy module and the first-use construction
+cost of each shared service. Every measurement runs in a fresh interpreter so
+results are not skewed by modules already imported by earlier measurements.
+
+Usage:
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules imported by the API process and the Celery worker
+MODULES = [
+    'fastapi',
+    'sqlalchemy',
+    'celery',
+    'googlemaps',
+    'vaderSentiment.vaderSentiment',
+    'sklearn.feature_extraction.text',
+    'sklearn.decomposition',
+    'selenium.webdriver',
+    'webdriver_manager.chrome',
+    'praw',
+    'app.main',
+    'celery_worker',
+]
+
+# Services constructed through app.services.registry
+SERVICES = [
+    'google_places',
+    'review_scraper',
+    'sentiment_analyzer',
+    'topic_modeler',
+    'keyword_extractor',
+]
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+SERVICE_SNIPPET = """
+import time
+from app.services import registry
+start = time.perf_counter()
+registry.get_service({service!r})
+print(time.perf_counter() - start)
+"""
+
+
+def _run(snippet: str):
+    """Run a snippet in a fresh interpreter and return elapsed seconds (or None)"""
+    result = subprocess.run(
+        [sys.executable, '-c', snippet],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        return None
+    try:
+        return float(result.stdout.strip().splitlines()[-1])
+    except (ValueError, IndexError):
+        return None
+
+
+def _measure(snippet: str, repeat: int):
+    samples = [_run(snippet) for _ in range(repeat)]
+    samples = [s for s in samples if s is not None]
+    return statistics.median(samples) if samples else None
+
+
+def _print_table(title: str, rows):
+    print(f"\n{title}")
+    print("-" * 60)
+    for name, seconds in rows:
+        value = f"{seconds * 1000:9.1f} ms" if seconds is not None else "   unavailable"
+        print(f"{name:<45}{value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API/worker startup cost")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement (median is reported)")
+    args = parser.parse_args()
+    
+    import_rows = [
+        (module, _measure(IMPORT_SNIPPET.format(module=module), args.repeat))
+        for module in MODULES
+    ]
+    _print_table("Import cost per module (fresh interpreter)", import_rows)
+    
+    service_rows = [
+        (service, _measure(SERVICE_SNIPPET.format(service=service), args.repeat))
+        for service in SERVICES
+    ]
+    _print_table("First-use construction cost per service", service_rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -21,7 +21,9 @@ celery_app = Celery('vibefinder')
 celery_app.config_from_object('app.core.celery_config')
 
 # Auto-discover tasks
-celery_app.autodiscover_tasks(['app.services'])
+# Tasks live in app.services.background_jobs, which only imports celery at
+# module level; scrapers and ML models are imported inside the task bodies.
+celery_app.autodiscover_tasks(['app.services'], related_name='background_jobs')
 
 if __name__ == '__main__':
     celery_app.start()
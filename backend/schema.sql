@@ -10,6 +10,10 @@ CREATE TABLE IF NOT EXISTS restaurants (
     address TEXT,
     total_ratings INTEGER DEFAULT 0,
     last_scraped TIMESTAMP,
+    review_watermark_id VARCHAR(255),
+    review_watermark_date TIMESTAMP,
+    search_score FLOAT DEFAULT 0.0,
+    last_searched TIMESTAMP,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -23,8 +27,11 @@ CREATE TABLE IF NOT EXISTS reviews (
     review_date VARCHAR(100),
     sentiment_score FLOAT,
     source VARCHAR(50) DEFAULT 'google_maps',
+    external_id VARCHAR(255),
+    content_hash VARCHAR(64),
     scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     is_processed BOOLEAN DEFAULT FALSE,
+    is_duplicate BOOLEAN DEFAULT FALSE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -34,7 +41,61 @@ CREATE TABLE IF NOT EXISTS scraping_jobs (
     place_id VARCHAR(255) NOT NULL,
     status VARCHAR(50) DEFAULT 'pending',
     reviews_scraped INTEGER DEFAULT 0,
+    batch_id VARCHAR(32),
     error_message TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
     completed_at TIMESTAMP
 );
+
+CREATE TABLE IF NOT EXISTS restaurant_insights (
+    id SERIAL PRIMARY KEY,
+    restaurant_id INTEGER NOT NULL UNIQUE REFERENCES restaurants(id) ON DELETE CASCADE,
+    true_sentiment VARCHAR(50),
+    vibe_check JSON,
+    must_try_dishes JSON,
+    common_complaints JSON,
+    review_count INTEGER DEFAULT 0,
+    review_set_hash VARCHAR(64),
+    computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS reddit_corpus (
+    id SERIAL PRIMARY KEY,
+    subreddit VARCHAR(100) NOT NULL,
+    reddit_id VARCHAR(20) NOT NULL UNIQUE,
+    kind VARCHAR(10) NOT NULL,
+    post_id VARCHAR(20),
+    title TEXT,
+    text TEXT NOT NULL,
+    author VARCHAR(255),
+    score INTEGER DEFAULT 0,
+    created_at TIMESTAMP,
+    crawled_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_reddit_corpus_subreddit ON reddit_corpus (subreddit);
+CREATE INDEX IF NOT EXISTS ix_reddit_corpus_post_id ON reddit_corpus (post_id);
+
+-- Migrations for existing databases
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS is_duplicate BOOLEAN DEFAULT FALSE;
+CREATE INDEX IF NOT EXISTS ix_reviews_is_duplicate ON reviews (is_duplicate);
+ALTER TABLE restaurants ADD COLUMN IF NOT EXISTS review_watermark_id VARCHAR(255);
+ALTER TABLE restaurants ADD COLUMN IF NOT EXISTS review_watermark_date TIMESTAMP;
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS external_id VARCHAR(255);
+CREATE INDEX IF NOT EXISTS ix_reviews_external_id ON reviews (external_id);
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+-- Existing rows keep a NULL hash (NULLs never conflict); new writes always set it
+CREATE UNIQUE INDEX IF NOT EXISTS ix_reviews_content_hash ON reviews (content_hash);
+ALTER TABLE restaurants ADD COLUMN IF NOT EXISTS search_score FLOAT DEFAULT 0.0;
+ALTER TABLE restaurants ADD COLUMN IF NOT EXISTS last_searched TIMESTAMP;
+ALTER TABLE scraping_jobs ADD COLUMN IF NOT EXISTS batch_id VARCHAR(32);
+CREATE INDEX IF NOT EXISTS ix_scraping_jobs_batch_id ON scraping_jobs (batch_id);
+ALTER TABLE scraping_jobs ADD COLUMN IF NOT EXISTS started_at TIMESTAMP;
+-- Jobs left pending/running by the old lifecycle (trigger and task each created a row) never finish;
+-- fail them before adding the at-most-one-active-job-per-place index. Run with workers stopped.
+UPDATE scraping_jobs SET status = 'failed', completed_at = CURRENT_TIMESTAMP, error_message = 'Superseded by job lifecycle migration'
+    WHERE status IN ('pending', 'running')
+    AND NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'ix_scraping_jobs_active_place');
+CREATE UNIQUE INDEX IF NOT EXISTS ix_scraping_jobs_active_place ON scraping_jobs (place_id)
+    WHERE status IN ('pending', 'running');
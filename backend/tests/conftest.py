@@ -0,0 +1,56 @@
+"""
+Shared fixtures
+
+Database tests run against in-memory SQLite and Redis tests against
+fakeredis (with lupa for the Lua scripts), so the suite needs neither
+Postgres nor a Redis server.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+
+@pytest.fixture
+def session_factory():
+    """Session factory over a fresh in-memory database with the full schema"""
+    from app.models.database import Base
+    
+    engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def redis_server():
+    """Empty fakeredis server that can run Lua scripts"""
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def redis_client(redis_server):
+    import fakeredis
+    
+    return fakeredis.FakeRedis(server=redis_server)
+
+
+@pytest.fixture
+def restaurant(db):
+    from app.models.database import Restaurant
+    
+    row = Restaurant(place_id='place-1', name='Test Kitchen')
+    db.add(row)
+    db.commit()
+    return row
@@ -0,0 +1,71 @@
+"""Batched ML analysis matches analyzing each restaurant alone"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip('sklearn')
+pytest.importorskip('vaderSentiment')
+
+from app.ml.batch_analyzer import BatchAnalyzer
+from app.ml.keyword_extractor import KeywordExtractor
+from app.ml.sentiment_analyzer import SentimentAnalyzer
+from app.ml.topic_modeler import TopicModeler
+
+DISHES = ['margherita pizza', 'truffle pasta', 'caesar salad', 'fish tacos', 'lobster roll', 'chicken wings']
+OPENERS = ['Loved the', 'We tried the', 'Highly recommend the', 'The best', 'Order the']
+VERDICTS = [
+    'Service was slow but friendly.',
+    'Cozy spot for a quiet date night.',
+    'Loud and crowded on weekends, great for groups.',
+    'A bit expensive for the portion size.',
+    'Fresh ingredients and a relaxed patio.',
+]
+
+
+def _corpus(n_reviews, offset=0):
+    """Deterministic reviews with many tied term scores"""
+    reviews = []
+    for i in range(n_reviews):
+        j = i + offset
+        reviews.append(
+            f"{OPENERS[j % len(OPENERS)]} {DISHES[j % len(DISHES)]}. "
+            f"{VERDICTS[j % len(VERDICTS)]} The {DISHES[(j + 2) % len(DISHES)]} was delicious."
+        )
+    return reviews
+
+
+@pytest.fixture(scope='module')
+def models():
+    return SentimentAnalyzer(), TopicModeler(), KeywordExtractor()
+
+
+def _single(models, reviews):
+    sentiment_analyzer, topic_modeler, keyword_extractor = models
+    return {
+        'trueSentiment': sentiment_analyzer.analyze(reviews),
+        'vibeCheck': topic_modeler.extract_vibes(reviews),
+        'mustTryDishes': keyword_extractor.extract_dishes(reviews),
+        'commonComplaints': keyword_extractor.extract_complaints(reviews),
+    }
+
+
+def test_batch_matches_single_analysis(models):
+    review_lists = [_corpus(30), _corpus(12, offset=3), _corpus(4, offset=1), []]
+    analyzer = BatchAnalyzer(*models, duplicate_threshold=None)
+    
+    batch = analyzer.analyze_batch(review_lists)
+    
+    for reviews, result in zip(review_lists, batch):
+        expected = _single(models, reviews)
+        assert result['trueSentiment'] == expected['trueSentiment']
+        assert result['mustTryDishes'] == expected['mustTryDishes']
+        assert result['commonComplaints'] == expected['commonComplaints']
+        assert sorted(result['vibeCheck']) == sorted(expected['vibeCheck'])
+
+
+def test_dish_ties_break_by_term(models):
+    _, _, keyword_extractor = models
+    scores = np.array([0.5, 0.5, 0.9, 0.5])
+    terms = np.array(['pasta', 'burger', 'pizza', 'salad'])
+    
+    assert keyword_extractor._select_tfidf_dishes(scores, terms, 2) == ['Pizza', 'Burger']
@@ -0,0 +1,69 @@
+"""City parsing and mention lookups for the Reddit city corpus"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.city_corpus import MentionIndex, city_from_location, city_subreddit, search_corpus, store_corpus_items
+
+
+@pytest.mark.parametrize('location, city', [
+    ('Austin, TX', 'Austin'),
+    ('123 Main St, Austin, TX 78701, USA', 'Austin'),
+    ('500 W 2nd St, San Francisco, CA 94107, United States', 'San Francisco'),
+    ('12 Queen St W, Toronto, ON M5H 2N2, Canada', 'Toronto'),
+    ('Chicago', 'Chicago'),
+    ('  Denver ,  CO ', 'Denver'),
+    ('USA', None),
+    ('', None),
+    (None, None),
+])
+def test_city_from_location(location, city):
+    assert city_from_location(location) == city
+
+
+def test_city_subreddit():
+    assert city_subreddit('1 Market St, San Francisco, CA') == 'sanfrancisco'
+    assert city_subreddit(None) is None
+
+
+def _item(reddit_id, text, kind='comment', title=None, score=1):
+    return {
+        'reddit_id': reddit_id, 'kind': kind, 'post_id': 't3_post', 'title': title, 'text': text,
+        'author': 'someone', 'score': score, 'created_at': datetime(2024, 5, 1),
+    }
+
+
+def test_mention_index_matches_phrases_by_score():
+    index = MentionIndex([
+        _item('t1_a', "Joe's Pizza has the best slice in town", score=3),
+        _item('t1_b', "Pizza at Joe's was cold", score=10),
+        _item('t1_c', "JOE’S PIZZA never disappoints", score=7),
+    ])
+    
+    assert [item['text'][:5] for item in index.find("Joe's Pizza")] == ['JOE’S', "Joe's"]
+    assert index.find('') == []
+
+
+def test_search_corpus_uses_a_fresh_corpus(db):
+    store_corpus_items(db, 'Austin', [
+        _item('t3_post', 'A long post about where to eat, and Franklin Barbecue came up again and again.', kind='post', title='BBQ'),
+        _item('t1_short', 'Franklin Barbecue!'),
+        _item('t1_long', 'Waited two hours at Franklin Barbecue and it was worth it.'),
+    ])
+    db.commit()
+    
+    mentions = search_corpus(db, '900 E 11th St, Austin, TX', 'Franklin Barbecue')
+    
+    assert sorted(mention['type'] for mention in mentions) == ['comment', 'post']
+    assert search_corpus(db, 'Dallas, TX', 'Franklin Barbecue') is None
+
+
+def test_stale_corpus_falls_back_to_the_api(db):
+    from app.models.database import RedditCorpusItem
+    
+    store_corpus_items(db, 'austin', [_item('t1_long', 'Waited two hours at Franklin Barbecue and it was worth it.')])
+    db.query(RedditCorpusItem).update({'crawled_at': datetime.utcnow() - timedelta(hours=72)})
+    db.commit()
+    
+    assert search_corpus(db, 'Austin, TX', 'Franklin Barbecue', max_age_hours=48) is None
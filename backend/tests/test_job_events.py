@@ -0,0 +1,83 @@
+"""Streaming job events"""
+
+import asyncio
+import json
+from unittest import mock
+
+import pytest
+
+from app.models.database import ScrapingJob
+from app.services.job_events import channel, job_snapshot, snapshot_key, stream_job_events
+
+
+@pytest.fixture
+def job(db, restaurant):
+    row = ScrapingJob(restaurant_id=restaurant.id, place_id=restaurant.place_id, status='running')
+    db.add(row)
+    db.commit()
+    return row
+
+
+@pytest.fixture
+def async_redis(redis_server, session_factory):
+    """Async client on the fake server, returned by Redis.from_url"""
+    import fakeredis
+    
+    client = fakeredis.FakeAsyncRedis(server=redis_server)
+    with mock.patch('redis.asyncio.Redis.from_url', return_value=client), \
+            mock.patch('app.models.database.get_session_local', return_value=session_factory):
+        yield client
+
+
+async def _collect(job_id, initial, keepalive=0.05, publish=None, limit=20):
+    events = []
+    async for event in stream_job_events(job_id, initial, keepalive):
+        events.append(event)
+        if publish and len(events) == 1:
+            await publish()
+        if len(events) >= limit:
+            break
+    return events
+
+
+def test_ends_on_published_terminal_event(job, async_redis):
+    initial = job_snapshot(job)
+    
+    async def publish():
+        await async_redis.publish(channel(job.id), json.dumps({'job_id': job.id, 'status': 'completed'}))
+    
+    events = asyncio.run(_collect(job.id, initial, keepalive=1, publish=publish))
+    
+    assert events[0] == initial
+    assert events[-1]['status'] == 'completed'
+
+
+def test_starts_from_the_stored_latest_event(job, async_redis, redis_client):
+    latest = {'job_id': job.id, 'status': 'running', 'phase': 'scroll', 'reviews_loaded': 40}
+    redis_client.set(snapshot_key(job.id), json.dumps(latest))
+    
+    async def first_event():
+        async for event in stream_job_events(job.id, job_snapshot(job), 0.05):
+            return event
+    
+    assert asyncio.run(first_event()) == latest
+
+
+def test_ends_when_the_terminal_event_was_dropped(job, db, async_redis):
+    initial = job_snapshot(job)
+    job.status = 'failed'
+    job.error_message = 'Scrape failed in browser'
+    db.commit()
+    
+    events = asyncio.run(_collect(job.id, initial))
+    
+    assert events[0] == initial
+    assert events[-1]['status'] == 'failed'
+    assert events[-1]['error_message'] == 'Scrape failed in browser'
+    assert len(events) == 2
+
+
+def test_keeps_streaming_while_the_job_runs(job, async_redis):
+    events = asyncio.run(_collect(job.id, job_snapshot(job), limit=3))
+    
+    assert events[1:] == [None, None]
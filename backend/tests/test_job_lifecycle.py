@@ -0,0 +1,327 @@
+"""Job claims, compare-and-set transitions, place leases and reaping"""
+
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+
+from app.models.database import Restaurant, ScrapingJob
+from app.services.job_lifecycle import (
+    PlaceLeases,
+    create_jobs,
+    in_flight_job,
+    lease_key,
+    reap_stale_jobs,
+    transition,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_job_events():
+    with mock.patch('app.services.job_events.publish_job_event') as publish:
+        yield publish
+
+
+def _status(session_factory, job_id):
+    session = session_factory()
+    try:
+        return session.get(ScrapingJob, job_id).status
+    finally:
+        session.close()
+
+
+class TestCreateJobs:
+    
+    def test_creates_one_pending_job_per_place(self, db, restaurant):
+        other = Restaurant(place_id='place-2', name='Other')
+        db.add(other)
+        db.commit()
+        
+        jobs = create_jobs(db, [(restaurant.id, 'place-1'), (other.id, 'place-2')], batch_id='b1')
+        db.commit()
+        
+        assert set(jobs) == {'place-1', 'place-2'}
+        assert {job.status for job in db.query(ScrapingJob)} == {'pending'}
+        assert {job.batch_id for job in db.query(ScrapingJob)} == {'b1'}
+    
+    def test_double_claim_creates_nothing(self, session_factory, restaurant):
+        first, second = session_factory(), session_factory()
+        
+        claimed = create_jobs(first, [(restaurant.id, 'place-1')])
+        first.commit()
+        again = create_jobs(second, [(restaurant.id, 'place-1')])
+        second.commit()
+        
+        assert list(claimed) == ['place-1']
+        assert again == {}
+        assert second.query(ScrapingJob).count() == 1
+        assert in_flight_job(second, 'place-1').id == claimed['place-1']
+    
+    def test_running_job_still_blocks_a_claim(self, db, restaurant):
+        job_id = create_jobs(db, [(restaurant.id, 'place-1')])['place-1']
+        db.commit()
+        transition(db, job_id, ['pending'], 'running')
+        
+        assert create_jobs(db, [(restaurant.id, 'place-1')]) == {}
+    
+    def test_finished_job_frees_the_place(self, db, restaurant):
+        job_id = create_jobs(db, [(restaurant.id, 'place-1')])['place-1']
+        db.commit()
+        transition(db, job_id, ['pending'], 'failed')
+        
+        jobs = create_jobs(db, [(restaurant.id, 'place-1')])
+        db.commit()
+        
+        assert list(jobs) == ['place-1']
+        assert jobs['place-1'] != job_id
+    
+    def test_no_places(self, db):
+        assert create_jobs(db, []) == {}
+
+
+class TestTransition:
+    
+    def test_moves_job_and_publishes(self, db, restaurant, session_factory, no_job_events):
+        job_id = create_jobs(db, [(restaurant.id, 'place-1')])['place-1']
+        db.commit()
+        
+        assert transition(db, job_id, ['pending'], 'completed', reviews_scraped=5, completed_at=datetime.utcnow())
+        
+        assert _status(session_factory, job_id) == 'completed'
+        no_job_events.assert_called_once_with(job_id, 'completed', reviews_scraped=5)
+    
+    def test_lost_race_changes_nothing(self, db, restaurant, session_factory, no_job_events):
+        job_id = create_jobs(db, [(restaurant.id, 'place-1')])['place-1']
+        db.commit()
+        
+        assert transition(db, job_id, ['pending'], 'running')
+        assert not transition(db, job_id, ['pending'], 'running')
+        
+        assert _status(session_factory, job_id) == 'running'
+        assert no_job_events.call_count == 1
+
+
+class TestPlaceLeases:
+    
+    def test_contended_place_is_not_held(self, redis_client):
+        with PlaceLeases(redis_client, {'place-1': 1}, ttl_seconds=60) as first:
+            with PlaceLeases(redis_client, {'place-1': 2, 'place-2': 2}, ttl_seconds=60) as second:
+                assert first.held == ['place-1']
+                assert second.held == ['place-2']
+                assert redis_client.get(lease_key('place-1')) == b'1'
+        
+        assert redis_client.get(lease_key('place-1')) is None
+        assert redis_client.get(lease_key('place-2')) is None
+    
+    def test_release_keeps_a_lease_taken_over_by_another_job(self, redis_client):
+        with PlaceLeases(redis_client, {'place-1': 1}, ttl_seconds=60):
+            redis_client.set(lease_key('place-1'), '2')
+        
+        assert redis_client.get(lease_key('place-1')) == b'2'
+    
+    def test_heartbeat_renews_the_lease(self, redis_client):
+        with PlaceLeases(redis_client, {'place-1': 1}, ttl_seconds=0.3) as leases:
+            leases._stop.wait(0.6)
+            assert redis_client.get(lease_key('place-1')) == b'1'
+    
+    def test_renew_does_not_take_over_another_jobs_lease(self, redis_client):
+        leases = PlaceLeases(redis_client, {'place-1': 1}, ttl_seconds=60)
+        redis_client.set(lease_key('place-1'), '2')
+        
+        assert leases._renew(keys=[lease_key('place-1')], args=['1', 60000]) == 0
+        assert redis_client.get(lease_key('place-1')) == b'2'
+    
+    def test_renew_retakes_a_lapsed_lease(self, redis_client):
+        leases = PlaceLeases(redis_client, {'place-1': 1}, ttl_seconds=60)
+        
+        assert leases._renew(keys=[lease_key('place-1')], args=['1', 60000]) == 1
+        assert 0 < redis_client.pttl(lease_key('place-1')) <= 60000
+    
+    def test_redis_down_holds_every_place(self):
+        from redis.exceptions import ConnectionError
+        
+        client = mock.Mock()
+        client.set.side_effect = ConnectionError('down')
+        client.register_script.return_value.side_effect = ConnectionError('down')
+        
+        with PlaceLeases(client, {'place-1': 1, 'place-2': 2}, ttl_seconds=60) as leases:
+            assert leases.held == ['place-1', 'place-2']
+
+
+class TestReapStaleJobs:
+    
+    LEASE_SECONDS = 120
+    
+    def _job(self, db, restaurant, status, created_at, started_at=None):
+        job = ScrapingJob(restaurant_id=restaurant.id, place_id=restaurant.place_id, status=status,
+                          created_at=created_at, started_at=started_at)
+        db.add(job)
+        db.commit()
+        return job.id
+    
+    def _reap(self, db, redis_client, now):
+        return reap_stale_jobs(db, redis_client, self.LEASE_SECONDS, timedelta(hours=24), now=now)
+    
+    def test_running_job_without_lease_is_failed(self, db, restaurant, redis_client, session_factory):
+        now = datetime.utcnow()
+        job_id = self._job(db, restaurant, 'running', now - timedelta(hours=1), started_at=now - timedelta(minutes=10))
+        
+        assert self._reap(db, redis_client, now) == {'running': 1, 'pending': 0}
+        assert _status(session_factory, job_id) == 'failed'
+    
+    def test_running_job_with_its_lease_is_kept(self, db, restaurant, redis_client, session_factory):
+        now = datetime.utcnow()
+        job_id = self._job(db, restaurant, 'running', now - timedelta(hours=1), started_at=now - timedelta(minutes=10))
+        redis_client.set(lease_key(restaurant.place_id), str(job_id))
+        
+        assert self._reap(db, redis_client, now) == {'running': 0, 'pending': 0}
+        assert _status(session_factory, job_id) == 'running'
+    
+    def test_lease_owned_by_another_job_does_not_count(self, db, restaurant, redis_client, session_factory):
+        now = datetime.utcnow()
+        job_id = self._job(db, restaurant, 'running', now - timedelta(hours=1), started_at=now - timedelta(minutes=10))
+        redis_client.set(lease_key(restaurant.place_id), str(job_id + 1))
+        
+        assert self._reap(db, redis_client, now)['running'] == 1
+        assert _status(session_factory, job_id) == 'failed'
+    
+    def test_freshly_started_job_gets_a_grace_period(self, db, restaurant, redis_client, session_factory):
+        now = datetime.utcnow()
+        job_id = self._job(db, restaurant, 'running', now, started_at=now - timedelta(seconds=self.LEASE_SECONDS - 1))
+        
+        assert self._reap(db, redis_client, now)['running'] == 0
+        assert _status(session_factory, job_id) == 'running'
+    
+    def test_stale_pending_job_is_failed(self, db, restaurant, redis_client, session_factory):
+        now = datetime.utcnow()
+        job_id = self._job(db, restaurant, 'pending', now - timedelta(hours=25))
+        
+        assert self._reap(db, redis_client, now) == {'running': 0, 'pending': 1}
+        assert _status(session_factory, job_id) == 'failed'
+    
+    def test_recent_pending_job_is_kept(self, db, restaurant, redis_client, session_factory):
+        now = datetime.utcnow()
+        job_id = self._job(db, restaurant, 'pending', now - timedelta(hours=23))
+        
+        assert self._reap(db, redis_client, now)['pending'] == 0
+        assert _status(session_factory, job_id) == 'pending'
+
+
+class TestScrapeTaskLeaseContention:
+    
+    @pytest.fixture
+    def job_id(self, db, restaurant, redis_client, session_factory):
+        job_id = create_jobs(db, [(restaurant.id, restaurant.place_id)])[restaurant.place_id]
+        db.commit()
+        redis_client.set(lease_key(restaurant.place_id), str(job_id + 1))
+        
+        with mock.patch('app.models.database.get_session_local', return_value=session_factory), \
+                mock.patch('app.core.redis_client.get_redis', return_value=redis_client):
+            yield job_id
+    
+    def test_retries_while_retries_remain(self, job_id, session_factory):
+        from celery.exceptions import Retry
+        from app.services.background_jobs import scrape_restaurant_task
+        
+        with mock.patch.object(scrape_restaurant_task, 'retry', side_effect=Retry()) as retry:
+            with pytest.raises(Retry):
+                scrape_restaurant_task.run(job_id)
+        
+        retry.assert_called_once()
+        assert _status(session_factory, job_id) == 'pending'
+    
+    def test_fails_the_job_once_retries_run_out(self, job_id, session_factory):
+        from app.services.background_jobs import scrape_restaurant_task
+        
+        result = scrape_restaurant_task.apply(args=(job_id,))
+        
+        assert result.get()['status'] == 'failed'
+        assert _status(session_factory, job_id) == 'failed'
+
+
+class TestScrapeTaskFailure:
+    
+    @pytest.fixture
+    def job_id(self, db, restaurant, redis_client, session_factory):
+        from app.services.google_maps_scraper import GoogleMapsScraper
+        
+        job_id = create_jobs(db, [(restaurant.id, restaurant.place_id)])[restaurant.place_id]
+        db.commit()
+        
+        pool = mock.Mock()
+        pool.lease.side_effect = TimeoutError('No browser available')
+        scraper = GoogleMapsScraper(browser_pool=pool, rate_limiter=mock.Mock())
+        
+        with mock.patch('app.models.database.get_session_local', return_value=session_factory), \
+                mock.patch('app.core.redis_client.get_redis', return_value=redis_client), \
+                mock.patch('app.services.background_jobs._google_scraper', return_value=scraper):
+            yield job_id
+    
+    def test_scraper_error_retries_instead_of_completing(self, job_id, restaurant, session_factory):
+        from celery.exceptions import Retry
+        from app.services.background_jobs import scrape_restaurant_task
+        
+        with mock.patch.object(scrape_restaurant_task, 'retry', side_effect=Retry()) as retry:
+            with pytest.raises(Retry):
+                scrape_restaurant_task.run(job_id)
+        
+        retry.assert_called_once()
+        session = session_factory()
+        try:
+            job = session.get(ScrapingJob, job_id)
+            assert (job.status, job.error_message) == ('pending', 'No browser available')
+            stored = session.get(Restaurant, restaurant.id)
+            assert stored.last_scraped is None
+            assert stored.review_watermark_date is None
+        finally:
+            session.close()
+
+
+class TestEnqueueFailure:
+    
+    @pytest.fixture(autouse=True)
+    def sessions(self, session_factory):
+        with mock.patch('app.models.database.get_session_local', return_value=session_factory):
+            yield
+    
+    def test_trigger_fails_the_job_and_frees_the_place(self, db, restaurant, session_factory):
+        import asyncio
+        from fastapi import HTTPException
+        from kombu.exceptions import OperationalError
+        from app.api.scraping import trigger_scraping
+        from app.services.background_jobs import scrape_restaurant_task
+        
+        with mock.patch.object(scrape_restaurant_task, 'delay', side_effect=OperationalError('broker down')):
+            with pytest.raises(HTTPException) as raised:
+                asyncio.run(trigger_scraping(restaurant.place_id, db=db))
+        
+        assert raised.value.status_code == 503
+        session = session_factory()
+        try:
+            job = session.query(ScrapingJob).one()
+            assert (job.status, job.error_message) == ('failed', 'Could not queue task: broker down')
+        finally:
+            session.close()
+        assert list(create_jobs(db, [(restaurant.id, restaurant.place_id)])) == [restaurant.place_id]
+    
+    def test_scheduler_fails_the_jobs_it_could_not_send(self, db, restaurant, session_factory):
+        from kombu.exceptions import OperationalError
+        from app.services.background_jobs import schedule_scrapes_task, scrape_restaurant_task
+        
+        others = [Restaurant(place_id=f'place-{i}', name=f'Other {i}') for i in (2, 3)]
+        db.add_all(others)
+        db.commit()
+        planned = [(row, 3.0 - i) for i, row in enumerate([restaurant] + others)]
+        
+        with mock.patch('app.services.scrape_scheduler.plan_refreshes', return_value=planned), \
+                mock.patch.object(scrape_restaurant_task, 'delay',
+                                  side_effect=[None, OperationalError('broker down')]):
+            with pytest.raises(OperationalError):
+                schedule_scrapes_task.run()
+        
+        session = session_factory()
+        try:
+            statuses = {job.place_id: job.status for job in session.query(ScrapingJob)}
+        finally:
+            session.close()
+        assert statuses == {'place-1': 'pending', 'place-2': 'failed', 'place-3': 'failed'}
@@ -0,0 +1,83 @@
+"""Grouping restaurants for batched ML"""
+
+import time
+from unittest import mock
+
+import pytest
+
+from app.services.ml_pipeline import MLBatchBuffer
+
+
+@pytest.fixture
+def buffer(redis_client):
+    return MLBatchBuffer(redis_client, key='ml:test')
+
+
+def test_full_group_is_taken_oldest_first(buffer, redis_client):
+    now = time.time()
+    redis_client.zadd('ml:test', {'3': now, '1': now - 2, '2': now - 1})
+    
+    assert buffer.take(2) == [1, 2]
+    assert len(buffer) == 1
+
+
+def test_partial_group_waits(buffer):
+    buffer.add([1, 2])
+    
+    assert buffer.take(3) == []
+    assert buffer.take(3, max_wait=60) == []
+    assert len(buffer) == 2
+
+
+def test_partial_group_is_released_after_max_wait(buffer, redis_client):
+    redis_client.zadd('ml:test', {'1': time.time() - 120})
+    buffer.add([2])
+    
+    assert buffer.take(3, max_wait=60) == [1, 2]
+    assert len(buffer) == 0
+
+
+def test_readding_keeps_the_original_position(buffer, redis_client):
+    redis_client.zadd('ml:test', {'1': time.time() - 120})
+    buffer.add([1])
+    
+    assert redis_client.zscore('ml:test', '1') < time.time() - 60
+
+
+def test_empty_buffer(buffer):
+    assert buffer.take(1, max_wait=0) == []
+
+
+def test_failed_claim_puts_the_group_back_in_place(buffer, redis_client):
+    now = time.time()
+    redis_client.zadd('ml:test', {'1': now - 2, '2': now - 1, '3': now})
+    
+    with pytest.raises(ConnectionError):
+        with buffer.claim(2) as restaurant_ids:
+            assert restaurant_ids == [1, 2]
+            raise ConnectionError('broker down')
+    
+    assert redis_client.zscore('ml:test', '1') == pytest.approx(now - 2)
+    assert buffer.take(2) == [1, 2]
+
+
+def test_successful_claim_removes_the_group(buffer, redis_client):
+    buffer.add([1, 2])
+    
+    with buffer.claim(2) as restaurant_ids:
+        assert restaurant_ids == [1, 2]
+    
+    assert len(buffer) == 0
+
+
+def test_release_keeps_unsent_groups(buffer, redis_client):
+    from app.services import background_jobs
+    
+    buffer.add([1, 2, 3])
+    
+    with mock.patch.object(background_jobs.process_ml_batch_task, 'delay', side_effect=ConnectionError), \
+            mock.patch('app.core.config.settings.ML_BATCH_SIZE', 3):
+        with pytest.raises(ConnectionError):
+            background_jobs._release_ml_groups(buffer)
+    
+    assert len(buffer) == 3
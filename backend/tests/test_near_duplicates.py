@@ -0,0 +1,65 @@
+"""MinHash/LSH near-duplicate detection"""
+
+import pytest
+
+from app.ml.near_duplicates import NearDuplicateDetector, find_duplicates, unique_indices
+
+REVIEW = (
+    "The margherita pizza was amazing and the staff were really friendly. "
+    "We waited a while for a table on Saturday night but it was worth it."
+)
+
+
+def _jaccard(detector, a, b):
+    sa, sb = set(detector._shingles(a)), set(detector._shingles(b))
+    return len(sa & sb) / len(sa | sb)
+
+
+def test_exact_and_reformatted_copies_are_duplicates():
+    reposted = REVIEW.upper().replace('.', '!!')
+    
+    assert find_duplicates([REVIEW, REVIEW, reposted]) == [None, 0, 0]
+
+
+def test_small_edit_is_a_duplicate():
+    edited = REVIEW.replace('Saturday', 'Friday')
+    
+    assert find_duplicates([REVIEW, edited]) == [None, 0]
+
+
+def test_unrelated_reviews_are_kept():
+    other = "Tiny place, cold fries and a rude cashier. The milkshake was fine though."
+    
+    assert find_duplicates([REVIEW, other]) == [None, None]
+    assert unique_indices([REVIEW, other, REVIEW]) == [0, 1]
+
+
+def test_similarity_estimate_tracks_jaccard():
+    detector = NearDuplicateDetector(num_perm=256, bands=64)
+    edited = REVIEW.replace('really friendly', 'very attentive and kind')
+    
+    estimate = float((detector.signature(REVIEW) == detector.signature(edited)).mean())
+    
+    assert estimate == pytest.approx(_jaccard(detector, REVIEW, edited), abs=0.1)
+
+
+def test_threshold_decides_between_moderately_similar_reviews():
+    edited = REVIEW.replace('We waited a while for a table on Saturday night', 'No wait at lunch')
+    similarity = _jaccard(NearDuplicateDetector(), REVIEW, edited)
+    assert 0.3 < similarity < 0.8
+    
+    assert find_duplicates([REVIEW, edited], threshold=0.95) == [None, None]
+    assert find_duplicates([REVIEW, edited], threshold=0.2) == [None, 0]
+
+
+def test_signatures_are_deterministic():
+    assert (NearDuplicateDetector().signature(REVIEW) == NearDuplicateDetector().signature(REVIEW)).all()
+
+
+def test_num_perm_must_split_into_bands():
+    with pytest.raises(ValueError):
+        NearDuplicateDetector(num_perm=64, bands=10)
+
+
+def test_empty_and_short_texts():
+    assert find_duplicates(['', None, 'ok', 'ok']) == [None, 0, None, 2]
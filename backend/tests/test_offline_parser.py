@@ -0,0 +1,78 @@
+"""Offline re-parsing of archived Google Maps snapshots"""
+
+import os
+
+import pytest
+
+pytest.importorskip('bs4')
+pytest.importorskip('lxml')
+
+from app.services.offline_parser import parse_reviews_html
+from app.services.snapshot_archive import SnapshotArchive
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'maps_reviews_snapshot.html')
+
+
+@pytest.fixture
+def snapshot_html():
+    with open(FIXTURE, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_parses_the_fixture_snapshot(snapshot_html):
+    reviews = parse_reviews_html(snapshot_html)
+    
+    assert reviews == [
+        {
+            'text': 'The margherita pizza was amazing.\nStaff were friendly and the patio is lovely.',
+            'rating': 5.0,
+            'author': 'Ann Lee',
+            'date': '2 weeks ago',
+            'review_id': 'ChZDSUhNMG9nS0VJQ0FnSUR4cEtXRkFREAE',
+        },
+        {
+            'text': 'Slow service on a Friday night, food was cold.',
+            'rating': None,
+            'author': 'Bo Park',
+            'date': 'a month ago',
+            'review_id': 'ChdDSUhNMG9nS0VJQ0FnSUR4aHNYczJ3RRAB',
+        },
+        {
+            'text': 'Decent tacos, pricey drinks.',
+            'rating': 3.0,
+            'author': 'Cy Diaz',
+            'date': '3 months ago',
+            'review_id': 'ChZDSUhNMG9nS0VJQ0FnSURSdS1xSkx3EAE',
+        },
+        {
+            'text': 'Great ramen.',
+            'rating': None,
+            'author': 'Eve Ng',
+            'date': 'a year ago',
+            'review_id': '',
+        },
+    ]
+
+
+def test_max_reviews_counts_elements_before_filtering(snapshot_html):
+    assert [review['author'] for review in parse_reviews_html(snapshot_html, max_reviews=2)] == ['Ann Lee', 'Bo Park']
+    # The fourth element has no text, so only three of the first four are returned
+    assert len(parse_reviews_html(snapshot_html, max_reviews=4)) == 3
+
+
+def test_falls_back_to_later_review_selectors():
+    html = '<div class="section-review"><span class="review-full-text">Nice spot</span></div>'
+    
+    assert parse_reviews_html(html) == [{'text': 'Nice spot', 'rating': None, 'author': '', 'date': '', 'review_id': ''}]
+
+
+def test_page_without_reviews():
+    assert parse_reviews_html('<html><body><div role="main"></div></body></html>') == []
+
+
+def test_archived_snapshot_parses_the_same(tmp_path, snapshot_html):
+    archive = SnapshotArchive(str(tmp_path))
+    digest = archive.store(snapshot_html, 'place-1', reviews_extracted=4)
+    
+    assert parse_reviews_html(archive.load(digest)) == parse_reviews_html(snapshot_html)
+    assert [entry['digest'] for entry in archive.entries()] == [digest]
@@ -0,0 +1,144 @@
+"""Token bucket wait math, local and in Redis"""
+
+from unittest import mock
+
+import pytest
+
+from app.services import rate_limiter
+from app.services.rate_limiter import RedisTokenBucket, TokenBucket
+
+
+class FakeClock:
+    """time.monotonic/time.sleep stand-in; sleeping advances the clock"""
+    
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+    
+    def monotonic(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    clock = FakeClock()
+    with mock.patch.object(rate_limiter.time, 'monotonic', clock.monotonic), \
+            mock.patch.object(rate_limiter.time, 'sleep', clock.sleep):
+        yield clock
+
+
+class TestTokenBucket:
+    
+    def test_burst_is_free(self, clock):
+        bucket = TokenBucket(rate=2, capacity=3)
+        
+        assert all(bucket.acquire() for _ in range(3))
+        assert clock.sleeps == []
+    
+    def test_waits_for_the_missing_tokens(self, clock):
+        bucket = TokenBucket(rate=2, capacity=3)
+        for _ in range(3):
+            bucket.acquire()
+        
+        assert bucket.acquire()
+        assert clock.sleeps == [pytest.approx(0.5)]
+        
+        assert bucket.acquire(tokens=2)
+        assert clock.sleeps[-1] == pytest.approx(1.0)
+    
+    def test_refill_counts_elapsed_time(self, clock):
+        bucket = TokenBucket(rate=2, capacity=3)
+        for _ in range(3):
+            bucket.acquire()
+        clock.now += 1.25
+        
+        assert bucket.acquire(tokens=3)
+        assert clock.sleeps == [pytest.approx(0.25)]
+    
+    def test_refill_is_capped_at_capacity(self, clock):
+        bucket = TokenBucket(rate=2, capacity=3)
+        clock.now += 3600
+        for _ in range(4):
+            bucket.acquire()
+        
+        assert clock.sleeps == [pytest.approx(0.5)]
+    
+    def test_timeout(self, clock):
+        bucket = TokenBucket(rate=1, capacity=1)
+        bucket.acquire()
+        
+        assert not bucket.acquire(timeout=0.4)
+        assert sum(clock.sleeps) == pytest.approx(0.4)
+        # Time waited until the timeout still refilled the bucket
+        assert bucket.acquire(timeout=0.6)
+
+
+class TestAcquireScript:
+    
+    def _wait(self, script, rate, capacity, tokens=1):
+        return float(script(keys=['ratelimit:test'], args=[rate, capacity, tokens]))
+    
+    def test_burst_then_wait(self, redis_client):
+        script = redis_client.register_script(rate_limiter._ACQUIRE_SCRIPT)
+        
+        assert [self._wait(script, 10, 3) for _ in range(3)] == [0, 0, 0]
+        assert self._wait(script, 10, 3) == pytest.approx(0.1, abs=0.01)
+        assert self._wait(script, 10, 3, tokens=2) == pytest.approx(0.2, abs=0.01)
+    
+    def test_waiting_takes_nothing(self, redis_client):
+        script = redis_client.register_script(rate_limiter._ACQUIRE_SCRIPT)
+        self._wait(script, 1, 1)
+        
+        self._wait(script, 1, 1)
+        tokens = float(redis_client.hget('ratelimit:test', 'tokens'))
+        
+        assert 0 <= tokens < 0.1
+    
+    def test_bucket_expires_once_it_would_be_full(self, redis_client):
+        script = redis_client.register_script(rate_limiter._ACQUIRE_SCRIPT)
+        self._wait(script, 2, 4)
+        
+        assert 0 < redis_client.pttl('ratelimit:test') <= 3000
+
+
+class TestRedisTokenBucket:
+    
+    def test_sleeps_the_scripts_wait(self, redis_client, clock):
+        bucket = RedisTokenBucket(redis_client, 'test', rate=1000, capacity=1)
+        
+        with mock.patch.object(bucket, '_script', side_effect=['0.25', '0']):
+            assert bucket.acquire()
+        assert clock.sleeps == [0.25]
+    
+    def test_wait_is_capped_by_timeout(self, redis_client, clock):
+        bucket = RedisTokenBucket(redis_client, 'test', rate=1, capacity=1)
+        
+        with mock.patch.object(bucket, '_script', return_value='5'):
+            assert not bucket.acquire(timeout=2)
+        assert sum(clock.sleeps) == pytest.approx(2)
+    
+    def test_shares_one_budget_between_buckets(self, redis_client):
+        first = RedisTokenBucket(redis_client, 'test', rate=0.001, capacity=2)
+        second = RedisTokenBucket(redis_client, 'test', rate=0.001, capacity=2)
+        
+        assert first.acquire(timeout=0)
+        assert second.acquire(timeout=0)
+        assert not first.acquire(timeout=0)
+    
+    def test_falls_back_to_a_local_bucket_without_redis(self, clock):
+        from redis.exceptions import ConnectionError
+        
+        client = mock.Mock()
+        client.register_script.return_value.side_effect = ConnectionError('down')
+        bucket = RedisTokenBucket(client, 'test-fallback', rate=1, capacity=1)
+        
+        with mock.patch.dict(rate_limiter._buckets, clear=True):
+            assert bucket.acquire()
+            assert bucket.acquire()
+        
+        assert clock.sleeps == [pytest.approx(1.0)]
+        assert client.register_script.return_value.call_count == 1
@@ -0,0 +1,85 @@
+"""Stratified, recency-weighted review sampling"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+
+from app.ml.review_sampler import ReviewSampler, parse_review_date
+
+SCRAPED_AT = datetime(2024, 6, 1)
+
+
+def _reviews(n, rating=5, source='google_maps', start=0, date='2024-05-01'):
+    return [
+        {'text': f'review {start + i}', 'rating': rating, 'source': source, 'date': date, 'scraped_at': SCRAPED_AT}
+        for i in range(n)
+    ]
+
+
+def test_small_sets_are_kept_whole():
+    reviews = _reviews(5)
+    
+    assert ReviewSampler(sample_size=10).sample(reviews) == [0, 1, 2, 3, 4]
+
+
+def test_sample_keeps_the_stratum_mix():
+    reviews = (
+        _reviews(60, rating=5)
+        + _reviews(30, rating=1, start=60)
+        + _reviews(10, rating=4, source='places_api', start=90)
+    )
+    
+    selected = ReviewSampler(sample_size=20).sample(reviews)
+    
+    assert len(selected) == 20
+    assert selected == sorted(selected)
+    mix = Counter((reviews[i]['rating'], reviews[i]['source']) for i in selected)
+    assert mix == {(5, 'google_maps'): 12, (1, 'google_maps'): 6, (4, 'places_api'): 2}
+
+
+def test_small_strata_get_at_least_one_review():
+    reviews = _reviews(99) + _reviews(1, rating=2, start=99)
+    
+    selected = ReviewSampler(sample_size=10).sample(reviews)
+    
+    assert len(selected) == 10
+    assert 99 in selected
+
+
+def test_more_strata_than_slots():
+    reviews = [{'text': f'r{i}', 'rating': i % 5 + 1, 'source': f's{i % 3}'} for i in range(30)]
+    
+    selected = ReviewSampler(sample_size=4).sample(reviews)
+    
+    assert len(selected) == 4
+    assert len({(reviews[i]['rating'], reviews[i]['source']) for i in selected}) == 4
+
+
+def test_sampling_is_deterministic_and_order_independent():
+    reviews = _reviews(50) + _reviews(50, rating=3, start=50)
+    sampler = ReviewSampler(sample_size=15)
+    
+    selected = sampler.sample(reviews)
+    texts = {reviews[i]['text'] for i in selected}
+    shuffled = list(reversed(reviews))
+    
+    assert sampler.sample(reviews) == selected
+    assert {shuffled[i]['text'] for i in sampler.sample(shuffled)} == texts
+
+
+def test_recent_reviews_are_preferred():
+    recent = _reviews(100, date='2024-05-01')
+    old = _reviews(100, start=100, date='2019-05-01')
+    
+    selected = ReviewSampler(sample_size=50, half_life_days=90).sample(recent + old)
+    
+    assert sum(1 for i in selected if i < 100) >= 45
+
+
+def test_parse_review_date_formats():
+    assert parse_review_date('2024-05-01T10:00:00') == datetime(2024, 5, 1)
+    assert parse_review_date(0) == datetime(1970, 1, 1)
+    assert parse_review_date('3 weeks ago', SCRAPED_AT) == SCRAPED_AT - timedelta(weeks=3)
+    assert parse_review_date('a month ago', SCRAPED_AT) == SCRAPED_AT - timedelta(days=30)
+    assert parse_review_date('yesterday', SCRAPED_AT) == SCRAPED_AT - timedelta(days=1)
+    assert parse_review_date('', SCRAPED_AT) == SCRAPED_AT
+    assert parse_review_date('3 weeks ago') is None
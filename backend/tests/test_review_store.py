@@ -0,0 +1,76 @@
+"""Content hashing and conflict-free bulk review inserts"""
+
+from app.services.review_store import bulk_insert_reviews, is_new_review, review_content_hash, stored_review_keys
+
+
+def _row(restaurant, text, author='Ann', source='google_maps', **fields):
+    return {'restaurant_id': restaurant.id, 'review_text': text, 'author': author, 'source': source, **fields}
+
+
+def test_hash_ignores_case_and_whitespace():
+    assert review_content_hash(1, 'google_maps', 'Ann ', 'Great  pizza\n') == review_content_hash(1, 'google_maps', 'ann', 'great pizza')
+
+
+def test_hash_separates_restaurant_source_and_author():
+    base = review_content_hash(1, 'google_maps', 'Ann', 'Great pizza')
+    
+    assert review_content_hash(2, 'google_maps', 'Ann', 'Great pizza') != base
+    assert review_content_hash(1, 'reddit', 'Ann', 'Great pizza') != base
+    assert review_content_hash(1, 'google_maps', 'Bob', 'Great pizza') != base
+    assert review_content_hash(1, 'google_maps', None, 'Great pizza') == review_content_hash(1, 'google_maps', '', 'Great pizza')
+
+
+def test_bulk_insert_skips_stored_and_repeated_rows(db, restaurant):
+    from app.models.database import Review
+    
+    assert bulk_insert_reviews(db, [_row(restaurant, 'Great pizza'), _row(restaurant, 'Slow service')]) == (2, 0)
+    db.commit()
+    
+    rows = [
+        _row(restaurant, 'great   PIZZA'),
+        _row(restaurant, 'Cozy patio', is_duplicate=True),
+        _row(restaurant, 'Cozy patio', is_duplicate=True),
+    ]
+    assert bulk_insert_reviews(db, rows) == (1, 1)
+    db.commit()
+    
+    assert db.query(Review).count() == 3
+    assert all(review.content_hash for review in db.query(Review))
+
+
+def test_bulk_insert_batches(db, restaurant):
+    from app.models.database import Review
+    
+    rows = [_row(restaurant, f'review {i}') for i in range(7)]
+    
+    assert bulk_insert_reviews(db, rows, batch_size=3) == (7, 0)
+    assert bulk_insert_reviews(db, rows, batch_size=3) == (0, 0)
+    assert db.query(Review).count() == 7
+
+
+def test_bulk_insert_keeps_a_given_hash(db, restaurant):
+    from app.models.database import Review
+    
+    bulk_insert_reviews(db, [_row(restaurant, 'Great pizza', content_hash='fixed')])
+    
+    assert db.query(Review.content_hash).scalar() == 'fixed'
+
+
+def test_empty_insert(db):
+    assert bulk_insert_reviews(db, []) == (0, 0)
+
+
+def test_stored_keys_match_scraped_reviews(db, restaurant):
+    from app.models.database import Review
+    
+    # A row from before content hashes existed
+    db.add(Review(restaurant_id=restaurant.id, review_text='Old review', author='Cy', source='google_maps'))
+    bulk_insert_reviews(db, [_row(restaurant, 'Great pizza', external_id='g-1')])
+    db.commit()
+    
+    keys = stored_review_keys(db, restaurant.id)
+    
+    assert not is_new_review(keys, restaurant.id, 'google_maps', {'text': 'old  review', 'author': 'cy'})
+    assert not is_new_review(keys, restaurant.id, 'google_maps', {'text': 'Edited text', 'review_id': 'g-1'})
+    assert is_new_review(keys, restaurant.id, 'google_maps', {'text': 'Brand new', 'author': 'Dee'})
+    assert not is_new_review(keys, restaurant.id, 'google_maps', {'text': 'Brand new', 'author': 'Dee'})
@@ -0,0 +1,64 @@
+"""Search hit recording for the scrape scheduler"""
+
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+
+from app.models.database import Restaurant
+from app.services.scrape_scheduler import decayed_search_score, record_search_hits
+
+NOW = datetime(2024, 6, 1, 12)
+
+
+@pytest.fixture(autouse=True)
+def half_life():
+    with mock.patch('app.core.config.settings.SEARCH_SCORE_HALF_LIFE_HOURS', 24):
+        yield 24
+
+
+def _score(session_factory, place_id):
+    session = session_factory()
+    try:
+        return session.query(Restaurant.search_score).filter(Restaurant.place_id == place_id).scalar()
+    finally:
+        session.close()
+
+
+def test_new_places_are_inserted_with_one_hit(db, session_factory):
+    assert record_search_hits(db, [{'place_id': 'new-1', 'name': 'New Place'}], now=NOW) == 1
+    db.commit()
+    
+    assert _score(session_factory, 'new-1') == 1.0
+
+
+def test_hits_decay_and_accumulate(db, restaurant, session_factory):
+    for hours in (0, 24, 48):
+        record_search_hits(db, [{'place_id': 'place-1', 'name': 'Renamed'}], now=NOW + timedelta(hours=hours))
+        db.commit()
+    
+    expected = decayed_search_score(decayed_search_score(1, NOW, NOW + timedelta(hours=24), 24) + 1,
+                                    NOW + timedelta(hours=24), NOW + timedelta(hours=48), 24) + 1
+    assert _score(session_factory, 'place-1') == pytest.approx(expected)
+    assert expected == pytest.approx(1.75)
+    db.refresh(restaurant)
+    assert (restaurant.name, restaurant.last_searched) == ('Renamed', NOW + timedelta(hours=48))
+
+
+def test_concurrent_searches_do_not_lose_hits(restaurant, session_factory):
+    first, second = session_factory(), session_factory()
+    try:
+        # Both sessions load the row before either writes (kept referenced so each
+        # session holds its now-stale copy)
+        loaded = [first.get(Restaurant, restaurant.id), second.get(Restaurant, restaurant.id)]
+        
+        record_search_hits(first, [{'place_id': 'place-1'}], now=NOW)
+        first.commit()
+        record_search_hits(second, [{'place_id': 'place-1'}], now=NOW)
+        second.commit()
+    finally:
+        first.close()
+        second.close()
+    
+    del loaded
+    assert _score(session_factory, 'place-1') == pytest.approx(2.0)
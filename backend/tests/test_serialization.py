@@ -0,0 +1,70 @@
+"""msgpackz Celery serializer"""
+
+from datetime import date, datetime
+
+import pytest
+
+from app.core import serialization
+from app.core.serialization import CODEC_RAW, CODEC_ZLIB, CODEC_ZSTD, compress, decompress, dumps, loads
+
+
+def _message(reviews=50):
+    """Celery protocol 2 body carrying a review list"""
+    batch = [
+        {
+            'text': f"Review {i}: the pasta was great and the staff friendly, would come back.",
+            'rating': 4.0,
+            'author': f"Guide {i}",
+            'date': date(2024, 1, 1 + i % 28),
+            'scraped_at': datetime(2024, 2, 3, 4, 5, 6),
+            'review_id': None,
+        }
+        for i in range(reviews)
+    ]
+    return [[batch], {'reprocess': True}, {'callbacks': None, 'errbacks': None, 'chain': None, 'chord': None}]
+
+
+def test_round_trips_a_task_message():
+    message = _message()
+    
+    assert loads(dumps(message)) == message
+
+
+def test_small_messages_are_not_compressed():
+    payload = dumps({'restaurant_id': 1})
+    
+    assert payload[0] == CODEC_RAW
+    assert loads(payload) == {'restaurant_id': 1}
+
+
+def test_large_messages_are_zstd_compressed():
+    message = _message()
+    payload = dumps(message)
+    
+    assert payload[0] == CODEC_ZSTD
+    assert len(payload) < len(serialization.msgpack.packb(message, default=serialization._default))
+
+
+@pytest.mark.parametrize('codec', [CODEC_ZLIB, CODEC_ZSTD])
+def test_each_codec_round_trips(codec):
+    body = b'review ' * 500
+    framed = compress(body, threshold=0, codec=codec)
+    
+    assert framed[0] == codec
+    assert decompress(framed) == body
+
+
+def test_accepts_memoryview_bodies():
+    message = _message(reviews=2)
+    
+    assert loads(memoryview(dumps(message))) == message
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError):
+        decompress(bytes([9]) + b'body')
+
+
+def test_unsupported_types_are_rejected():
+    with pytest.raises(TypeError):
+        dumps({'value': object()})
@@ -0,0 +1,93 @@
+"""Incremental scraping watermark cut-off"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.background_jobs import _advance_watermark, _review_watermark
+from app.services.google_maps_scraper import GoogleMapsScraper
+
+SCRAPED_AT = datetime(2024, 6, 1)
+
+
+@pytest.fixture
+def scraper():
+    return GoogleMapsScraper(browser_pool=object(), rate_limiter=object())
+
+
+def _review(review_id, date):
+    return {'review_id': review_id, 'text': f'review {review_id}', 'date': date}
+
+
+def test_no_watermark_keeps_everything(scraper):
+    reviews = [_review('a', '2024-05-01')]
+    
+    assert scraper._apply_watermark(reviews, None, sorted_newest=True) == reviews
+
+
+def test_newest_first_stops_at_the_watermark_review(scraper):
+    reviews = [_review('c', '2024-05-20'), _review('b', '2024-05-10'), _review('a', '2024-05-01')]
+    watermark = {'review_id': 'b', 'date': None}
+    
+    assert [r['review_id'] for r in scraper._apply_watermark(reviews, watermark, sorted_newest=True)] == ['c']
+
+
+def test_review_id_is_ignored_without_newest_first_order(scraper):
+    reviews = [_review('c', '2024-05-20'), _review('b', '2024-05-10'), _review('a', '2024-05-01')]
+    watermark = {'review_id': 'b', 'date': None}
+    
+    assert len(scraper._apply_watermark(reviews, watermark, sorted_newest=False)) == 3
+
+
+def test_reviews_older_than_the_watermark_date_are_dropped(scraper):
+    reviews = [
+        _review('c', '2024-05-20'),
+        _review('b', '2024-05-10'),
+        _review('a', '2024-05-01'),
+        _review('undated', ''),
+    ]
+    watermark = {'review_id': None, 'date': datetime(2024, 5, 10)}
+    
+    kept = scraper._apply_watermark(reviews, watermark, sorted_newest=False)
+    
+    # Same-day reviews and reviews without a date are kept
+    assert [r['review_id'] for r in kept] == ['c', 'b', 'undated']
+
+
+def test_relative_dates_are_resolved_against_now(scraper):
+    reviews = [_review('new', 'a day ago'), _review('old', '2 years ago')]
+    watermark = {'review_id': None, 'date': datetime.utcnow() - timedelta(days=30)}
+    
+    assert [r['review_id'] for r in scraper._apply_watermark(reviews, watermark, sorted_newest=False)] == ['new']
+
+
+def test_advance_watermark_moves_to_the_newest_review():
+    restaurant = SimpleNamespace(review_watermark_id=None, review_watermark_date=None)
+    reviews = [_review('b', '2024-05-10'), _review('c', '3 days ago'), _review('a', '2024-05-01')]
+    
+    _advance_watermark(restaurant, reviews, SCRAPED_AT)
+    
+    assert restaurant.review_watermark_id == 'c'
+    assert restaurant.review_watermark_date == SCRAPED_AT - timedelta(days=3)
+    assert _review_watermark(restaurant) == {'review_id': 'c', 'date': SCRAPED_AT - timedelta(days=3)}
+
+
+def test_advance_watermark_prefers_the_first_of_equally_dated_reviews():
+    restaurant = SimpleNamespace(review_watermark_id=None, review_watermark_date=None)
+    
+    _advance_watermark(restaurant, [_review('top', '2024-05-10'), _review('next', '2024-05-10')], SCRAPED_AT)
+    
+    assert restaurant.review_watermark_id == 'top'
+
+
+def test_advance_watermark_never_moves_backwards():
+    restaurant = SimpleNamespace(review_watermark_id='z', review_watermark_date=datetime(2024, 5, 30))
+    
+    _advance_watermark(restaurant, [_review('a', '2024-05-01')], SCRAPED_AT)
+    
+    assert (restaurant.review_watermark_id, restaurant.review_watermark_date) == ('z', datetime(2024, 5, 30))
+
+
+def test_restaurant_without_watermark():
+    assert _review_watermark(SimpleNamespace(review_watermark_id=None, review_watermark_date=None)) is None